@@ -1,9 +1,15 @@
 import sys
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 from groq import Groq  # <--- NEW LIBRARY
 
+from app.v3.data.data_access import DataAccess
+from app.v3.llm.groq_client import get_groq_client as get_async_groq_client, get_groq_settings
+from app.v3.llm.polish_cache import PolishCache, polish_fingerprint
+from app.v3.llm.single_flight import SingleFlight
+
 # --- 1. ROBUST IMPORT SYSTEM ---
 try:
     from .data_loader import load_json, load_markdown
@@ -36,9 +42,55 @@ def get_groq_client():
 
 # --- 3. LOGIC FUNCTIONS ---
 
+V2_FALLBACK_ANSWER = "I can answer questions about my skills, projects, and experience."
+
+
+def _route(question: str) -> str:
+    question_lower = question.lower()
+    if "about" in question_lower or "who are you" in question_lower:
+        return "about"
+    if "skill" in question_lower or "stack" in question_lower:
+        return "skills"
+    if "project" in question_lower:
+        return "projects"
+    return "fallback"
+
+
+def _build_answers(snapshot) -> dict:
+    """Every answer search_portfolio can give, built once per data snapshot."""
+    skills = snapshot.raw["skills.json"]
+    lines = ["Here is my technical stack:"]
+    if "backend" in skills:
+        lines.append(f"- Backend: {', '.join(skills['backend'])}")
+    if "frontend" in skills:
+        lines.append(f"- Frontend: {', '.join(skills['frontend'])}")
+    if "programming_languages" in skills:
+        langs = skills["programming_languages"]
+        lines.append(f"- Languages: {', '.join(langs.get('primary', []))}")
+    skills_answer = "\n".join(lines)
+
+    lines = ["Here are my key projects:"]
+    for p in snapshot.raw["projects.json"]:
+        lines.append(f"- {p.get('title', 'Project')}: {p.get('description', '')}")
+    return {
+        "about": snapshot.raw["about.md"],
+        "skills": skills_answer,
+        "projects": "\n".join(lines),
+        "fallback": V2_FALLBACK_ANSWER,
+    }
+
+
 def search_portfolio(question: str) -> str:
     """
-    Your Rule-Based Search (No changes needed here)
+    Your Rule-Based Search. Answers come from the shared data snapshot and
+    are memoized with it, so no file is read per request.
+    """
+    return DataAccess.snapshot().derive("v2_answers", _build_answers)[_route(question)]
+
+
+def search_portfolio_uncached(question: str) -> str:
+    """
+    The original file-reading search, kept for scripts without the v3 package.
     """
     question_lower = question.lower()
 
@@ -64,12 +116,68 @@ def search_portfolio(question: str) -> str:
             lines.append(f"- {p.get('title', 'Project')}: {p.get('description', '')}")
         return "\n".join(lines)
 
-    return "I can answer questions about my skills, projects, and experience."
+    return V2_FALLBACK_ANSWER
+
+
+def _v2_prompt(question: str, raw_answer: str) -> str:
+    return f"""
+    You are a professional portfolio assistant.
+    USER QUESTION: {question}
+    RAW DATA: {raw_answer}
+    
+    TASK: Rewrite the raw data into a friendly, professional response. 
+    Keep it concise. Do not invent new facts.
+    """
+
+
+_V2_POLISH_CACHE = PolishCache(
+    max_entries=int(os.getenv("V2_POLISH_CACHE_SIZE", "128")),
+    ttl_seconds=int(os.getenv("LLM_POLISH_CACHE_TTL_SECONDS", "3600")),
+)
+_V2_FLIGHTS: SingleFlight[str] = SingleFlight()
+
+
+async def polish_with_llm_async(question: str, raw_answer: str) -> str:
+    """
+    Non-blocking polish_with_llm for the /chat v2 path: uses the shared
+    AsyncGroq client, memoizes polished answers and coalesces identical
+    concurrent calls. Falls back to the raw answer on any error.
+    """
+    if V2_FALLBACK_ANSWER in raw_answer:
+        return raw_answer
+    client = get_async_groq_client()
+    if client is None:
+        return raw_answer
+
+    key = polish_fingerprint(
+        question, intent="v2", strategy=None, recruiter_type=None, raw_text=raw_answer, data_version=None
+    )
+    cached = _V2_POLISH_CACHE.get(key)
+    if cached is not None:
+        return cached.answer
+
+    async def call() -> str:
+        start = time.monotonic()
+        chat_completion = await client.chat.completions.create(
+            messages=[{"role": "user", "content": _v2_prompt(question, raw_answer)}],
+            model=get_groq_settings().model,
+        )
+        polished = chat_completion.choices[0].message.content.strip()
+        _V2_POLISH_CACHE.put(key, polished, (time.monotonic() - start) * 1000)
+        return polished
+
+    try:
+        polished, _shared = await _V2_FLIGHTS.do(key, call)
+        return polished
+    except Exception as e:
+        print(f"⚠️ Groq Error: {e}")
+        return raw_answer
 
 
 def polish_with_llm(question: str, raw_answer: str) -> str:
     """
-    Uses Groq (Llama 3) to rewrite the answer.
+    Uses Groq (Llama 3) to rewrite the answer. Blocking: for scripts only;
+    request handlers use polish_with_llm_async.
     """
     client = get_groq_client()
     
@@ -77,14 +185,7 @@ def polish_with_llm(question: str, raw_answer: str) -> str:
     if not client or "I can answer questions about" in raw_answer:
         return raw_answer
 
-    prompt = f"""
-    You are a professional portfolio assistant.
-    USER QUESTION: {question}
-    RAW DATA: {raw_answer}
-    
-    TASK: Rewrite the raw data into a friendly, professional response. 
-    Keep it concise. Do not invent new facts.
-    """
+    prompt = _v2_prompt(question, raw_answer)
 
     try:
         # Groq uses standard OpenAI-like chat completion
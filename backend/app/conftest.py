@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import chat_engine
+from app.v3.layers import llm_polish
+from app.v3.llm import groq_client, health_manager, hedging, polish_cache, provider, scheduler
+from app.v3.llm.hedging import Hedger
+from app.v3.llm.polish_cache import PolishCache
+from app.v3.llm.scheduler import LLMScheduler
+from app.v3.llm.single_flight import SingleFlight
+from app.v3.system.observability import SystemMonitor
+
+
+class FakeGroq:
+    """
+    Stand-in for the shared AsyncGroq client. Each call waits `latency_s`,
+    then raises `error` if set, else answers `reply` (a string, or a callable
+    of the request kwargs), or streams `tokens` when called with stream=True.
+    Records calls, peak concurrency and the last request's kwargs.
+    """
+
+    def __init__(self):
+        self.reply = "Polished answer."
+        self.tokens = []
+        self.latency_s = 0.0
+        self.error: Exception | None = None
+        self.calls = self.active = self.peak = 0
+        self.last_request = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        self.last_request = kwargs
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if self.latency_s:
+                await asyncio.sleep(self.latency_s)
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.active -= 1
+        if kwargs.get("stream"):
+            return self._chunks()
+        content = self.reply(kwargs) if callable(self.reply) else self.reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def _chunks(self):
+        for token in self.tokens:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    """
+    Installs a FakeGroq as the Groq client and gives every polish-path
+    singleton (caches, breakers, scheduler, hedger, single-flight, provider
+    instances) a fresh instance for the test.
+    """
+    fake = FakeGroq()
+    monkeypatch.setattr(groq_client, "_CLIENT", fake)
+    monkeypatch.setattr(polish_cache, "_CACHE", PolishCache())
+    monkeypatch.setattr(chat_engine, "_V2_POLISH_CACHE", PolishCache())
+    monkeypatch.setattr(health_manager, "_BREAKERS", {})
+    current = scheduler.get_llm_scheduler()
+    monkeypatch.setattr(
+        scheduler,
+        "_SCHEDULER",
+        LLMScheduler(max_concurrency=current.max_concurrency, max_queue=current.max_queue, max_wait_ms=current.max_wait_ms),
+    )
+    hedger = hedging.get_hedger()
+    monkeypatch.setattr(
+        hedging,
+        "_HEDGER",
+        Hedger(
+            quantile=hedger.quantile,
+            default_delay_ms=hedger.default_delay_ms,
+            min_delay_ms=hedger.min_delay_ms,
+            max_delay_ms=hedger.max_delay_ms,
+            min_samples=hedger.min_samples,
+        ),
+    )
+    monkeypatch.setattr(llm_polish, "_POLISH_FLIGHTS", SingleFlight(on_join=SystemMonitor().record_llm_flight))
+    monkeypatch.setattr(provider, "_INSTANCES", {})
+    return fake
@@ -31,6 +31,13 @@ def _require_data_dir():
     return DATA_DIR
 
 
+def data_file_path(filename: str) -> Path:
+    """
+    Absolute path of a file inside the data directory.
+    """
+    return _require_data_dir() / filename
+
+
 def load_json(filename: str):
     """
     Load a JSON file from the data directory.
@@ -5,16 +5,23 @@ from dotenv import load_dotenv
 # Fast, direct load
 env_path = Path(__file__).resolve().parents[1] / ".env"
 load_dotenv(dotenv_path=env_path)
-from fastapi import FastAPI, Request
-from app.data_loader import load_json, load_markdown
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.chat_engine import search_portfolio, polish_with_llm
-from app.v3.controller import handle_chat, ChatRequest
+from app.chat_engine import search_portfolio, polish_with_llm_async
+from app.v3.controller import CHAT_BATCH_MAX_ITEMS, handle_chat, handle_chat_batch, handle_chat_stream, ChatRequest
 import time
 from app.v3.middleware.debug_tracing import DebugTracingMiddleware
+from app.v3.data.static_sections import bundle_response, section_response
+from app.v3.system.deadline import DEADLINE_HEADER, parse_deadline_ms
 from app.v3.system.observability import SystemMonitor
-from app.v3.analytics.analytics_engine import AnalyticsEngine
-from app.v3.system.observability import SystemMonitor
+from app.v3.analytics.analytics_engine import AnalyticsEngine, parse_time_bound
+from app.v3.llm.groq_client import init_groq_client, close_groq_client
+from app.v3.llm.provider import close_providers
+from app.v4.state.session_backend import flush_session_writes
 
 
 def build_cors_settings():
@@ -44,10 +51,24 @@ def build_cors_settings():
     }
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled LLM client for the process; config is read once here
+    await init_groq_client()
+    yield
+    await close_providers()
+    await close_groq_client()
+    # Queued session writes and analytics would otherwise wait for the next flush tick
+    flush_session_writes()
+    AnalyticsEngine.aggregate()
+    AnalyticsEngine.flush()
+
+
 app = FastAPI(
     title="Portfolio Backend API",
     description="Backend API for personal portfolio",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 cors_settings = build_cors_settings()
@@ -64,61 +85,82 @@ def root():
     return {"status": "ok", "message": "Portfolio backend is running"}
 
 
+@app.get("/portfolio")
+async def get_portfolio(request: Request, fields: str | None = None):
+    """
+    Every section in one response (first paint), optionally only `fields`
+    (comma separated section names).
+    """
+    return bundle_response(fields, request)
+
+
 @app.get("/about")
-def get_about():
+async def get_about(request: Request):
     """
     Return About section (Markdown).
     """
-    content = load_markdown("about.md")
-    return {"content": content}
+    return section_response("about", request)
 
 
 @app.get("/skills")
-def get_skills():
+async def get_skills(request: Request):
     """
     Return skills data.
     """
-    return load_json("skills.json")
+    return section_response("skills", request)
 
 
 @app.get("/projects")
-def get_projects():
+async def get_projects(request: Request):
     """
     Return projects list.
     """
-    return load_json("projects.json")
+    return section_response("projects", request)
 
 
 @app.get("/experience")
-def get_experience():
+async def get_experience(request: Request):
     """
     Return work experience data.
     """
-    return load_json("experience.json")
+    return section_response("experience", request)
 
 @app.get("/education")
-def get_education():
-    return load_json("education.json")
+async def get_education(request: Request):
+    return section_response("education", request)
 
 @app.get("/certificates")
-def get_certificates():
-    return load_json("certificates.json")
+async def get_certificates(request: Request):
+    return section_response("certificates", request)
 
 
 @app.get("/contact")
-def get_contact():
+async def get_contact(request: Request):
     """
     Return contact information.
     """
-    return load_json("contact.json")
+    return section_response("contact", request)
 
 @app.get("/system/health", tags=["System"])
 def system_health():
     return SystemMonitor().get_status()
 
+@app.get("/system/metrics", tags=["System"], response_class=PlainTextResponse)
+def system_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(
+        SystemMonitor().prometheus_text(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 @app.get("/system/analytics", tags=["System"])
-def system_analytics():
-    return AnalyticsEngine().get_analytics()
+def system_analytics(since: str | None = None, until: str | None = None):
+    # Epoch seconds or ISO-8601; answered from per-minute buckets
+    try:
+        window = (parse_time_bound(since), parse_time_bound(until))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since/until must be epoch seconds or ISO-8601")
+    return AnalyticsEngine().get_analytics(*window)
 
 @app.post("/chat")
 async def chat(payload: dict, request: Request):
@@ -128,8 +170,9 @@ async def chat(payload: dict, request: Request):
     use_v2 = payload.get("v2") is True
 
     if use_v2:
+        # No blocking I/O on the event loop: memoized search, async LLM client
         raw_answer = search_portfolio(question)
-        final_answer = polish_with_llm(question, raw_answer)
+        final_answer = await polish_with_llm_async(question, raw_answer)
         return {"answer": final_answer}
 
     v3_response = await handle_chat(
@@ -137,6 +180,7 @@ async def chat(payload: dict, request: Request):
             question=question,
             session_id=session_id,
             metadata=metadata,
+            deadline_ms=parse_deadline_ms(request.headers.get(DEADLINE_HEADER)),
         )
     )
 
@@ -148,13 +192,101 @@ async def chat(payload: dict, request: Request):
         "evidence": v3_response.evidence,
         "debug": v3_response.debug,
     }
+    _attach_request_debug(response, request)
+    return response
+
+
+@app.post("/chat/batch")
+async def chat_batch(payload: dict, request: Request):
+    """
+    Several questions for one session in one call (v3 pipeline only).
+
+    Body: {"session_id", "metadata"?, "questions": [str | {"question", "metadata"?}, ...]}
+    Item metadata is merged over the shared metadata. Results come back in
+    order, each with the /chat fields plus its stage timings in `timing_ms`.
+    """
+    items = payload.get("questions")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="questions must be a non-empty list")
+    if len(items) > CHAT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"at most {CHAT_BATCH_MAX_ITEMS} questions per batch")
+
+    session_id = payload.get("session_id")
+    shared_metadata = payload.get("metadata") or {}
+    deadline_ms = parse_deadline_ms(request.headers.get(DEADLINE_HEADER))
+    chat_requests = []
+    for item in items:
+        if isinstance(item, str):
+            item = {"question": item}
+        if not isinstance(item, dict):
+            raise HTTPException(status_code=400, detail="each question must be a string or an object")
+        chat_requests.append(
+            ChatRequest(
+                question=item.get("question", ""),
+                session_id=session_id,
+                metadata={**shared_metadata, **(item.get("metadata") or {})},
+                deadline_ms=deadline_ms,
+            )
+        )
+
+    results = []
+    for v3_response in await handle_chat_batch(chat_requests):
+        result = {
+            "answer": v3_response.answer,
+            "intent": v3_response.intent,
+            "strategy": v3_response.strategy,
+            "confidence_score": v3_response.confidence_score,
+            "evidence": v3_response.evidence,
+            "timing_ms": v3_response.timing,
+            "debug": v3_response.debug,
+        }
+        _attach_request_debug(result, request)
+        results.append(result)
+    return {"session_id": session_id, "results": results}
+
+
+def _attach_request_debug(response: dict, request: Request) -> None:
     if response.get("debug") is not None:
         response["debug"]["request_id"] = getattr(request.state, "request_id", None)
         start_time = getattr(request.state, "start_time", None)
         response["debug"]["process_time_ms"] = round(
             (time.monotonic() - start_time) * 1000, 2
         ) if start_time else 0
-    return response
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(payload: dict, request: Request):
+    """
+    Server-Sent Events variant of /chat (same request body, v3 pipeline only).
+
+    Events, in order:
+    - `answer`: rules-engine answer sent before any LLM work:
+      {"answer", "evidence", "intent", "strategy", "confidence_score", "llm_pending"}
+    - `token`: zero or more polished text chunks, {"text"}; append them in order
+    - `final`: the same body /chat returns; its `answer` replaces everything shown so far
+    """
+    chat_request = ChatRequest(
+        question=payload.get("question", ""),
+        session_id=payload.get("session_id"),
+        metadata=payload.get("metadata"),
+        deadline_ms=parse_deadline_ms(request.headers.get(DEADLINE_HEADER)),
+    )
+
+    async def events():
+        async for event in handle_chat_stream(chat_request):
+            if event["event"] == "final":
+                _attach_request_debug(event["data"], request)
+            yield _sse(event["event"], event["data"])
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import httpx
+
+from app import chat_engine
+from app.main import app
+
+
+def test_search_portfolio_matches_the_file_reading_version():
+    for question in ["Who are you?", "What is your stack?", "Show me your projects", "Hello"]:
+        assert chat_engine.search_portfolio(question) == chat_engine.search_portfolio_uncached(question)
+
+
+def test_v2_polish_is_memoized(fake_groq):
+    fake_groq.reply = "Polished."
+
+    async def run():
+        raw = chat_engine.search_portfolio("What is your stack?")
+        return [await chat_engine.polish_with_llm_async("What is your stack?", raw) for _ in range(3)]
+
+    assert asyncio.run(run()) == ["Polished."] * 3
+    assert fake_groq.calls == 1
+
+
+def test_slow_v2_request_does_not_delay_v1_requests(fake_groq):
+    fake_groq.reply = "Polished."
+    fake_groq.latency_s = 0.5
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.monotonic()
+            slow = asyncio.create_task(client.post("/chat", json={"question": "What is your stack?", "v2": True}))
+            await asyncio.sleep(0.05)  # the v2 request is now waiting on the LLM
+            v1 = await asyncio.gather(
+                *(client.post("/chat", json={"question": "What's the weather like?"}) for _ in range(5))
+            )
+            # Measured from when the v2 request was sent: blocking the loop would show up here
+            v1_ms = (time.monotonic() - start) * 1000
+            still_running = not slow.done()
+            return v1, v1_ms, still_running, await slow
+
+    v1, v1_ms, still_running, v2 = asyncio.run(run())
+    assert all(response.status_code == 200 for response in v1)
+    assert still_running
+    assert v1_ms < 300
+    assert v2.json() == {"answer": "Polished."}
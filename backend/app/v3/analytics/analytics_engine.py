@@ -1,41 +1,339 @@
 """
 Analytics Engine (v3.7).
-In-memory analytics for intent and recruiter behavior with cross-category mapping.
+Intent and recruiter behavior analytics with cross-category mapping, rolled up
+into per-minute buckets.
+
+The request path only appends to a buffer; a background thread folds the
+buffer into the buckets and periodically appends new counts to a JSONL file
+(ANALYTICS_FLUSH_PATH). The same thread replays the file on startup, and
+once it holds about twice the lines the retained buckets need, rewrites it
+to those buckets plus one line of all-time totals for expired minutes. The
+file belongs to one process.
 """
 
 from __future__ import annotations
 
-from threading import Lock
-from typing import Dict, List, Tuple
+from array import array
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+import json
+import logging
+import os
+from threading import Lock, Thread
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.v3.system.observability import SystemMonitor
+
+logger = logging.getLogger("portfolio.v3.analytics")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def parse_time_bound(value: str | None) -> Optional[float]:
+    """
+    Epoch seconds ("1767225600") or ISO-8601 ("2026-01-01T00:00:00Z") to epoch
+    seconds. Naive datetimes are taken as UTC. Raises ValueError otherwise.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
 
 
 class AnalyticsEngine:
     _lock = Lock()
-    _intent_counts: Dict[str, int] = {}
-    _recruiter_types: Dict[str, int] = {}
-    _recruiter_intent_map: Dict[str, Dict[str, int]] = {}
-    _total_interactions: int = 0
+
+    # Request-path buffer: deque.append is atomic, so tracking takes no lock
+    _buffer: Deque[Tuple[float, str, str]] = deque()
+
+    # (recruiter_type, intent) pairs, interned to array indexes
+    _pairs: List[Tuple[str, str]] = []
+    _pair_ids: Dict[Tuple[str, str], int] = {}
+
+    # minute (epoch // 60) -> counts per pair id; oldest first
+    _buckets: "OrderedDict[int, array]" = OrderedDict()
+    _totals: array = array("Q")
+    # Counts folded in since the last file flush, by minute
+    _unflushed: Dict[int, array] = {}
+
+    _retention_minutes = _env_int("ANALYTICS_RETENTION_MINUTES", 7 * 24 * 60)
+    _aggregate_interval = _env_int("ANALYTICS_AGGREGATE_INTERVAL_MS", 250) / 1000.0
+    _flush_interval = _env_int("ANALYTICS_FLUSH_SECONDS", 60)
+    _flush_path: str | None = os.getenv("ANALYTICS_FLUSH_PATH") or None
+
+    # Rewrite the file once it has this many lines and twice the buckets
+    _compact_min_lines = 64
+
+    _thread: Thread | None = None
+    _restored = False
+    _file_lines = 0
+    _last_flush = 0.0
+    _stats = {"aggregated": 0, "flushes": 0, "flush_errors": 0, "compactions": 0}
+
+    # --- Request path ---
 
     @classmethod
     def track_interaction(cls, intent: str, recruiter_type: str) -> None:
+        cls._buffer.append((time.time(), intent, recruiter_type))
+        if cls._thread is None:
+            cls._start()
+
+    # --- Aggregation ---
+
+    @classmethod
+    def _start(cls) -> None:
         with cls._lock:
-            cls._total_interactions += 1
-            cls._intent_counts[intent] = cls._intent_counts.get(intent, 0) + 1
-            cls._recruiter_types[recruiter_type] = cls._recruiter_types.get(recruiter_type, 0) + 1
-            if recruiter_type not in cls._recruiter_intent_map:
-                cls._recruiter_intent_map[recruiter_type] = {}
-            cls._recruiter_intent_map[recruiter_type][intent] = (
-                cls._recruiter_intent_map[recruiter_type].get(intent, 0) + 1
+            if cls._thread is not None:
+                return
+            cls._last_flush = time.monotonic()
+            cls._thread = Thread(target=cls._run, name="analytics-aggregator", daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _run(cls) -> None:
+        # Replayed here, not on the request that started the thread
+        cls._restore()
+        while True:
+            time.sleep(cls._aggregate_interval)
+            try:
+                cls.aggregate()
+                if time.monotonic() - cls._last_flush >= cls._flush_interval:
+                    cls.flush()
+            except Exception:
+                logger.exception("analytics.aggregate_failed")
+
+    @classmethod
+    def _pair_id(cls, recruiter_type: str, intent: str) -> int:
+        key = (recruiter_type, intent)
+        pid = cls._pair_ids.get(key)
+        if pid is None:
+            pid = cls._pair_ids[key] = len(cls._pairs)
+            cls._pairs.append(key)
+            cls._totals.append(0)
+        return pid
+
+    @staticmethod
+    def _bump(counts: array, pid: int, n: int) -> None:
+        if pid >= len(counts):
+            counts.extend([0] * (pid + 1 - len(counts)))
+        counts[pid] += n
+
+    @classmethod
+    def _add_locked(cls, minute: int, pid: int, n: int) -> None:
+        bucket = cls._buckets.get(minute)
+        if bucket is None:
+            bucket = cls._buckets[minute] = array("Q")
+            if len(cls._buckets) > 1 and minute < next(reversed(cls._buckets)):
+                # Late or restored data: keep buckets in time order
+                cls._buckets = OrderedDict(sorted(cls._buckets.items()))
+        cls._bump(bucket, pid, n)
+        cls._totals[pid] += n
+
+    @classmethod
+    def _expire_locked(cls, now_minute: int) -> None:
+        cutoff = now_minute - cls._retention_minutes
+        while cls._buckets:
+            oldest = next(iter(cls._buckets))
+            if oldest >= cutoff:
+                break
+            del cls._buckets[oldest]
+
+    @classmethod
+    def aggregate(cls) -> int:
+        """Folds buffered interactions into the minute buckets."""
+        buffer = cls._buffer
+        with cls._lock:
+            count = 0
+            while buffer:
+                try:
+                    ts, intent, recruiter_type = buffer.popleft()
+                except IndexError:
+                    break
+                minute = int(ts // 60)
+                pid = cls._pair_id(recruiter_type, intent)
+                cls._add_locked(minute, pid, 1)
+                if cls._flush_path:
+                    pending = cls._unflushed.get(minute)
+                    if pending is None:
+                        pending = cls._unflushed[minute] = array("Q")
+                    cls._bump(pending, pid, 1)
+                count += 1
+            cls._stats["aggregated"] += count
+            cls._expire_locked(int(time.time() // 60))
+            return count
+
+    # --- Persistence ---
+
+    @classmethod
+    def _line(cls, key: str, value: int, counts: array) -> str:
+        named = [[cls._pairs[pid][0], cls._pairs[pid][1], n] for pid, n in enumerate(counts) if n]
+        return json.dumps({key: value, "counts": named}, separators=(",", ":"))
+
+    @classmethod
+    def _compacted_lines_locked(cls) -> List[str]:
+        """The whole state: totals of expired minutes, then every retained bucket."""
+        expired = array("Q", cls._totals)
+        for counts in cls._buckets.values():
+            for pid, n in enumerate(counts):
+                expired[pid] -= n
+        lines = []
+        if any(expired):
+            lines.append(cls._line("before", next(iter(cls._buckets), 0), expired))
+        lines += [cls._line("minute", minute, counts) for minute, counts in cls._buckets.items()]
+        return lines
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Appends counts aggregated since the last flush, or rewrites the file
+        to the retained state once it has grown to twice that; returns lines
+        written.
+        """
+        with cls._lock:
+            unflushed, cls._unflushed = cls._unflushed, {}
+            cls._last_flush = time.monotonic()
+            if not cls._flush_path or not unflushed:
+                return 0
+            lines = [cls._line("minute", minute, unflushed[minute]) for minute in sorted(unflushed)]
+            # Only once the file is replayed: before that it holds counts we don't
+            compact = cls._restored and cls._file_lines + len(lines) > max(
+                cls._compact_min_lines, 2 * len(cls._buckets)
             )
+            try:
+                if compact:
+                    lines = cls._compacted_lines_locked()
+                    tmp_path = f"{cls._flush_path}.tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as fh:
+                        fh.write("\n".join(lines) + "\n")
+                    os.replace(tmp_path, cls._flush_path)
+                    cls._file_lines = len(lines)
+                    cls._stats["compactions"] += 1
+                else:
+                    with open(cls._flush_path, "a", encoding="utf-8") as fh:
+                        fh.write("\n".join(lines) + "\n")
+                    cls._file_lines += len(lines)
+            except OSError:
+                logger.exception("analytics.flush_failed", extra={"path": cls._flush_path})
+                cls._stats["flush_errors"] += 1
+                # Keep the counts for the next attempt
+                for minute, counts in unflushed.items():
+                    pending = cls._unflushed.setdefault(minute, array("Q"))
+                    for pid, n in enumerate(counts):
+                        if n:
+                            cls._bump(pending, pid, n)
+                return 0
+            cls._stats["flushes"] += 1
+            return len(lines)
 
     @classmethod
-    def _sorted_map(cls, data: Dict[str, int]) -> List[Tuple[str, int]]:
+    def _restore(cls) -> None:
+        """Replays the flush file: read and parsed outside the lock, merged under it."""
+        if cls._restored:
+            return
+        rows = []
+        lines = 0
+        if cls._flush_path and os.path.exists(cls._flush_path):
+            try:
+                with open(cls._flush_path, encoding="utf-8") as fh:
+                    for line in fh:
+                        if not line.strip():
+                            continue
+                        lines += 1
+                        try:
+                            rows.append(json.loads(line))
+                        except ValueError:
+                            continue  # torn last line after a crash
+            except OSError:
+                logger.exception("analytics.restore_failed", extra={"path": cls._flush_path})
+        with cls._lock:
+            for row in rows:
+                minute = row.get("minute")
+                for recruiter_type, intent, n in row.get("counts", []):
+                    pid = cls._pair_id(recruiter_type, intent)
+                    if minute is None:
+                        # Compacted totals of minutes past retention
+                        cls._totals[pid] += int(n)
+                    else:
+                        cls._add_locked(int(minute), pid, int(n))
+            cls._expire_locked(int(time.time() // 60))
+            cls._file_lines = lines
+            cls._restored = True
+
+    # --- Reads ---
+
+    @classmethod
+    def _window_counts_locked(cls, since: float | None, until: float | None) -> array:
+        if since is None and until is None:
+            return array("Q", cls._totals)
+        lo = int(since // 60) if since is not None else None
+        hi = int(until // 60) if until is not None else None
+        out = array("Q", bytes(8 * len(cls._pairs)))
+        for minute, counts in cls._buckets.items():
+            if lo is not None and minute < lo:
+                continue
+            if hi is not None and minute > hi:
+                break
+            for pid, n in enumerate(counts):
+                if n:
+                    out[pid] += n
+        return out
+
+    @staticmethod
+    def _sorted_map(data: Dict[str, int]) -> List[Tuple[str, int]]:
         return sorted(data.items(), key=lambda x: x[1], reverse=True)
 
     @classmethod
-    def get_top_trends(cls) -> List[str]:
+    def get_analytics(cls, since: float | None = None, until: float | None = None) -> Dict[str, object]:
+        """
+        Totals for [since, until] (epoch seconds, minute resolution, either
+        end optional). Without a window the all-time totals are returned;
+        windows only reach back ANALYTICS_RETENTION_MINUTES.
+        """
+        if cls._thread is None:
+            cls._start()
+        cls.aggregate()
+        with cls._lock:
+            counts = cls._window_counts_locked(since, until)
+            pairs = list(cls._pairs)
+
+        intent_counts: Dict[str, int] = {}
+        recruiter_types: Dict[str, int] = {}
+        recruiter_intent_map: Dict[str, Dict[str, int]] = {}
+        for pid, n in enumerate(counts):
+            if not n:
+                continue
+            recruiter_type, intent = pairs[pid]
+            intent_counts[intent] = intent_counts.get(intent, 0) + n
+            recruiter_types[recruiter_type] = recruiter_types.get(recruiter_type, 0) + n
+            recruiter_intent_map.setdefault(recruiter_type, {})[intent] = n
+
+        return {
+            "total_interactions": sum(counts),
+            "intent_counts": cls._sorted_map(intent_counts),
+            "recruiter_types": cls._sorted_map(recruiter_types),
+            "recruiter_intent_map": recruiter_intent_map,
+            "top_trends": cls.get_top_trends(recruiter_intent_map),
+            "window": {"since": since, "until": until},
+        }
+
+    @classmethod
+    def get_top_trends(cls, recruiter_intent_map: Dict[str, Dict[str, int]] | None = None) -> List[str]:
+        if recruiter_intent_map is None:
+            recruiter_intent_map = cls.get_analytics()["recruiter_intent_map"]
         trends: List[str] = []
-        for recruiter_type, intents in cls._recruiter_intent_map.items():
+        for recruiter_type, intents in recruiter_intent_map.items():
             if not intents:
                 continue
             top_intent, count = max(intents.items(), key=lambda x: x[1])
@@ -45,12 +343,17 @@ class AnalyticsEngine:
         return trends
 
     @classmethod
-    def get_analytics(cls) -> Dict[str, object]:
+    def stats(cls) -> Dict[str, object]:
         with cls._lock:
             return {
-                "total_interactions": cls._total_interactions,
-                "intent_counts": cls._sorted_map(cls._intent_counts),
-                "recruiter_types": cls._sorted_map(cls._recruiter_types),
-                "recruiter_intent_map": cls._recruiter_intent_map,
-                "top_trends": cls.get_top_trends(),
+                **cls._stats,
+                "buffered": len(cls._buffer),
+                "buckets": len(cls._buckets),
+                "pairs": len(cls._pairs),
+                "unflushed_minutes": len(cls._unflushed),
+                "file_lines": cls._file_lines,
+                "flush_path": cls._flush_path,
             }
+
+
+SystemMonitor().register_component("analytics", AnalyticsEngine.stats)
@@ -0,0 +1,114 @@
+from array import array
+from collections import OrderedDict, deque
+
+import pytest
+
+from app.v3.analytics import analytics_engine
+from app.v3.analytics.analytics_engine import AnalyticsEngine, parse_time_bound
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    # Fresh class state; no aggregator thread, aggregation is driven by hand
+    for name, value in {
+        "_buffer": deque(),
+        "_pairs": [],
+        "_pair_ids": {},
+        "_buckets": OrderedDict(),
+        "_totals": array("Q"),
+        "_unflushed": {},
+        "_thread": object(),
+        "_restored": False,
+        "_file_lines": 0,
+        "_flush_path": str(tmp_path / "analytics.jsonl"),
+        "_stats": {"aggregated": 0, "flushes": 0, "flush_errors": 0, "compactions": 0},
+    }.items():
+        monkeypatch.setattr(AnalyticsEngine, name, value)
+    return AnalyticsEngine
+
+
+def _track_at(monkeypatch, ts, intent, recruiter_type):
+    monkeypatch.setattr(analytics_engine.time, "time", lambda: ts)
+    AnalyticsEngine.track_interaction(intent, recruiter_type)
+
+
+def test_windows_are_answered_from_minute_buckets(engine, monkeypatch):
+    t0 = 1_800_000_000.0
+    _track_at(monkeypatch, t0, "skills_query", "TECH_LEAD")
+    _track_at(monkeypatch, t0 + 5, "skills_query", "TECH_LEAD")
+    _track_at(monkeypatch, t0 + 120, "project_query", "HR_MANAGER")
+    _track_at(monkeypatch, t0 + 600, "skills_query", "HR_MANAGER")
+    assert len(engine._buffer) == 4  # nothing aggregated on the request path
+
+    everything = engine.get_analytics()
+    assert everything["total_interactions"] == 4
+    assert everything["intent_counts"] == [("skills_query", 3), ("project_query", 1)]
+    assert dict(everything["recruiter_types"]) == {"HR_MANAGER": 2, "TECH_LEAD": 2}
+
+    window = engine.get_analytics(since=t0 + 60, until=t0 + 300)
+    assert window["total_interactions"] == 1
+    assert window["recruiter_intent_map"] == {"HR_MANAGER": {"project_query": 1}}
+    assert window["top_trends"] == ["Top Interest for HR_MANAGER: project_query (1 requests)"]
+
+
+def test_flush_appends_and_restart_replays(engine, monkeypatch):
+    now = 1_800_000_000.0
+    _track_at(monkeypatch, now, "skills_query", "TECH_LEAD")
+    engine.aggregate()
+    assert engine.flush() == 1
+    _track_at(monkeypatch, now + 1, "skills_query", "TECH_LEAD")
+    engine.aggregate()
+    assert engine.flush() == 1  # only the new count, appended
+
+    lines = open(engine._flush_path).read().splitlines()
+    assert len(lines) == 2
+
+    # Simulated restart: empty state, same file
+    for name, value in {
+        "_pairs": [],
+        "_pair_ids": {},
+        "_buckets": OrderedDict(),
+        "_totals": array("Q"),
+        "_restored": False,
+    }.items():
+        monkeypatch.setattr(AnalyticsEngine, name, value)
+    engine._restore()
+    assert engine.get_analytics(since=now - 60)["intent_counts"] == [("skills_query", 2)]
+    assert engine._file_lines == 2
+
+
+def test_flush_compacts_file_to_retained_buckets(engine, monkeypatch):
+    monkeypatch.setattr(AnalyticsEngine, "_retention_minutes", 2)
+    monkeypatch.setattr(AnalyticsEngine, "_compact_min_lines", 4)
+    engine._restore()  # empty file; compaction waits for the replay
+    t0 = 1_800_000_000.0
+    for minute in range(20):
+        _track_at(monkeypatch, t0 + minute * 60, "skills_query", "TECH_LEAD")
+        engine.aggregate()
+        engine.flush()
+
+    lines = open(engine._flush_path).read().splitlines()
+    assert len(lines) <= 2 * len(engine._buckets)  # not one line per minute
+    assert engine._stats["compactions"] > 0
+    assert len(engine._buckets) == 3
+
+    # Restart: retained minutes come back as buckets, expired ones as totals
+    for name, value in {
+        "_pairs": [],
+        "_pair_ids": {},
+        "_buckets": OrderedDict(),
+        "_totals": array("Q"),
+        "_restored": False,
+    }.items():
+        monkeypatch.setattr(AnalyticsEngine, name, value)
+    engine._restore()
+    assert engine.get_analytics()["total_interactions"] == 20
+    assert engine.get_analytics(since=t0 + 17 * 60)["total_interactions"] == 3
+
+
+def test_parse_time_bound():
+    assert parse_time_bound(None) is None
+    assert parse_time_bound("1800000000") == 1_800_000_000.0
+    assert parse_time_bound("2027-01-15T08:00:00Z") == parse_time_bound("2027-01-15T08:00:00")
+    with pytest.raises(ValueError):
+        parse_time_bound("yesterday")
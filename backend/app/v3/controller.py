@@ -3,8 +3,9 @@ Chat Controller (v3)
 Orchestrates intent -> context -> strategy -> rules -> data -> LLM polish.
 """
 
+import asyncio
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 import logging
 import time
 import os
@@ -14,12 +15,16 @@ from app.v3.layers.intent_detection import detect_intent, rank_intents
 from app.v3.layers.context_manager import ContextManager
 from app.v3.layers.strategy_engine import select_strategy
 from app.v3.layers.domain_rules import run_rules
-from app.v3.layers.llm_polish import polish_response
+from app.v3.layers.llm_polish import polish_response, stream_polish_response
 from app.v3.layers.entity_extraction import extract_entities
 from app.v3.persona.persona_engine import apply_dynamic_persona
 from app.v3.persona.recruiter_classifier import RecruiterClassifier
 from app.v3.psychology.psychology_engine import apply_psychology_layer
 from app.v3.analytics.analytics_engine import AnalyticsEngine
+from app.v3.system.deadline import Deadline, current_deadline, start_deadline
+from app.v3.system.observability import SystemMonitor
+from app.v3.system.tracing import span, stage, start_trace
+from app.v3.data.data_access import DataAccess
 from app.v4.state.session_manager import SessionManager
 
 
@@ -28,6 +33,8 @@ class ChatRequest:
     question: str
     session_id: str | None = None
     metadata: Dict[str, Any] | None = None
+    # Time budget for the whole request; None uses CHAT_DEADLINE_MS
+    deadline_ms: int | None = None
 
 
 @dataclass
@@ -38,6 +45,7 @@ class ChatResponse:
     confidence_score: float
     evidence: Any
     debug: Optional[Dict[str, Any]] = None
+    timing: Optional[Dict[str, Any]] = None
 
 
 logger = logging.getLogger("portfolio.v3")
@@ -46,6 +54,26 @@ if not logger.handlers:
 
 INTENT_CONFIDENCE_THRESHOLD = 0.45
 
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+CHAT_BATCH_MAX_ITEMS = _env_int("CHAT_BATCH_MAX_ITEMS", 50)
+CHAT_BATCH_LLM_CONCURRENCY = max(1, _env_int("CHAT_BATCH_LLM_CONCURRENCY", 4))
+
+def _out_of_time(deadline: Deadline | None, stage_name: str) -> bool:
+    """True (and recorded) when the request deadline has passed before `stage_name`."""
+    if deadline is None or not deadline.expired():
+        return False
+    deadline.exceed(stage_name)
+    SystemMonitor().record_deadline_exceeded(stage_name)
+    return True
+
+
 def _clamp(value: float, low: float, high: float) -> float:
     return max(low, min(value, high))
 
@@ -95,9 +123,44 @@ def _confidence_breakdown(
     }
 
 
-async def handle_chat(request: ChatRequest) -> ChatResponse:
+@dataclass
+class _ChatPlan:
     """
-    Entry point for v3 chat flow. Pure orchestration; no business logic here.
+    Everything decided before the LLM polish step. Shared by the blocking
+    and streaming entry points so both run the exact same pipeline.
+    """
+
+    request: ChatRequest
+    t0: float
+    debug_mode: bool
+    persona_mode: bool
+    intent: str
+    strategy: Dict[str, Any]
+    raw: Any
+    entities: Dict[str, Any]
+    polish_kwargs: Dict[str, Any]
+    timing: Dict[str, float]
+    pipeline_stage_results: Dict[str, Any]
+    intent_score: float = 0.0
+    latency_guard_triggered: bool = False
+    confidence_breakdown: Dict[str, float] | None = None
+    intent_overridden: bool = False
+    unknown_intent_triggered: bool = False
+    persona_transform_ms: float | None = None
+    recruiter_type_detected: str = "unknown"
+    persona_variant_used: str | None = None
+    psychology_layer_used: bool = False
+    psychology_profile: str | None = None
+    evidence_ranking_applied: bool = False
+    # Only the regular (entities + LLM policy) branch reports polish timing
+    track_polish: bool = False
+    deadline: Deadline | None = None
+
+
+async def _plan_chat(request: ChatRequest, ctx: Dict[str, Any] | None = None) -> _ChatPlan:
+    """
+    Runs every stage up to (not including) the LLM polish.
+    A batch passes the session context it loaded once for all its items.
     """
     meta = request.metadata or {}
     debug_mode = bool(meta.get("debug"))
@@ -122,17 +185,20 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
     psychology_layer_used = False
     psychology_profile: str | None = None
     evidence_ranking_applied = False
+    track_polish = False
+    deadline = current_deadline()
 
     t0 = time.monotonic()
-    ctx = ContextManager.load(request.session_id)
+    if ctx is None:
+        with stage("context_load", timing):
+            ctx = await ContextManager.aload(request.session_id)
 
     try:
         # Intent detection with ranking + fallback mapping
-        t_intent_start = time.monotonic()
-        ranked = rank_intents(request.question, ctx)
+        with stage("intent", timing):
+            ranked = rank_intents(request.question, ctx)
         intent = ranked[0][0] if ranked else "unknown_intent"
         intent_score = ranked[0][1] if ranked else 0.0
-        timing["intent_ms"] = round((time.monotonic() - t_intent_start) * 1000, 2)
         pipeline_stage_results["intent_detected"] = {"intent": intent, "score": intent_score}
 
         if intent_score < INTENT_CONFIDENCE_THRESHOLD:
@@ -142,33 +208,38 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
             pipeline_stage_results["intent_detected"] = {"intent": intent, "score": intent_score}
 
         # Strategy selection
-        t_strategy_start = time.monotonic()
-        strategy = select_strategy(intent, ctx)
-        timing["strategy_ms"] = round((time.monotonic() - t_strategy_start) * 1000, 2)
+        with stage("strategy", timing):
+            strategy = select_strategy(intent, ctx)
         pipeline_stage_results["strategy_selected"] = strategy.get("strategy_type")
 
         # Rules
-        t_rules_start = time.monotonic()
-        raw = run_rules(request.question, intent, strategy, ctx)
-        timing["rules_ms"] = round((time.monotonic() - t_rules_start) * 1000, 2)
+        with stage("rules", timing):
+            raw = run_rules(request.question, intent, strategy, ctx)
         pipeline_stage_results["rules_result_length"] = len(raw.answer or "")
 
         # Intent fallback ranking if low confidence
-        if intent != "unknown_intent" and intent_score < 0.55 and ranked and len(ranked) > 1:
+        if (
+            intent != "unknown_intent"
+            and intent_score < 0.55
+            and ranked
+            and len(ranked) > 1
+            and not _out_of_time(deadline, "fallback_rerank")
+        ):
             best_raw = raw
             best_intent = intent
             best_strategy = strategy
             best_score = raw.confidence_score
             best_intent_score = intent_score
-            for candidate_intent, _score in ranked[1:3]:
-                candidate_strategy = select_strategy(candidate_intent, ctx)
-                candidate_raw = run_rules(request.question, candidate_intent, candidate_strategy, ctx)
-                if candidate_raw.confidence_score > best_score:
-                    best_raw = candidate_raw
-                    best_intent = candidate_intent
-                    best_strategy = candidate_strategy
-                    best_score = candidate_raw.confidence_score
-                    best_intent_score = _score
+            with stage("fallback_rerank", timing):
+                for candidate_intent, _score in ranked[1:3]:
+                    candidate_strategy = select_strategy(candidate_intent, ctx)
+                    candidate_raw = run_rules(request.question, candidate_intent, candidate_strategy, ctx)
+                    if candidate_raw.confidence_score > best_score:
+                        best_raw = candidate_raw
+                        best_intent = candidate_intent
+                        best_strategy = candidate_strategy
+                        best_score = candidate_raw.confidence_score
+                        best_intent_score = _score
             intent = best_intent
             strategy = best_strategy
             raw = best_raw
@@ -179,33 +250,35 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
 
         # Recruiter type with session memory
         user_id = request.session_id or "default_user"
-        recruiter_type_detected = RecruiterClassifier.classify(request.question)
-        session_manager = SessionManager()
-        session_manager.update_session(user_id, recruiter_type_detected)
-        final_type = session_manager.get_session(user_id) or recruiter_type_detected
+        with stage("recruiter", timing):
+            recruiter_type_detected = RecruiterClassifier.classify(request.question)
+            await SessionManager.aupdate_session(user_id, recruiter_type_detected)
+            final_type = await SessionManager.aget_session(user_id) or recruiter_type_detected
         recruiter_type_detected = final_type
 
         # Psychology layer (after rules, before persona)
-        AnalyticsEngine.track_interaction(intent, final_type)
+        with stage("analytics", timing):
+            AnalyticsEngine.track_interaction(intent, final_type)
         if intent != "unknown_intent":
-            raw.answer, raw.evidence, psychology_profile, psychology_layer_used = apply_psychology_layer(
-                raw.answer,
-                raw.evidence,
-                final_type,
-                intent,
-            )
+            with stage("psychology", timing):
+                raw.answer, raw.evidence, psychology_profile, psychology_layer_used = apply_psychology_layer(
+                    raw.answer,
+                    raw.evidence,
+                    final_type,
+                    intent,
+                )
             evidence_ranking_applied = psychology_layer_used
 
         # Persona mode (between rules and LLM)
         if persona_mode:
-            t_persona_start = time.monotonic()
-            raw.answer, persona_variant_used = apply_dynamic_persona(
-                raw.answer,
-                intent,
-                strategy.get("strategy_type"),
-                final_type,
-            )
-            persona_transform_ms = round((time.monotonic() - t_persona_start) * 1000, 2)
+            with stage("persona", timing):
+                raw.answer, persona_variant_used = apply_dynamic_persona(
+                    raw.answer,
+                    intent,
+                    strategy.get("strategy_type"),
+                    final_type,
+                )
+            persona_transform_ms = timing["persona_ms"]
 
         # Unknown intent: skip entities and LLM
         if intent == "unknown_intent":
@@ -219,17 +292,15 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
                 "entity_match_strength": 0.0,
                 "freshness_bonus": 0.0,
             }
-            final = await polish_response(
-                request.question,
-                raw,
-                intent=intent,
-                strategy=strategy["strategy_type"],
-                allow_llm=False,
-                recruiter_type=recruiter_type_detected,
-            )
+            polish_kwargs = {
+                "intent": intent,
+                "strategy": strategy["strategy_type"],
+                "allow_llm": False,
+                "recruiter_type": recruiter_type_detected,
+            }
             unknown_intent_triggered = True
-        # Latency guard (pre-LLM, pre-entities)
-        elif (time.monotonic() - t0) > 2.5:
+        # Latency guard (pre-LLM, pre-entities): the deadline is already spent
+        elif _out_of_time(deadline, "entities"):
             latency_guard_triggered = True
             entities = {}
             pipeline_stage_results["entities_found"] = {}
@@ -240,20 +311,17 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
                 entities=entities,
             )
             raw.confidence_score = confidence_breakdown["confidence"]
-            final = await polish_response(
-                request.question,
-                raw,
-                intent=intent,
-                strategy=strategy["strategy_type"],
-                allow_llm=False,
-                recruiter_type=recruiter_type_detected,
-            )
+            polish_kwargs = {
+                "intent": intent,
+                "strategy": strategy["strategy_type"],
+                "allow_llm": False,
+                "recruiter_type": recruiter_type_detected,
+            }
         else:
             # Entities (guarded)
             try:
-                t_entities_start = time.monotonic()
-                entities = extract_entities(request.question)
-                timing["entities_ms"] = round((time.monotonic() - t_entities_start) * 1000, 2)
+                with stage("entities", timing):
+                    entities = extract_entities(request.question)
                 pipeline_stage_results["entities_found"] = entities
             except Exception:
                 entities = {}
@@ -280,20 +348,13 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
                 or (strategy_type == "summary_strategy" and summary_request)
                 or raw_len >= long_answer_chars
             )
-            t_polish_start = time.monotonic()
-            final = await polish_response(
-                request.question,
-                raw,
-                intent=intent,
-                strategy=strategy_type,
-                allow_llm=allow_llm,
-                recruiter_type=recruiter_type_detected,
-            )
-            timing["polish_ms"] = round((time.monotonic() - t_polish_start) * 1000, 2)
-            pipeline_stage_results["llm_attempted"] = bool(final.llm_used) or (
-                final.llm_error_reason in {"timeout", "error"}
-            )
-            pipeline_stage_results["llm_success"] = bool(final.llm_used) and not final.llm_error
+            polish_kwargs = {
+                "intent": intent,
+                "strategy": strategy_type,
+                "allow_llm": allow_llm,
+                "recruiter_type": recruiter_type_detected,
+            }
+            track_polish = True
 
     except Exception as exc:
         logger.exception("v3.handle_chat.failed")
@@ -307,9 +368,9 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
         }
         entities = {}
         try:
-            raw_fallback = run_rules(request.question, intent, strategy, ctx)
+            raw = run_rules(request.question, intent, strategy, ctx)
         except Exception:
-            raw_fallback = type(
+            raw = type(
                 "RawAnswerFallback",
                 (),
                 {
@@ -320,31 +381,80 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
             )()
         confidence_breakdown = _confidence_breakdown(
             intent_score=0.0,
-            evidence=raw_fallback.evidence,
+            evidence=raw.evidence,
             question=request.question,
             entities={},
         )
-        raw_fallback.confidence_score = confidence_breakdown["confidence"]
-        final = await polish_response(
-            request.question,
-            raw_fallback,
-            intent=intent,
-            strategy=strategy["strategy_type"],
-            allow_llm=False,
-        )
+        raw.confidence_score = confidence_breakdown["confidence"]
+        polish_kwargs = {
+            "intent": intent,
+            "strategy": strategy["strategy_type"],
+            "allow_llm": False,
+        }
+        track_polish = False
         timing["error"] = str(exc)
 
-    ContextManager.update(
-        request.session_id,
-        current_page=meta.get("current_page"),
-        last_project_viewed=meta.get("last_project_viewed")
-        or (entities.get("projects") or [None])[0],
-        last_entities=entities,
+    return _ChatPlan(
+        request=request,
+        t0=t0,
+        debug_mode=debug_mode,
+        persona_mode=persona_mode,
         intent=intent,
-        question=request.question,
+        strategy=strategy,
+        raw=raw,
+        entities=entities,
+        polish_kwargs=polish_kwargs,
+        timing=timing,
+        pipeline_stage_results=pipeline_stage_results,
+        intent_score=intent_score,
+        latency_guard_triggered=latency_guard_triggered,
+        confidence_breakdown=confidence_breakdown,
+        intent_overridden=intent_overridden,
+        unknown_intent_triggered=unknown_intent_triggered,
+        persona_transform_ms=persona_transform_ms,
+        recruiter_type_detected=recruiter_type_detected,
+        persona_variant_used=persona_variant_used,
+        psychology_layer_used=psychology_layer_used,
+        psychology_profile=psychology_profile,
+        evidence_ranking_applied=evidence_ranking_applied,
+        track_polish=track_polish,
+        deadline=deadline,
     )
 
-    timing["total_ms"] = round((time.monotonic() - t0) * 1000, 2)
+
+async def _finish_chat(plan: _ChatPlan, final: Any, polish_ms: float) -> ChatResponse:
+    """
+    Records polish outcome, updates session context and builds the response.
+    """
+    request = plan.request
+    meta = request.metadata or {}
+    timing = plan.timing
+    pipeline_stage_results = plan.pipeline_stage_results
+    intent = plan.intent
+    strategy = plan.strategy
+    entities = plan.entities
+    confidence_breakdown = plan.confidence_breakdown
+
+    if plan.track_polish:
+        timing["polish_ms"] = round(polish_ms, 2)
+        pipeline_stage_results["llm_attempted"] = bool(final.llm_used) or (
+            final.llm_error_reason in {"timeout", "error"}
+        )
+        pipeline_stage_results["llm_success"] = bool(final.llm_used) and not final.llm_error
+
+    with stage("context_update", timing):
+        await ContextManager.aupdate(
+            request.session_id,
+            current_page=meta.get("current_page"),
+            last_project_viewed=meta.get("last_project_viewed")
+            or (entities.get("projects") or [None])[0],
+            last_entities=entities,
+            intent=intent,
+            question=request.question,
+        )
+
+    timing["total_ms"] = round((time.monotonic() - plan.t0) * 1000, 2)
+    SystemMonitor().record_stage_timings(timing)
     logger.info(
         "v3.chat",
         extra={
@@ -356,25 +466,27 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
     )
 
     debug_payload = None
-    if debug_mode:
+    if plan.debug_mode:
         debug_payload = {
             "timing_ms": timing,
             "llm_used": final.llm_used,
             "llm_error": final.llm_error,
             "llm_error_reason": final.llm_error_reason,
-            "persona_mode_used": persona_mode,
-            "persona_transform_ms": persona_transform_ms,
-            "recruiter_type_detected": recruiter_type_detected,
-            "persona_variant_used": persona_variant_used,
-            "psychology_layer_used": psychology_layer_used,
-            "psychology_profile": psychology_profile,
-            "evidence_ranking_applied": evidence_ranking_applied,
+            "persona_mode_used": plan.persona_mode,
+            "persona_transform_ms": plan.persona_transform_ms,
+            "recruiter_type_detected": plan.recruiter_type_detected,
+            "persona_variant_used": plan.persona_variant_used,
+            "psychology_layer_used": plan.psychology_layer_used,
+            "psychology_profile": plan.psychology_profile,
+            "evidence_ranking_applied": plan.evidence_ranking_applied,
             "llm_status": final.llm_status,
-            "intent_score": intent_score,
-            "intent_overridden": intent_overridden,
-            "unknown_intent_triggered": unknown_intent_triggered,
+            "intent_score": plan.intent_score,
+            "intent_overridden": plan.intent_overridden,
+            "unknown_intent_triggered": plan.unknown_intent_triggered,
             "intent_threshold": INTENT_CONFIDENCE_THRESHOLD,
-            "latency_guard_triggered": latency_guard_triggered,
+            "latency_guard_triggered": plan.latency_guard_triggered,
+            "deadline_exceeded": bool(plan.deadline and plan.deadline.exceeded_at),
+            "deadline": plan.deadline.snapshot() if plan.deadline else None,
             "pipeline_stage_results": pipeline_stage_results,
             "confidence_breakdown": {
                 "intent_score": (confidence_breakdown or {}).get("intent_score"),
@@ -391,4 +503,114 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
         confidence_score=final.confidence_score,
         evidence=final.evidence,
         debug=debug_payload,
+        timing=timing,
     )
+
+
+async def handle_chat(request: ChatRequest) -> ChatResponse:
+    """
+    Entry point for v3 chat flow. Pure orchestration; no business logic here.
+    """
+    # One data snapshot and one deadline for every stage of this request
+    with start_trace("chat", session_id=request.session_id) as root, start_deadline(
+        request.deadline_ms
+    ), DataAccess.pinned():
+        plan = await _plan_chat(request)
+        root.set(intent=plan.intent, strategy=plan.strategy["strategy_type"])
+        t_polish_start = time.monotonic()
+        with span("polish", allow_llm=bool(plan.polish_kwargs.get("allow_llm"))):
+            final = await polish_response(request.question, plan.raw, **plan.polish_kwargs)
+        polish_ms = (time.monotonic() - t_polish_start) * 1000
+        return await _finish_chat(plan, final, polish_ms)
+
+
+async def handle_chat_stream(request: ChatRequest) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of handle_chat. Yields, in order:
+      {"event": "answer", "data": rules answer + evidence, before any LLM work}
+      {"event": "token", "data": {"text": ...}} for each polished chunk (zero or more)
+      {"event": "final", "data": the same fields /chat returns}
+    """
+    with start_trace("chat_stream", session_id=request.session_id) as root, start_deadline(
+        request.deadline_ms
+    ), DataAccess.pinned():
+        plan = await _plan_chat(request)
+        root.set(intent=plan.intent, strategy=plan.strategy["strategy_type"])
+        yield {
+            "event": "answer",
+            "data": {
+                "answer": plan.raw.answer,
+                "evidence": plan.raw.evidence,
+                "intent": plan.intent,
+                "strategy": plan.strategy["strategy_type"],
+                "confidence_score": plan.raw.confidence_score,
+                "llm_pending": bool(plan.polish_kwargs.get("allow_llm")),
+            },
+        }
+
+        final = None
+        t_polish_start = time.monotonic()
+        with span("polish_stream", allow_llm=bool(plan.polish_kwargs.get("allow_llm"))):
+            async for chunk in stream_polish_response(request.question, plan.raw, **plan.polish_kwargs):
+                if chunk["type"] == "token":
+                    yield {"event": "token", "data": {"text": chunk["text"]}}
+                else:
+                    final = chunk["result"]
+        polish_ms = (time.monotonic() - t_polish_start) * 1000
+
+        response = await _finish_chat(plan, final, polish_ms)
+        yield {
+            "event": "final",
+            "data": {
+                "answer": response.answer,
+                "intent": response.intent,
+                "strategy": response.strategy,
+                "confidence_score": response.confidence_score,
+                "evidence": response.evidence,
+                "debug": response.debug,
+            },
+        }
+
+
+async def handle_chat_batch(requests: List[ChatRequest]) -> List[ChatResponse]:
+    """
+    Answers several questions for one session in a single call. The data
+    snapshot is pinned and the session context loaded once for the whole
+    batch; every item then runs the cheap stages in order, and the items
+    that qualify for LLM polish fan out concurrently, at most
+    CHAT_BATCH_LLM_CONCURRENCY at a time. Responses come back in request
+    order, each with its own stage timings (`timing`, plus `llm_wait_ms`
+    spent queued for an LLM slot). One deadline, the first request's, covers
+    the whole batch.
+    """
+    if not requests:
+        return []
+    session_id = requests[0].session_id
+    llm_slots = asyncio.Semaphore(CHAT_BATCH_LLM_CONCURRENCY)
+
+    async def polish(plan: _ChatPlan) -> tuple[Any, float]:
+        if not plan.polish_kwargs.get("allow_llm"):
+            t_start = time.monotonic()
+            final = await polish_response(plan.request.question, plan.raw, **plan.polish_kwargs)
+            return final, (time.monotonic() - t_start) * 1000
+        t_wait = time.monotonic()
+        async with llm_slots:
+            t_start = time.monotonic()
+            plan.timing["llm_wait_ms"] = round((t_start - t_wait) * 1000, 2)
+            with span("polish", allow_llm=True):
+                final = await polish_response(plan.request.question, plan.raw, **plan.polish_kwargs)
+        return final, (time.monotonic() - t_start) * 1000
+
+    with start_trace("chat_batch", session_id=session_id, items=len(requests)), start_deadline(
+        requests[0].deadline_ms
+    ), DataAccess.pinned():
+        context_timing: Dict[str, float] = {}
+        with stage("context_load", context_timing):
+            ctx = await ContextManager.aload(session_id)
+        plans = []
+        for request in requests:
+            plan = await _plan_chat(request, ctx)
+            plan.timing.update(context_timing)
+            plans.append(plan)
+        polished = await asyncio.gather(*(polish(plan) for plan in plans))
+        return [await _finish_chat(plan, final, polish_ms) for plan, (final, polish_ms) in zip(plans, polished)]
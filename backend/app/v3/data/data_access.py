@@ -1,25 +1,223 @@
 """
 Data Access Layer (v3).
 Loads content sources and returns structured domain models.
+
+Parsed content lives in one process-wide, read-only PortfolioSnapshot that
+every pipeline stage shares. The snapshot is swapped atomically, and only
+when a source file's mtime/size changed and its content hash differs.
 """
 
-from typing import Dict, Any
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import hashlib
+import json
+import logging
+import os
+from threading import Lock
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Mapping, Tuple
 
-from app.data_loader import load_json, load_markdown
+from app.data_loader import data_file_path
 from app.v3.models.project import ProjectModel
 from app.v3.models.skill import SkillModel
 from app.v3.models.experience import ExperienceModel
+from app.v3.system.observability import SystemMonitor
+
+
+SOURCE_FILES = (
+    "about.md",
+    "skills.json",
+    "projects.json",
+    "experience.json",
+    "education.json",
+    "certificates.json",
+    "contact.json",
+)
+
+logger = logging.getLogger("portfolio.v3.data")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshot:
+    version: int
+    digest: str
+    built_at: float
+    data: Mapping[str, Any]
+    raw: Mapping[str, Any]
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    _derived_lock: Any = field(default_factory=Lock, repr=False, compare=False)
+
+    def derive(self, name: str, builder: Callable[["PortfolioSnapshot"], Any]) -> Any:
+        """
+        Memoize an artifact computed from this snapshot (matchers, answer tables, ...).
+        Built once per snapshot version and dropped with it.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+
+def _file_signature(filename: str) -> Tuple[int, int]:
+    st = os.stat(data_file_path(filename))
+    return st.st_mtime_ns, st.st_size
+
+
+def _build_snapshot(version: int, contents: Dict[str, bytes]) -> PortfolioSnapshot:
+    raw: Dict[str, Any] = {}
+    for name, blob in contents.items():
+        text = blob.decode("utf-8")
+        raw[name] = text if name.endswith(".md") else json.loads(text)
+
+    data = {
+        "about": raw["about.md"],
+        "skills": SkillModel.from_json(raw["skills.json"]),
+        "projects": tuple(ProjectModel.from_json(p) for p in raw["projects.json"]),
+        "experience": tuple(ExperienceModel.from_json(e) for e in raw["experience.json"]),
+        "education": raw["education.json"],
+        "certificates": raw["certificates.json"],
+        "contact": raw["contact.json"],
+    }
+    digest = hashlib.sha256()
+    for name in SOURCE_FILES:
+        digest.update(name.encode("utf-8"))
+        digest.update(hashlib.sha256(contents[name]).digest())
+    return PortfolioSnapshot(
+        version=version,
+        digest=digest.hexdigest(),
+        built_at=time.time(),
+        data=MappingProxyType(data),
+        raw=MappingProxyType(raw),
+    )
+
+
+_PINNED: ContextVar[PortfolioSnapshot | None] = ContextVar("portfolio_snapshot", default=None)
 
 
 class DataAccess:
-    @staticmethod
-    def load_all() -> Dict[str, Any]:
-        return {
-            "about": load_markdown("about.md"),
-            "skills": SkillModel.from_json(load_json("skills.json")),
-            "projects": [ProjectModel.from_json(p) for p in load_json("projects.json")],
-            "experience": [ExperienceModel.from_json(e) for e in load_json("experience.json")],
-            "education": load_json("education.json"),
-            "certificates": load_json("certificates.json"),
-            "contact": load_json("contact.json"),
-        }
+    _lock = Lock()
+    _snapshot: PortfolioSnapshot | None = None
+    _signatures: Dict[str, Tuple[int, int]] = {}
+    _last_check_ts: float = 0.0
+    _check_interval_s: float = _env_float("DATA_SNAPSHOT_CHECK_SECONDS", 1.0)
+    _stats: Dict[str, Any] = {
+        "hits": 0,
+        "misses": 0,
+        "rebuilds": 0,
+        "content_unchanged": 0,
+        "build_errors": 0,
+        "last_build_ms": None,
+    }
+
+    @classmethod
+    def snapshot(cls) -> PortfolioSnapshot:
+        pinned = _PINNED.get()
+        if pinned is not None:
+            cls._stats["hits"] += 1
+            return pinned
+        current = cls._snapshot
+        if current is not None and (time.monotonic() - cls._last_check_ts) < cls._check_interval_s:
+            cls._stats["hits"] += 1
+            return current
+        return cls._refresh()
+
+    @classmethod
+    def load_all(cls) -> Mapping[str, Any]:
+        return cls.snapshot().data
+
+    @classmethod
+    @contextmanager
+    def pinned(cls) -> Iterator[PortfolioSnapshot]:
+        """
+        Pin the current snapshot for the enclosed block so every stage of one
+        request sees the same version, even if a rebuild lands mid-request.
+        """
+        snap = cls.snapshot()
+        token = _PINNED.set(snap)
+        try:
+            yield snap
+        finally:
+            _PINNED.reset(token)
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Force the next access to re-check source files."""
+        cls._last_check_ts = 0.0
+
+    @classmethod
+    def _refresh(cls) -> PortfolioSnapshot:
+        with cls._lock:
+            current = cls._snapshot
+            now = time.monotonic()
+            if current is not None and (now - cls._last_check_ts) < cls._check_interval_s:
+                cls._stats["hits"] += 1
+                return current
+
+            try:
+                signatures = {name: _file_signature(name) for name in SOURCE_FILES}
+            except OSError:
+                if current is None:
+                    raise
+                logger.exception("data_snapshot.stat_failed")
+                cls._last_check_ts = now
+                return current
+
+            cls._last_check_ts = now
+            if current is not None and signatures == cls._signatures:
+                cls._stats["hits"] += 1
+                return current
+
+            cls._stats["misses"] += 1
+            t0 = time.monotonic()
+            try:
+                contents = {}
+                for name in SOURCE_FILES:
+                    with open(data_file_path(name), "rb") as f:
+                        contents[name] = f.read()
+                version = (current.version + 1) if current else 1
+                candidate = _build_snapshot(version, contents)
+            except Exception:
+                cls._stats["build_errors"] += 1
+                if current is None:
+                    raise
+                logger.exception("data_snapshot.rebuild_failed")
+                return current
+
+            cls._signatures = signatures
+            if current is not None and candidate.digest == current.digest:
+                # Touched but not edited: keep the version (and its derived caches).
+                cls._stats["content_unchanged"] += 1
+                return current
+
+            cls._snapshot = candidate
+            cls._stats["rebuilds"] += 1
+            cls._stats["last_build_ms"] = round((time.monotonic() - t0) * 1000, 2)
+            return candidate
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        current = cls._snapshot
+        stats = dict(cls._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["version"] = current.version if current else None
+        stats["digest"] = current.digest[:12] if current else None
+        return stats
+
+
+SystemMonitor().register_component("data_snapshot", DataAccess.cache_stats)
@@ -0,0 +1,208 @@
+"""
+Static Sections (v3).
+Pre-serialized responses for the read-only section endpoints (/about,
+/skills, ...) and the /portfolio bundle of them: each body is encoded to
+JSON bytes once per data snapshot, together with gzip (and brotli, when
+installed) variants and a strong ETag, so a request only negotiates headers
+and writes bytes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import gzip
+import hashlib
+import json
+import os
+from threading import Lock
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from app.v3.data.data_access import DataAccess, PortfolioSnapshot
+from app.v3.system.observability import SystemMonitor
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+SECTION_CACHE_MAX_AGE = max(0, _env_int("SECTION_CACHE_MAX_AGE_SECONDS", 60))
+# Smaller bodies are not worth a compressed variant
+SECTION_COMPRESS_MIN_BYTES = _env_int("SECTION_COMPRESS_MIN_BYTES", 256)
+
+# Section name -> body, built from the snapshot's parsed sources
+SECTIONS: Dict[str, Callable[[PortfolioSnapshot], Any]] = {
+    "about": lambda snap: {"content": snap.raw["about.md"]},
+    "skills": lambda snap: snap.raw["skills.json"],
+    "projects": lambda snap: snap.raw["projects.json"],
+    "experience": lambda snap: snap.raw["experience.json"],
+    "education": lambda snap: snap.raw["education.json"],
+    "certificates": lambda snap: snap.raw["certificates.json"],
+    "contact": lambda snap: snap.raw["contact.json"],
+}
+
+
+def encode_json(content: Any) -> bytes:
+    """Same bytes as FastAPI's JSONResponse would render."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """Bytes of one section or bundle. `bodies` maps a content-coding to its bytes and ETag."""
+
+    etag_base: str
+    bodies: Mapping[str, Tuple[bytes, str]]
+
+    def matches(self, if_none_match: str) -> bool:
+        """True when If-None-Match names any variant (weak comparison, RFC 9110)."""
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"').split("-", 1)[0] == self.etag_base:
+                return True
+        return False
+
+
+def encode_body(body: bytes) -> EncodedBody:
+    base = hashlib.sha256(body).hexdigest()[:32]
+    bodies = {"identity": (body, f'"{base}"')}
+    if len(body) >= SECTION_COMPRESS_MIN_BYTES:
+        # mtime=0 keeps the gzip bytes (and so the ETag) identical across workers
+        bodies["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{base}-gzip"')
+        if brotli is not None:
+            bodies["br"] = (brotli.compress(body, quality=11), f'"{base}-br"')
+    return EncodedBody(etag_base=base, bodies=bodies)
+
+
+def _build_sections(snapshot: PortfolioSnapshot) -> Dict[str, EncodedBody]:
+    return {name: encode_body(encode_json(build(snapshot))) for name, build in SECTIONS.items()}
+
+
+def get_section(name: str) -> EncodedBody:
+    """Encoded section for the current snapshot; KeyError for unknown names."""
+    return DataAccess.snapshot().derive("static_sections", _build_sections)[name]
+
+
+def _bundle_cache(_snapshot: PortfolioSnapshot) -> Dict[Tuple[str, ...], EncodedBody]:
+    return {}
+
+
+_BUNDLE_LOCK = Lock()
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    `fields=skills,projects` -> the requested sections in SECTIONS order;
+    all of them when empty. HTTPException 400 for unknown names.
+    """
+    if not fields or not fields.strip():
+        return tuple(SECTIONS)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(SECTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in SECTIONS if name in requested)
+
+
+def get_bundle(names: Tuple[str, ...]) -> EncodedBody:
+    """
+    One body holding the given sections, keyed by name. Each projection is
+    encoded on first use and kept with the snapshot (at most 2^7 of them).
+    """
+    snapshot = DataAccess.snapshot()
+    bundles = snapshot.derive("portfolio_bundles", _bundle_cache)
+    bundle = bundles.get(names)
+    if bundle is None:
+        with _BUNDLE_LOCK:
+            bundle = bundles.get(names)
+            if bundle is None:
+                body = encode_json({name: SECTIONS[name](snapshot) for name in names})
+                bundle = bundles[names] = encode_body(body)
+    return bundle
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Best of br > gzip > identity that the client accepts (q > 0)."""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    for coding in ("br", "gzip"):
+        if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+
+_STATS_LOCK = Lock()
+_STATS: Dict[str, Any] = {"served": {}, "not_modified": 0}
+
+
+def _record(encoding: Optional[str]) -> None:
+    with _STATS_LOCK:
+        if encoding is None:
+            _STATS["not_modified"] += 1
+        else:
+            _STATS["served"][encoding] = _STATS["served"].get(encoding, 0) + 1
+
+
+def _stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        return {
+            "served": dict(_STATS["served"]),
+            "not_modified": _STATS["not_modified"],
+            "brotli": brotli is not None,
+            "max_age_s": SECTION_CACHE_MAX_AGE,
+        }
+
+
+SystemMonitor().register_component("static_sections", _stats)
+
+
+def section_response(name: str, request: Request) -> Response:
+    return encoded_response(get_section(name), request)
+
+
+def bundle_response(fields: Optional[str], request: Request) -> Response:
+    return encoded_response(get_bundle(parse_fields(fields)), request)
+
+
+def encoded_response(encoded: EncodedBody, request: Request) -> Response:
+    """200 with the best encoding the client accepts, or 304 when its ETag is current."""
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), encoded.bodies)
+    body, etag = encoded.bodies[encoding]
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={SECTION_CACHE_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and encoded.matches(if_none_match):
+        _record(None)
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    _record(encoding)
+    return Response(content=body, media_type="application/json", headers=headers)
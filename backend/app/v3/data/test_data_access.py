@@ -0,0 +1,53 @@
+import os
+import shutil
+
+from app.data_loader import data_file_path
+from app.v3.data import data_access
+from app.v3.data.data_access import DataAccess, SOURCE_FILES
+
+
+def _use_tmp_data(tmp_path, monkeypatch):
+    for name in SOURCE_FILES:
+        shutil.copy(data_file_path(name), tmp_path / name)
+    monkeypatch.setattr(data_access, "data_file_path", lambda name: tmp_path / name)
+    monkeypatch.setattr(DataAccess, "_snapshot", None)
+    monkeypatch.setattr(DataAccess, "_signatures", {})
+    monkeypatch.setattr(DataAccess, "_check_interval_s", 0.0)
+
+
+def test_snapshot_is_shared_until_content_changes(tmp_path, monkeypatch):
+    _use_tmp_data(tmp_path, monkeypatch)
+
+    first = DataAccess.snapshot()
+    assert DataAccess.snapshot() is first
+    assert DataAccess.load_all() is first.data
+
+    # Touch without editing: same version is kept
+    about = tmp_path / "about.md"
+    st = os.stat(about)
+    os.utime(about, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert DataAccess.snapshot() is first
+
+    about.write_text(about.read_text(encoding="utf-8") + "\nEdited.", encoding="utf-8")
+    second = DataAccess.snapshot()
+    assert second.version == first.version + 1
+    assert second.data["about"].endswith("Edited.")
+
+
+def test_snapshot_is_read_only():
+    data = DataAccess.load_all()
+    try:
+        data["projects"] = []
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("snapshot data must be immutable")
+    assert isinstance(data["projects"], tuple)
+
+
+def test_pinned_snapshot_survives_rebuild(tmp_path, monkeypatch):
+    _use_tmp_data(tmp_path, monkeypatch)
+    with DataAccess.pinned() as pinned:
+        (tmp_path / "about.md").write_text("changed", encoding="utf-8")
+        assert DataAccess.snapshot() is pinned
+    assert DataAccess.snapshot().version == pinned.version + 1
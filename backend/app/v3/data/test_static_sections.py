@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import httpx
+
+from app.data_loader import load_json, load_markdown
+from app.main import app
+from app.v3.data.static_sections import choose_encoding
+
+
+def _get(path, **headers):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+
+    return asyncio.run(run())
+
+
+def test_sections_match_the_source_files():
+    assert _get("/about", **{"Accept-Encoding": "identity"}).json() == {"content": load_markdown("about.md")}
+    for name in ("skills", "projects", "experience", "education", "certificates", "contact"):
+        response = _get(f"/{name}", **{"Accept-Encoding": "identity"})
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == load_json(f"{name}.json")
+
+
+def test_gzip_variant_and_conditional_get():
+    response = _get("/projects", **{"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert json.loads(response.content) == load_json("projects.json")  # httpx decoded it
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    not_modified = _get("/projects", **{"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    # The identity ETag validates the same representation state
+    plain = _get("/projects", **{"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert _get("/projects", **{"If-None-Match": f'W/{plain.headers["etag"]}'}).status_code == 304
+    assert _get("/projects", **{"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_choose_encoding():
+    available = {"identity": None, "gzip": None, "br": None}
+    assert choose_encoding("gzip, deflate, br", available) == "br"
+    assert choose_encoding("gzip, br;q=0", available) == "gzip"
+    assert choose_encoding("*", {"identity": None, "gzip": None}) == "gzip"
+    assert choose_encoding("", available) == "identity"
+
+
+def test_portfolio_bundle_and_projection():
+    full = _get("/portfolio", **{"Accept-Encoding": "gzip"})
+    assert full.status_code == 200
+    assert list(full.json()) == ["about", "skills", "projects", "experience", "education", "certificates", "contact"]
+    assert full.json()["skills"] == load_json("skills.json")
+    assert _get("/portfolio", **{"If-None-Match": full.headers["etag"]}).status_code == 304
+
+    projected = _get("/portfolio?fields=projects, about")
+    assert list(projected.json()) == ["about", "projects"]
+    assert projected.headers["etag"] != full.headers["etag"]
+    assert _get("/portfolio", **{"If-None-Match": projected.headers["etag"]}).status_code == 200
+
+    assert _get("/portfolio?fields=about,salary").status_code == 400
@@ -1,37 +1,98 @@
 """
 Context Manager (v3).
 Stores and retrieves session context (page, intents, summary, etc.).
+`aload`/`aupdate` are for the event loop: they read the session backend off
+it. `load`/`update` read it on the calling thread.
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, Any, List
+from collections import deque
+from dataclasses import dataclass, field, fields
+import os
+from typing import Deque, Dict, Any
 
+from app.v3.system.observability import SystemMonitor
+from app.v4.state.bounded_store import BoundedStore
+from app.v4.state.session_backend import ReadThroughStore, get_session_backend, session_fresh_seconds
 
-@dataclass
+RECENT_INTENTS_MAX = 5
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+@dataclass(slots=True)
 class ContextState:
     session_id: str | None = None
     current_page: str | None = None
     last_project_viewed: str | None = None
-    recent_intents: List[str] = field(default_factory=list)
+    recent_intents: Deque[str] = field(default_factory=lambda: deque(maxlen=RECENT_INTENTS_MAX))
     conversation_summary: str | None = None
     last_entities: Dict[str, Any] | None = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["recent_intents"] = list(self.recent_intents)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ContextState":
+        state = cls(**{f.name: data.get(f.name) for f in fields(cls) if f.name != "recent_intents"})
+        state.recent_intents.extend(data.get("recent_intents") or [])
+        return state
 
-_STORE: Dict[str, ContextState] = {}
+
+_BACKEND, _WRITER = get_session_backend()
+_STORE: ReadThroughStore[ContextState] = ReadThroughStore(
+    "context",
+    cache=BoundedStore(
+        max_entries=_env_int("CONTEXT_STORE_MAX_ENTRIES", 10000),
+        idle_ttl_seconds=_env_int("CONTEXT_STORE_IDLE_TTL_SECONDS", 3600),
+    ),
+    backend=_BACKEND,
+    writer=_WRITER,
+    encode=ContextState.to_dict,
+    decode=ContextState.from_dict,
+    fresh_seconds=session_fresh_seconds(),
+)
+SystemMonitor().register_component("context_store", _STORE.stats)
 
 
 class ContextManager:
     @staticmethod
     def load(session_id: str | None) -> Dict[str, Any]:
         if not session_id:
-            return ContextState().__dict__
-        if session_id not in _STORE:
-            _STORE[session_id] = ContextState(session_id=session_id)
-        return _STORE[session_id].__dict__
+            return ContextState().to_dict()
+        return _STORE.get_or_create(session_id, lambda: ContextState(session_id=session_id)).to_dict()
+
+    @staticmethod
+    async def aload(session_id: str | None) -> Dict[str, Any]:
+        if not session_id:
+            return ContextState().to_dict()
+        state = await _STORE.aget_or_create(session_id, lambda: ContextState(session_id=session_id))
+        return state.to_dict()
 
     @staticmethod
-    def update(
-        session_id: str | None,
+    def update(session_id: str | None, **changes: Any) -> Dict[str, Any]:
+        if not session_id:
+            return ContextState().to_dict()
+        state = _STORE.get_or_create(session_id, lambda: ContextState(session_id=session_id))
+        return ContextManager._apply(session_id, state, **changes)
+
+    @staticmethod
+    async def aupdate(session_id: str | None, **changes: Any) -> Dict[str, Any]:
+        if not session_id:
+            return ContextState().to_dict()
+        state = await _STORE.aget_or_create(session_id, lambda: ContextState(session_id=session_id))
+        return ContextManager._apply(session_id, state, **changes)
+
+    @staticmethod
+    def _apply(
+        session_id: str,
+        state: ContextState,
         *,
         current_page: str | None = None,
         last_project_viewed: str | None = None,
@@ -39,10 +100,6 @@ class ContextManager:
         intent: str | None = None,
         question: str | None = None,
     ) -> Dict[str, Any]:
-        if not session_id:
-            return ContextState().__dict__
-        state = _STORE.get(session_id) or ContextState(session_id=session_id)
-
         if current_page:
             state.current_page = current_page
         if last_project_viewed:
@@ -51,10 +108,9 @@ class ContextManager:
             state.last_entities = last_entities
         if intent:
             state.recent_intents.append(intent)
-            state.recent_intents = state.recent_intents[-5:]
         if question:
             # Simple rolling summary (placeholder for real summarizer)
             state.conversation_summary = question
 
-        _STORE[session_id] = state
-        return state.__dict__
+        _STORE.save(session_id, state)
+        return state.to_dict()
@@ -4,9 +4,12 @@ Produces evidence-backed answers from structured domain models.
 """
 
 from dataclasses import dataclass
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 from app.v3.data.data_access import DataAccess
+from app.v3.layers.intent_detection import INTENT_SPEC
+from app.v3.layers.strategy_engine import STRATEGY_TYPES
+from app.v3.system.tracing import traced
 
 
 @dataclass
@@ -289,13 +292,18 @@ def handle_unknown_intent(context: Dict[str, Any] | None = None) -> RawAnswer:
     )
 
 
-def run_rules(question: str, intent: str, strategy: Dict[str, Any], context: Dict[str, Any]) -> RawAnswer:
-    data = DataAccess.load_all()
-    if intent == "unknown_intent":
-        return handle_unknown_intent(context)
-    evidence = _intent_evidence(data, intent)
-    strategy_type = strategy.get("strategy_type", "summary_strategy")
-    entities = (context or {}).get("last_entities") or {}
+def _strategy_answer(
+    data: Dict[str, Any],
+    intent: str,
+    strategy_type: str,
+    project_title: str | None,
+    tech: str | None,
+) -> Tuple[str, List[Dict[str, Any]] | None]:
+    """
+    Answer text for (intent, strategy, matched entity), plus an evidence list
+    that replaces the intent evidence (None keeps it). Question-independent.
+    """
+    evidence_override = None
 
     # Strategy-driven responses
     if strategy_type == "comparison_strategy":
@@ -307,8 +315,7 @@ def run_rules(question: str, intent: str, strategy: Dict[str, Any], context: Dic
             "Confidence: Medium (based on portfolio data only)."
         )
     elif strategy_type == "evidence_strategy":
-        if intent == "project_query" and entities.get("projects"):
-            project_title = entities["projects"][0]
+        if intent == "project_query" and project_title is not None:
             project = next((p for p in data["projects"] if p.title == project_title), None)
             if project:
                 answer = (
@@ -317,7 +324,7 @@ def run_rules(question: str, intent: str, strategy: Dict[str, Any], context: Dic
                     f"Summary: {project.description}\n"
                     f"Key features: " + "; ".join(project.key_features)
                 )
-                evidence = [
+                evidence_override = [
                     {
                         "source": "projects",
                         "id": project.id,
@@ -330,9 +337,7 @@ def run_rules(question: str, intent: str, strategy: Dict[str, Any], context: Dic
             else:
                 answer = "Project details are available in the portfolio data."
         elif intent == "skills_query":
-            tech_hits = _find_tech_mentions(question, data)
-            if tech_hits:
-                tech = tech_hits[0]
+            if tech is not None:
                 projects_using = [
                     p.title for p in data["projects"] if tech in p.tech_stack
                 ]
@@ -366,6 +371,45 @@ def run_rules(question: str, intent: str, strategy: Dict[str, Any], context: Dic
     else:
         answer = "Here is a structured portfolio summary based on your request."
 
+    return answer, evidence_override
+
+
+def _matched_entities(
+    question: str, intent: str, strategy_type: str, context: Dict[str, Any], data: Dict[str, Any]
+) -> Tuple[str | None, str | None]:
+    """
+    The (project title, tech) that _strategy_answer depends on, if any.
+    """
+    if strategy_type != "evidence_strategy":
+        return None, None
+    if intent == "project_query":
+        entities = (context or {}).get("last_entities") or {}
+        if entities.get("projects"):
+            return entities["projects"][0], None
+        return None, None
+    if intent == "skills_query":
+        tech_hits = _find_tech_mentions(question, data)
+        return None, (tech_hits[0] if tech_hits else None)
+    return None, None
+
+
+def _run_rules_uncached(
+    question: str, intent: str, strategy: Dict[str, Any], context: Dict[str, Any]
+) -> RawAnswer:
+    """
+    Reference rules engine. run_rules serves the same results from the
+    precomputed answer table and falls back here for unknown combinations.
+    """
+    data = DataAccess.load_all()
+    if intent == "unknown_intent":
+        return handle_unknown_intent(context)
+    evidence = _intent_evidence(data, intent)
+    strategy_type = strategy.get("strategy_type", "summary_strategy")
+    project_title, tech = _matched_entities(question, intent, strategy_type, context, data)
+    answer, evidence_override = _strategy_answer(data, intent, strategy_type, project_title, tech)
+    if evidence_override is not None:
+        evidence = evidence_override
+
     if not evidence:
         evidence = _fallback_evidence(question, data)
     evidence = _ensure_min_evidence(evidence, intent, data)
@@ -376,3 +420,133 @@ def run_rules(question: str, intent: str, strategy: Dict[str, Any], context: Dic
         evidence=evidence,
         confidence_score=confidence_score,
     )
+
+
+# --- Precomputed answer table ---
+
+RULE_INTENTS = tuple(rule.intent for rule in INTENT_SPEC)
+_MISSING_PROJECT = object()
+
+
+@dataclass(frozen=True)
+class AnswerTemplate:
+    """
+    Frozen result of the rules engine for one (intent, strategy, entity) key.
+    Only evidence fallback (when the intent has none) and confidence depend
+    on the question, and both are cheap to apply per request. Evidence dicts
+    are shared between requests and must be treated as read-only.
+    """
+
+    intent: str
+    answer: str
+    evidence: Tuple[Dict[str, Any], ...]
+    # Lowercased str() of each evidence item, newline-joined for _match_strength
+    evidence_text: str
+    needs_fallback: bool
+    # _ensure_min_evidence result when the question-driven fallback finds nothing
+    empty_fallback_evidence: Tuple[Dict[str, Any], ...]
+
+    def render(self, question: str, data: Dict[str, Any]) -> RawAnswer:
+        if self.needs_fallback:
+            fallback = _fallback_evidence(question, data)
+            if fallback:
+                evidence = _ensure_min_evidence(fallback, self.intent, data)
+            else:
+                evidence = list(self.empty_fallback_evidence)
+            confidence_score = _confidence_score(question, evidence, self.intent)
+        else:
+            evidence = list(self.evidence)
+            confidence_score = _template_confidence(question, self.evidence_text, self.intent)
+        return RawAnswer(answer=self.answer, evidence=evidence, confidence_score=confidence_score)
+
+
+def _template_confidence(question: str, evidence_text: str, intent: str) -> float:
+    # Same arithmetic as _confidence_score for a non-empty evidence list
+    words = question.lower().split()
+    match = 1.0 if any(word in evidence_text for word in words) else 0.3
+    intent_bonus = 0.2 if intent in {"project_query", "experience_query", "skills_query"} else 0.1
+    q = question.lower()
+    recency = 0.2 if any(k in q for k in ["recent", "latest", "current"]) else 0.0
+    score = min(1.0, 0.4 + match * 0.3 + intent_bonus + recency)
+    return round(score, 2)
+
+
+def _make_template(
+    data: Dict[str, Any], intent: str, strategy_type: str, project_title: str | None, tech: str | None
+) -> AnswerTemplate:
+    evidence = _intent_evidence(data, intent)
+    answer, evidence_override = _strategy_answer(data, intent, strategy_type, project_title, tech)
+    if evidence_override is not None:
+        evidence = evidence_override
+    needs_fallback = not evidence
+    if not needs_fallback:
+        evidence = _ensure_min_evidence(evidence, intent, data)
+    return AnswerTemplate(
+        intent=intent,
+        answer=answer,
+        evidence=tuple(evidence),
+        evidence_text="\n".join(str(ev).lower() for ev in evidence),
+        needs_fallback=needs_fallback,
+        empty_fallback_evidence=tuple(_ensure_min_evidence([], intent, data)),
+    )
+
+
+def _tech_candidates(data: Dict[str, Any]) -> List[str]:
+    skills = data["skills"]
+    return (
+        skills.backend
+        + skills.frontend
+        + skills.tools_platforms
+        + skills.programming_languages.get("primary", [])
+        + skills.programming_languages.get("core", [])
+    )
+
+
+def build_answer_table(data: Dict[str, Any]) -> Dict[Tuple[str, str, Any], AnswerTemplate]:
+    """
+    Materializes every reachable (intent, strategy_type, entity) combination.
+    The entity slot is a project title, a tech name, _MISSING_PROJECT or None.
+    """
+    table: Dict[Tuple[str, str, Any], AnswerTemplate] = {}
+    titles = [p.title for p in data["projects"]]
+    techs = _tech_candidates(data)
+    for intent in RULE_INTENTS:
+        for strategy_type in STRATEGY_TYPES:
+            table[(intent, strategy_type, None)] = _make_template(data, intent, strategy_type, None, None)
+    # A context project that is no longer in the catalogue
+    table[("project_query", "evidence_strategy", _MISSING_PROJECT)] = _make_template(
+        data, "project_query", "evidence_strategy", "", None
+    )
+    for title in titles:
+        table[("project_query", "evidence_strategy", title)] = _make_template(
+            data, "project_query", "evidence_strategy", title, None
+        )
+    for tech in techs:
+        table[("skills_query", "evidence_strategy", tech)] = _make_template(
+            data, "skills_query", "evidence_strategy", None, tech
+        )
+    return table
+
+
+def _snapshot_answer_table(snapshot) -> Dict[Tuple[str, str, Any], AnswerTemplate]:
+    return build_answer_table(snapshot.data)
+
+
+@traced("domain_rules.run_rules")
+def run_rules(question: str, intent: str, strategy: Dict[str, Any], context: Dict[str, Any]) -> RawAnswer:
+    if intent == "unknown_intent":
+        return handle_unknown_intent(context)
+    snapshot = DataAccess.snapshot()
+    data = snapshot.data
+    table = snapshot.derive("rules_answer_table", _snapshot_answer_table)
+    strategy_type = strategy.get("strategy_type", "summary_strategy")
+
+    project_title, tech = _matched_entities(question, intent, strategy_type, context, data)
+    if project_title is not None:
+        entity = project_title if ("project_query", strategy_type, project_title) in table else _MISSING_PROJECT
+    else:
+        entity = tech
+    template = table.get((intent, strategy_type, entity))
+    if template is None:
+        return _run_rules_uncached(question, intent, strategy, context)
+    return template.render(question, data)
@@ -1,69 +1,90 @@
 """
 Entity Extraction (v3).
 Detects project names, tech stack mentions, role types, and domain keywords.
+
+All catalogue terms are compiled into one word-boundary-aware automaton per
+data snapshot, so a question is scanned once regardless of catalogue size.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+
+from app.v3.data.data_access import DataAccess, PortfolioSnapshot
+from app.v3.text.automaton import MultiPatternMatcher
+from app.v3.system.tracing import traced
+
+
+ROLE_KEYWORDS = ["backend", "frontend", "full stack", "fullstack", "devops", "data", "ai"]
 
-from app.v3.data.data_access import DataAccess
+ENTITY_CATEGORIES = ("projects", "tech_stack", "roles", "domains")
 
 
 def _normalize(text: str) -> str:
     return text.lower().strip()
 
 
-def extract_entities(question: str) -> Dict[str, Any]:
-    q = _normalize(question or "")
-    data = DataAccess.load_all()
-
-    projects = []
-    tech_stack = []
-    roles = []
-    domains = []
+def _catalogue_terms(data: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """
+    (category, value, search term) in the order results are reported.
+    """
+    terms: List[Tuple[str, str, str]] = []
 
     # Project names + domains
     for p in data.get("projects", []):
-        if _normalize(p.title) in q or _normalize(p.id) in q:
-            projects.append(p.title)
-        if p.domain and _normalize(p.domain) in q:
-            domains.append(p.domain)
-
+        terms.append(("projects", p.title, p.title))
+        terms.append(("projects", p.title, p.id))
+        if p.domain:
+            terms.append(("domains", p.domain, p.domain))
         for tech in p.tech_stack:
-            if _normalize(tech) in q:
-                tech_stack.append(tech)
+            terms.append(("tech_stack", tech, tech))
 
     # Skills tech stack mentions
     skills = data.get("skills")
     if skills:
         for tech in skills.backend + skills.frontend + skills.tools_platforms:
-            if _normalize(tech) in q:
-                tech_stack.append(tech)
+            terms.append(("tech_stack", tech, tech))
 
     # Role types from experience
     for e in data.get("experience", []):
-        if e.role and _normalize(e.role) in q:
-            roles.append(e.role)
+        if e.role:
+            terms.append(("roles", e.role, e.role))
 
     # Heuristic role keywords
-    role_keywords = ["backend", "frontend", "full stack", "fullstack", "devops", "data", "ai"]
-    for rk in role_keywords:
-        if rk in q:
-            roles.append(rk)
-
-    # Deduplicate while preserving order
-    def dedupe(items: List[str]) -> List[str]:
-        seen = set()
-        out = []
-        for item in items:
-            key = _normalize(item)
-            if key not in seen:
-                seen.add(key)
-                out.append(item)
-        return out
-
-    return {
-        "projects": dedupe(projects),
-        "tech_stack": dedupe(tech_stack),
-        "roles": dedupe(roles),
-        "domains": dedupe(domains),
-    }
+    for rk in ROLE_KEYWORDS:
+        terms.append(("roles", rk, rk))
+    return terms
+
+
+def build_entity_matcher(data: Dict[str, Any]) -> MultiPatternMatcher:
+    """
+    Payload is (order, category, value); order preserves catalogue ordering
+    so results read the same as a top-to-bottom scan.
+    """
+    return MultiPatternMatcher(
+        (
+            (_normalize(term), (order, category, value))
+            for order, (category, value, term) in enumerate(_catalogue_terms(data))
+        ),
+        word_boundary=True,
+    )
+
+
+def _snapshot_matcher(snapshot: PortfolioSnapshot) -> MultiPatternMatcher:
+    return build_entity_matcher(snapshot.data)
+
+
+def match_entities(matcher: MultiPatternMatcher, question: str) -> Dict[str, Any]:
+    result: Dict[str, List[str]] = {category: [] for category in ENTITY_CATEGORIES}
+    seen = set()
+    for _order, category, value in sorted(matcher.find(_normalize(question or ""))):
+        # Deduplicate while preserving order
+        key = (category, _normalize(value))
+        if key not in seen:
+            seen.add(key)
+            result[category].append(value)
+    return result
+
+
+@traced("entity_extraction.extract_entities")
+def extract_entities(question: str) -> Dict[str, Any]:
+    matcher = DataAccess.snapshot().derive("entity_matcher", _snapshot_matcher)
+    return match_entities(matcher, question)
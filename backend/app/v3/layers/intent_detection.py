@@ -1,104 +1,125 @@
 """
 Intent Detection Layer (v3).
 Classifies recruiter intent from the question + context.
-"""
 
-from typing import Dict, Any, List, Tuple
+Phrase tables live in INTENT_SPEC and are compiled once at import into a
+single substring automaton, so a question is scanned once for all intents.
+"""
 
+from dataclasses import dataclass
+from typing import Dict, Any, List, Sequence, Tuple
 
-def _score_match(q: str, phrases: List[str], score: float) -> float:
-    return score if any(p in q for p in phrases) else 0.0
+from app.v3.text.automaton import MultiPatternMatcher
+from app.v3.system.tracing import traced
 
 
-def rank_intents(question: str, context: Dict[str, Any]) -> List[Tuple[str, float]]:
-    q = (question or "").lower().strip()
+@dataclass(frozen=True)
+class IntentRule:
+    intent: str
+    phrases: Tuple[str, ...]
+    score: float
+    # Reported with 0.0 when no phrase matches (keeps it in the ranking)
+    always_scored: bool = False
 
-    scores: Dict[str, float] = {}
 
+INTENT_SPEC: Tuple[IntentRule, ...] = (
     # Role fit / evaluation
-    role_fit_phrases = [
-        "role fit",
-        "good for",
-        "fit for",
-        "suitable for",
-        "hire",
-        "hiring",
-        "candidate",
-        "can he",
-        "can she",
-        "should we",
-        "would you hire",
-    ]
-    scores["role_fit_evaluation"] = _score_match(q, role_fit_phrases, 0.95)
-
+    IntentRule(
+        "role_fit_evaluation",
+        (
+            "role fit",
+            "good for",
+            "fit for",
+            "suitable for",
+            "hire",
+            "hiring",
+            "candidate",
+            "can he",
+            "can she",
+            "should we",
+            "would you hire",
+        ),
+        0.95,
+        always_scored=True,
+    ),
     # Skills / technologies
-    skill_phrases = [
-        "skill",
-        "skills",
-        "technology",
-        "tech stack",
-        "stack",
-        "know",
-        "experience with",
-        "familiar with",
-    ]
-    scores["skills_query"] = _score_match(q, skill_phrases, 0.85)
-
-    # Projects
-    if "project" in q or "projects" in q or "built" in q:
-        scores["project_query"] = max(scores.get("project_query", 0.0), 0.8)
-
-    # Experience / work
-    if "experience" in q or "work" in q or "role" in q or "job" in q:
-        scores["experience_query"] = max(scores.get("experience_query", 0.0), 0.75)
-
-    # Education
-    if "education" in q or "study" in q or "college" in q or "degree" in q:
-        scores["education_query"] = max(scores.get("education_query", 0.0), 0.7)
-
-    # Certificates
-    if "certificate" in q or "certification" in q:
-        scores["certificate_query"] = max(scores.get("certificate_query", 0.0), 0.7)
-
-    # Contact
-    if "contact" in q or "email" in q or "phone" in q or "linkedin" in q or "github" in q:
-        scores["contact_query"] = max(scores.get("contact_query", 0.0), 0.8)
-
-    # About / summary
-    if "about" in q or "who are you" in q or "summary" in q or "profile" in q:
-        scores["about_query"] = max(scores.get("about_query", 0.0), 0.8)
-
+    IntentRule(
+        "skills_query",
+        (
+            "skill",
+            "skills",
+            "technology",
+            "tech stack",
+            "stack",
+            "know",
+            "experience with",
+            "familiar with",
+        ),
+        0.85,
+        always_scored=True,
+    ),
+    IntentRule("project_query", ("project", "projects", "built"), 0.8),
+    IntentRule("experience_query", ("experience", "work", "role", "job"), 0.75),
+    IntentRule("education_query", ("education", "study", "college", "degree"), 0.7),
+    IntentRule("certificate_query", ("certificate", "certification"), 0.7),
+    IntentRule("contact_query", ("contact", "email", "phone", "linkedin", "github"), 0.8),
+    IntentRule("about_query", ("about", "who are you", "summary", "profile"), 0.8),
     # Personal / hobbies
-    personal_phrases = [
-        "hobby",
-        "hobbies",
-        "fun",
-        "weekend",
-        "passion",
-        "interest",
-        "life",
-        "free time",
-    ]
-    scores["personal_query"] = max(scores.get("personal_query", 0.0), _score_match(q, personal_phrases, 0.7))
+    IntentRule(
+        "personal_query",
+        ("hobby", "hobbies", "fun", "weekend", "passion", "interest", "life", "free time"),
+        0.7,
+        always_scored=True,
+    ),
+)
+
+# (current_page substring, intent) soft hints, applied in order
+PAGE_HINTS: Tuple[Tuple[str, str], ...] = (
+    ("projects", "project_query"),
+    ("experience", "experience_query"),
+    ("education", "education_query"),
+    ("skills", "skills_query"),
+)
+PAGE_HINT_SCORE = 0.6
+RECENT_INTENT_SCORE = 0.5
+
+
+def _compile(spec: Sequence[IntentRule]) -> MultiPatternMatcher:
+    return MultiPatternMatcher(
+        (phrase, idx) for idx, rule in enumerate(spec) for phrase in rule.phrases
+    )
+
 
+_MATCHER = _compile(INTENT_SPEC)
+
+
+def _score_question(q: str) -> Dict[str, float]:
+    matched = _MATCHER.find_set(q)
+    scores: Dict[str, float] = {}
+    for idx, rule in enumerate(INTENT_SPEC):
+        if idx in matched:
+            scores[rule.intent] = rule.score
+        elif rule.always_scored:
+            scores[rule.intent] = 0.0
+    return scores
+
+
+def _apply_context(scores: Dict[str, float], context: Dict[str, Any]) -> None:
     # Use context if available (fallback to current page)
     current_page = (context or {}).get("current_page")
     if current_page:
-        if "projects" in current_page:
-            scores["project_query"] = max(scores.get("project_query", 0.0), 0.6)
-        if "experience" in current_page:
-            scores["experience_query"] = max(scores.get("experience_query", 0.0), 0.6)
-        if "education" in current_page:
-            scores["education_query"] = max(scores.get("education_query", 0.0), 0.6)
-        if "skills" in current_page:
-            scores["skills_query"] = max(scores.get("skills_query", 0.0), 0.6)
+        for page_key, intent in PAGE_HINTS:
+            if page_key in current_page:
+                scores[intent] = max(scores.get(intent, 0.0), PAGE_HINT_SCORE)
 
     # Recent intent trend (soft bias)
     recent_intents = (context or {}).get("recent_intents", [])
     if recent_intents:
         recent = recent_intents[-1]
-        scores[recent] = max(scores.get(recent, 0.0), 0.5)
+        scores[recent] = max(scores.get(recent, 0.0), RECENT_INTENT_SCORE)
 
+
+def _rank(scores: Dict[str, float]) -> List[Tuple[str, float]]:
     if not scores:
         return [("unknown_intent", 0.1)]
 
@@ -106,6 +127,41 @@ def rank_intents(question: str, context: Dict[str, Any]) -> List[Tuple[str, floa
     return ranked
 
 
+@traced("intent_detection.rank_intents")
+def rank_intents(question: str, context: Dict[str, Any]) -> List[Tuple[str, float]]:
+    q = (question or "").lower().strip()
+    scores = _score_question(q)
+    _apply_context(scores, context)
+    return _rank(scores)
+
+
+def rank_intents_batch(
+    questions: Sequence[str],
+    contexts: Sequence[Dict[str, Any]] | Dict[str, Any] | None = None,
+) -> List[List[Tuple[str, float]]]:
+    """
+    Rank many questions at once. `contexts` is either one context shared by
+    every question or a sequence aligned with `questions`.
+    """
+    if contexts is None or isinstance(contexts, dict):
+        contexts = [contexts] * len(questions)
+    elif len(contexts) != len(questions):
+        raise ValueError("contexts must align with questions")
+
+    # Repeated questions are scanned once per batch
+    question_scores: Dict[str, Dict[str, float]] = {}
+    results: List[List[Tuple[str, float]]] = []
+    for question, context in zip(questions, contexts):
+        q = (question or "").lower().strip()
+        base = question_scores.get(q)
+        if base is None:
+            base = question_scores[q] = _score_question(q)
+        scores = dict(base)
+        _apply_context(scores, context)
+        results.append(_rank(scores))
+    return results
+
+
 def detect_intent(question: str, context: Dict[str, Any]) -> str:
     ranked = rank_intents(question, context)
     return ranked[0][0] if ranked else "unknown_intent"
@@ -1,22 +1,24 @@
+import asyncio
+from contextlib import aclosing
+import logging
 import os
 import time
 import traceback
-from pathlib import Path
-from dotenv import load_dotenv
-from groq import AsyncGroq
+from typing import AsyncIterator, List, Optional, Tuple
 
 # Import the monitor
 from app.v3.system.observability import SystemMonitor
+from app.v3.data.data_access import DataAccess
+from app.v3.llm.hedging import LLM_HEDGE_ENABLED, get_hedger
+from app.v3.llm.health_manager import LLMCircuitOpen, classify_llm_error, get_llm_breaker
+from app.v3.llm.polish_cache import PolishCache, get_polish_cache, polish_fingerprint
+from app.v3.llm.provider import LLMProvider, get_provider
+from app.v3.llm.scheduler import LLMShed, get_llm_scheduler, polish_lane
+from app.v3.llm.single_flight import SingleFlight
+from app.v3.system.deadline import Deadline, DeadlineExceeded, LLMBudget, current_deadline
+from app.v3.system.tracing import traced
 
-# --- 1. SETUP HELPERS ---
-def get_api_key():
-    try:
-        env_path = Path(__file__).resolve().parents[3] / '.env'
-        load_dotenv(dotenv_path=env_path)
-        load_dotenv() 
-        return os.getenv("GROQ_API_KEY")
-    except Exception:
-        return None
+logger = logging.getLogger("portfolio.v3.llm.polish")
 
 # --- 1B. PERSONA PROMPTS ---
 def get_persona_instructions(recruiter_type: str, intent: str) -> str:
@@ -68,6 +70,8 @@ class PolishedResult:
         self.llm_status = data.get("llm_status", "skipped")
         self.llm_error = data.get("llm_error", False)
         self.llm_error_reason = data.get("llm_error_reason", None)
+        self.llm_cached = data.get("llm_cached", False)
+        self.llm_coalesced = data.get("llm_coalesced", False)
         
         # Pass through metadata
         self.confidence_score = data.get("confidence_score", 1.0) 
@@ -80,85 +84,388 @@ class PolishedResult:
         return self._data
 
 # --- 3. THE LOGIC WITH MONITORING ---
+def _base_data(answer, kwargs: dict) -> dict:
+    # The controller passes a RawAnswer; plain strings are still accepted
+    return {
+        "answer": getattr(answer, "answer", answer),
+        "confidence_score": kwargs.get("confidence_score")
+        or kwargs.get("confidence")
+        or getattr(answer, "confidence_score", None)
+        or 0.85,
+        "intent": kwargs.get("intent", "unknown"),
+        "evidence": kwargs.get("evidence", getattr(answer, "evidence", [])),
+        "llm_used": False,
+        "llm_status": "skipped",
+        "llm_error": False,
+        "llm_error_reason": None
+    }
+
+
+def _cache_key(question: str, raw_text: str, kwargs: dict) -> str:
+    return polish_fingerprint(
+        question,
+        intent=kwargs.get("intent"),
+        strategy=kwargs.get("strategy"),
+        recruiter_type=kwargs.get("recruiter_type"),
+        raw_text=raw_text,
+        data_version=DataAccess.snapshot().digest,
+    )
+
+
+def _build_messages(question: str, raw_text: str, kwargs: dict) -> list:
+    persona_prompt = get_persona_instructions(
+        kwargs.get("recruiter_type", "GENERALIST"),
+        kwargs.get("intent", "unknown"),
+    )
+    system_prompt = (
+        "You are a professional portfolio assistant for a software engineer. "
+        f"{persona_prompt} "
+        "Rewrite the following raw data into a concise, professional, and friendly response. "
+        "Do not invent facts. If the data is a list, make it conversational."
+    )
+    user_message = f"USER QUESTION: {question}\n\nRAW DATA:\n{raw_text}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def _use_cached(base_data: dict, cached, monitor: SystemMonitor) -> PolishedResult:
+    monitor.record_llm_cache_hit(cached.tier, cached.llm_ms)
+    base_data["answer"] = cached.answer
+    base_data["llm_used"] = True
+    base_data["llm_cached"] = True
+    base_data["llm_status"] = "cached"
+    return PolishedResult(base_data)
+
+
+def _shed(base_data: dict, exc: LLMShed) -> PolishedResult:
+    # Not an LLM failure: the unpolished rules answer is returned as-is
+    base_data["llm_status"] = "shed"
+    base_data["llm_error_reason"] = f"shed:{exc.reason}"
+    return PolishedResult(base_data)
+
+
+def _short_circuit(base_data: dict, monitor: SystemMonitor) -> PolishedResult:
+    # Provider known to be down: answer unpolished without touching the network
+    monitor.record_llm_short_circuit()
+    base_data["llm_status"] = "circuit_open"
+    base_data["llm_error_reason"] = "circuit_open"
+    return PolishedResult(base_data)
+
+
+def _deadline_exceeded(base_data: dict, deadline: Optional[Deadline], monitor: SystemMonitor) -> PolishedResult:
+    # The request's budget ran out: the unpolished answer is the best we have
+    if deadline is not None:
+        deadline.exceed("polish")
+    monitor.record_deadline_exceeded("polish")
+    base_data["llm_status"] = "deadline_exceeded"
+    base_data["llm_error_reason"] = "deadline_exceeded"
+    return PolishedResult(base_data)
+
+
+def _record_missing_key(base_data: dict, monitor: SystemMonitor, provider: LLMProvider) -> PolishedResult:
+    base_data["llm_error"] = True
+    base_data["llm_error_reason"] = provider.unavailable_reason
+    monitor.record_llm_failure(provider.unavailable_reason)
+    return PolishedResult(base_data)
+
+
+_POLISH_FLIGHTS: SingleFlight[str] = SingleFlight(on_join=SystemMonitor().record_llm_flight)
+
+POLISH_MAX_TOKENS = 500
+# Registry names (llm/provider.py) of the polish provider and the hedging backup
+LLM_PRIMARY_PROVIDER = os.getenv("LLM_PRIMARY_PROVIDER", "groq").strip().lower()
+LLM_HEDGE_PROVIDER = os.getenv("LLM_HEDGE_PROVIDER", "gemini").strip().lower()
+# A call cut off by a request budget shorter than this says more about the
+# budget than the provider, so its timeout is not held against the breaker
+BREAKER_TIMEOUT_FLOOR_S = 2.0
+
+
+def _call_limits(budget: Optional[LLMBudget]) -> dict:
+    if budget is None:
+        return {"max_tokens": POLISH_MAX_TOKENS}
+    return {"max_tokens": budget.max_tokens, "timeout": budget.timeout_s}
+
+
+def _hedge_backup() -> Optional[LLMProvider]:
+    """The backup provider when hedging is on and it is configured, else None."""
+    if not LLM_HEDGE_ENABLED:
+        return None
+    backup = get_provider(LLM_HEDGE_PROVIDER)
+    return backup if backup.available() else None
+
+
+def _circuit_open(provider: LLMProvider) -> bool:
+    """True while neither the provider nor a hedging backup would be let through."""
+    if not get_llm_breaker(provider.name).rejecting():
+        return False
+    backup = _hedge_backup()
+    return backup is None or get_llm_breaker(backup.name).rejecting()
+
+
+async def _guarded_complete(provider: LLMProvider, messages: list, budget: Optional[LLMBudget]) -> str:
+    """
+    One call under the provider's own breaker: rejected with LLMCircuitOpen
+    while it is open, and only this call's outcome is reported to it, so a
+    backup answering for a failing primary does not hide the failure.
+    """
+    breaker = get_llm_breaker(provider.name)
+    if not breaker.allow_request():
+        raise LLMCircuitOpen()
+    try:
+        polished = await provider.complete(messages, temperature=0.7, **_call_limits(budget))
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    except Exception as e:
+        error_class = classify_llm_error(e)
+        if error_class == "timeout" and budget is not None and budget.timeout_s < BREAKER_TIMEOUT_FLOOR_S:
+            breaker.release()
+            raise DeadlineExceeded() from e
+        breaker.record_failure(error_class)
+        raise
+    breaker.record_success()
+    return polished
+
+
+async def _complete_once(
+    provider: LLMProvider,
+    messages: list,
+    cache: PolishCache,
+    cache_key: str,
+    start_time: float,
+    budget: Optional[LLMBudget],
+) -> str:
+    """
+    The LLM call behind one single-flight key, raced against the backup
+    provider in hedging mode (or sent straight to it while the primary's
+    breaker is open). Health and cache are updated here, once per call,
+    however many requests are waiting on it.
+    """
+    monitor = SystemMonitor()
+    backup = _hedge_backup()
+    try:
+        if backup is None or get_llm_breaker(backup.name).rejecting():
+            polished = await _guarded_complete(provider, messages, budget)
+        elif get_llm_breaker(provider.name).rejecting():
+            polished = await _guarded_complete(backup, messages, budget)
+        else:
+            polished, _winner = await get_hedger().race(
+                provider.name,
+                lambda: _guarded_complete(provider, messages, budget),
+                backup.name,
+                lambda: _guarded_complete(backup, messages, budget),
+            )
+    except (LLMCircuitOpen, DeadlineExceeded):
+        raise
+    except Exception as e:
+        monitor.record_llm_failure(str(e))
+        raise
+
+    # 2. TRACK SUCCESS & LATENCY
+    duration = (time.time() - start_time) * 1000
+    monitor.record_llm_success(duration)
+    cache.put(cache_key, polished, duration)
+    return polished
+
+
+async def _complete_scheduled(
+    lane: str, provider: LLMProvider, messages: list, cache: PolishCache, cache_key: str
+) -> str:
+    """
+    Waits for an LLM slot (or sheds), then makes the call; each provider
+    called reports its outcome to its own breaker. Latency excludes queueing.
+    Under a request deadline the wait, the call timeout and max_tokens all
+    come out of the remaining budget.
+    """
+    if _circuit_open(provider):
+        raise LLMCircuitOpen()
+    deadline = current_deadline()
+    async with get_llm_scheduler().slot(lane, None if deadline is None else deadline.llm_wait_budget_ms()):
+        budget = None
+        if deadline is not None:
+            budget = deadline.llm_budget(POLISH_MAX_TOKENS)
+            if budget is None:
+                raise DeadlineExceeded()
+        return await _complete_once(provider, messages, cache, cache_key, time.time(), budget)
+
+
+@traced("llm_polish.polish_response")
 async def polish_response(question: str, answer: str, **kwargs) -> PolishedResult:
     """
-    Polishes the response using AsyncGroq and tracks health via SystemMonitor.
+    Polishes the response with the LLM_PRIMARY_PROVIDER (Groq by default)
+    and tracks health via SystemMonitor.
+    Skipped when the controller passes allow_llm=False; identical eligible
+    requests are answered from the polish cache, or join the in-flight call.
+    New calls go through the circuit breaker and the LLM scheduler; a call
+    rejected by either (llm_status "circuit_open" / "shed") returns the
+    unpolished answer, as does one that does not fit in the request deadline
+    (llm_status "deadline_exceeded").
     """
     # 1. TRACK REQUEST START
-    start_time = time.time()
-    
     # FIX: Instantiate the class with ()
     monitor = SystemMonitor() 
     monitor.record_request() 
     
     # Base Data Structure
-    base_data = {
-        "answer": answer,
-        "confidence_score": kwargs.get("confidence_score") or kwargs.get("confidence", 0.85),
-        "intent": kwargs.get("intent", "unknown"),
-        "evidence": kwargs.get("evidence", []),
-        "llm_used": False,
-        "llm_status": "skipped",
-        "llm_error": False,
-        "llm_error_reason": None
-    }
+    base_data = _base_data(answer, kwargs)
 
-    if not answer:
+    if not answer or not kwargs.get("allow_llm", True):
         return PolishedResult(base_data)
 
+    raw_text = str(answer)
+    cache = get_polish_cache()
+    cache_key = _cache_key(question, raw_text, kwargs)
+    cached = await cache.aget(cache_key)
+    if cached is not None:
+        return _use_cached(base_data, cached, monitor)
+    monitor.record_llm_cache_miss()
+    deadline = current_deadline()
+    if deadline is not None and deadline.llm_budget(POLISH_MAX_TOKENS) is None:
+        return _deadline_exceeded(base_data, deadline, monitor)
+
+    in_flight = False
     try:
-        api_key = get_api_key()
-        if not api_key:
-            base_data["llm_error"] = True
-            base_data["llm_error_reason"] = "GROQ_API_KEY_MISSING"
-            
-            # FIX: Use correct method name
-            monitor.record_llm_failure("GROQ_API_KEY_MISSING") 
-            return PolishedResult(base_data)
-
-        # Init Client
-        client = AsyncGroq(api_key=api_key)
-
-        persona_prompt = get_persona_instructions(
-            kwargs.get("recruiter_type", "GENERALIST"),
-            kwargs.get("intent", "unknown"),
-        )
-        system_prompt = (
-            "You are a professional portfolio assistant for a software engineer. "
-            f"{persona_prompt} "
-            "Rewrite the following raw data into a concise, professional, and friendly response. "
-            "Do not invent facts. If the data is a list, make it conversational."
-        )
-        user_message = f"USER QUESTION: {question}\n\nRAW DATA:\n{answer}"
-
-        # Call Groq
-        completion = await client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.7,
-            max_tokens=500
+        # Shared provider instance over a pooled client
+        provider = get_provider(LLM_PRIMARY_PROVIDER)
+        if not provider.available():
+            return _record_missing_key(base_data, monitor, provider)
+        if _circuit_open(provider):
+            return _short_circuit(base_data, monitor)
+
+        # Identical concurrent requests share one LLM call (and one slot)
+        messages = _build_messages(question, raw_text, kwargs)
+        lane = polish_lane(kwargs.get("intent"), kwargs.get("strategy"))
+        in_flight = True
+        flight = _POLISH_FLIGHTS.do(
+            cache_key,
+            lambda: _complete_scheduled(lane, provider, messages, cache, cache_key),
         )
-        
+        if deadline is None:
+            polished, shared = await flight
+        else:
+            # A call started under someone else's longer deadline still ends ours on time
+            polished, shared = await asyncio.wait_for(flight, timeout=max(0.0, deadline.remaining_ms()) / 1000.0)
+
         # Update result
-        base_data["answer"] = completion.choices[0].message.content.strip()
+        base_data["answer"] = polished
+        base_data["llm_used"] = True
+        base_data["llm_status"] = "healthy"
+        base_data["llm_coalesced"] = shared
+
+    except LLMShed as e:
+        return _shed(base_data, e)
+    except LLMCircuitOpen:
+        return _short_circuit(base_data, monitor)
+    except (DeadlineExceeded, asyncio.TimeoutError):
+        return _deadline_exceeded(base_data, deadline, monitor)
+    except Exception as e:
+        logger.exception("llm_polish.failed")
+        base_data["llm_error"] = True
+        base_data["llm_error_reason"] = str(e)
+
+        # 3. TRACK EXCEPTION (the shared call records its own, once)
+        if not in_flight:
+            monitor.record_llm_failure(str(e))
+
+    return PolishedResult(base_data)
+
+
+# --- 4. STREAMING VARIANT ---
+async def stream_polish_response(question: str, answer: str, **kwargs) -> AsyncIterator[dict]:
+    """
+    Same policy as polish_response, but yields {"type": "token", "text": ...}
+    chunks as the provider streams them, then one {"type": "result", "result": PolishedResult}.
+    The result's answer is authoritative (e.g. the raw answer after a mid-stream
+    error, or when the request deadline runs out mid-stream).
+    """
+    monitor = SystemMonitor()
+    monitor.record_request()
+    base_data = _base_data(answer, kwargs)
+
+    if not answer or not kwargs.get("allow_llm", True):
+        yield {"type": "result", "result": PolishedResult(base_data)}
+        return
+
+    raw_text = str(answer)
+    cache = get_polish_cache()
+    cache_key = _cache_key(question, raw_text, kwargs)
+    cached = await cache.aget(cache_key)
+    if cached is not None:
+        result = _use_cached(base_data, cached, monitor)
+        yield {"type": "token", "text": result.answer}
+        yield {"type": "result", "result": result}
+        return
+    monitor.record_llm_cache_miss()
+    deadline = current_deadline()
+    if deadline is not None and deadline.llm_budget(POLISH_MAX_TOKENS) is None:
+        yield {"type": "result", "result": _deadline_exceeded(base_data, deadline, monitor)}
+        return
+
+    parts: List[str] = []
+    try:
+        provider = get_provider(LLM_PRIMARY_PROVIDER)
+        if not provider.available():
+            yield {"type": "result", "result": _record_missing_key(base_data, monitor, provider)}
+            return
+        # Streams are not hedged: only the primary's breaker applies
+        breaker = get_llm_breaker(provider.name)
+        if breaker.rejecting():
+            yield {"type": "result", "result": _short_circuit(base_data, monitor)}
+            return
+        if not breaker.allow_request():
+            raise LLMCircuitOpen()
+
+        # The slot (and a half-open probe) is held for the whole stream
+        budget = None
+        lane = polish_lane(kwargs.get("intent"), kwargs.get("strategy"))
+        try:
+            async with get_llm_scheduler().slot(lane, None if deadline is None else deadline.llm_wait_budget_ms()):
+                if deadline is not None:
+                    budget = deadline.llm_budget(POLISH_MAX_TOKENS)
+                    if budget is None:
+                        raise DeadlineExceeded()
+                start_time = time.time()
+                messages = _build_messages(question, raw_text, kwargs)
+                async with aclosing(provider.stream(messages, temperature=0.7, **_call_limits(budget))) as stream:
+                    async for text in stream:
+                        if deadline is not None and deadline.expired():
+                            raise DeadlineExceeded()
+                        parts.append(text)
+                        yield {"type": "token", "text": text}
+        except (LLMShed, DeadlineExceeded, GeneratorExit, asyncio.CancelledError):
+            breaker.release()
+            raise
+        except Exception as e:
+            error_class = classify_llm_error(e)
+            if error_class == "timeout" and budget is not None and budget.timeout_s < BREAKER_TIMEOUT_FLOOR_S:
+                breaker.release()
+                raise DeadlineExceeded() from e
+            breaker.record_failure(error_class)
+            raise
+        breaker.record_success()
+
+        base_data["answer"] = "".join(parts).strip()
         base_data["llm_used"] = True
         base_data["llm_status"] = "healthy"
-        
-        # 2. TRACK SUCCESS & LATENCY
         duration = (time.time() - start_time) * 1000
-        
-        # FIX: Use correct method name
-        monitor.record_llm_success(duration) 
-        
+        monitor.record_llm_success(duration)
+        cache.put(cache_key, base_data["answer"], duration)
+
+    except LLMShed as e:
+        yield {"type": "result", "result": _shed(base_data, e)}
+        return
+    except LLMCircuitOpen:
+        yield {"type": "result", "result": _short_circuit(base_data, monitor)}
+        return
+    except DeadlineExceeded:
+        yield {"type": "result", "result": _deadline_exceeded(base_data, deadline, monitor)}
+        return
     except Exception as e:
-        print(f"❌ LLM Error: {e}")
+        logger.exception("llm_polish.stream_failed")
         base_data["llm_error"] = True
         base_data["llm_error_reason"] = str(e)
-        
-        # 3. TRACK EXCEPTION (Correct Name)
         monitor.record_llm_failure(str(e))
 
-    return PolishedResult(base_data)
+    yield {"type": "result", "result": PolishedResult(base_data)}
@@ -5,6 +5,17 @@ Selects how to answer (summary, evidence, comparison, timeline, etc.).
 
 from typing import Dict, Any
 
+from app.v3.system.tracing import traced
+
+STRATEGY_TYPES = (
+    "comparison_strategy",
+    "evidence_strategy",
+    "summary_strategy",
+    "timeline_strategy",
+    "highlight_strategy",
+    "fallback_strategy",
+)
+
 
 def _strategy(
     strategy_type: str,
@@ -20,6 +31,7 @@ def _strategy(
     }
 
 
+@traced("strategy_engine.select_strategy")
 def select_strategy(intent: str, context: Dict[str, Any]) -> Dict[str, Any]:
     if intent == "unknown_intent":
         return _strategy(
@@ -0,0 +1,39 @@
+from app.v3.layers.entity_extraction import extract_entities
+from app.v3.text.automaton import MultiPatternMatcher
+
+
+def test_entities_found_in_one_pass():
+    entities = extract_entities("Tell me about ClickMart and the Flask work on digital-dukan")
+    assert entities["projects"] == [
+        "Digital Dukan (Surat Textile Catalog)",
+        "ClickMart E-Commerce Website",
+    ]
+    assert entities["tech_stack"] == ["Flask"]
+    assert entities["roles"] == []
+    assert entities["domains"] == []
+
+
+def test_entities_respect_word_boundaries():
+    entities = extract_entities("Can he maintain a legacy codebase?")
+    assert "ai" not in entities["roles"]
+
+    entities = extract_entities("Any AI or backend work?")
+    assert entities["roles"] == ["backend", "ai"]
+
+
+def test_entities_keep_catalogue_order_and_dedupe():
+    entities = extract_entities("python, react.js and Python again")
+    assert entities["tech_stack"] == ["Python", "React.js"]
+
+
+def test_matcher_handles_overlapping_and_symbol_patterns():
+    matcher = MultiPatternMatcher(
+        [("he", 1), ("she", 2), ("hers", 3), ("c++", 4), ("ci/cd", 5)],
+        word_boundary=True,
+    )
+    assert matcher.find("ushers") == []
+    assert matcher.find("she said hers") == [2, 3]
+    assert matcher.find("c++ and ci/cd pipelines") == [4, 5]
+
+    substring = MultiPatternMatcher([("he", 1), ("she", 2), ("hers", 3)])
+    assert sorted(substring.find("ushers")) == [1, 2, 3]
@@ -0,0 +1,136 @@
+import itertools
+import random
+from typing import Any, Dict, List, Tuple
+
+from app.v3.layers.intent_detection import INTENT_SPEC, rank_intents, rank_intents_batch
+
+
+def _legacy_score_match(q: str, phrases: List[str], score: float) -> float:
+    return score if any(p in q for p in phrases) else 0.0
+
+
+def _legacy_rank_intents(question: str, context: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """Reference copy of the hand-written ranking the compiled spec replaced."""
+    q = (question or "").lower().strip()
+    scores: Dict[str, float] = {}
+    scores["role_fit_evaluation"] = _legacy_score_match(
+        q,
+        ["role fit", "good for", "fit for", "suitable for", "hire", "hiring", "candidate",
+         "can he", "can she", "should we", "would you hire"],
+        0.95,
+    )
+    scores["skills_query"] = _legacy_score_match(
+        q,
+        ["skill", "skills", "technology", "tech stack", "stack", "know", "experience with",
+         "familiar with"],
+        0.85,
+    )
+    if "project" in q or "projects" in q or "built" in q:
+        scores["project_query"] = max(scores.get("project_query", 0.0), 0.8)
+    if "experience" in q or "work" in q or "role" in q or "job" in q:
+        scores["experience_query"] = max(scores.get("experience_query", 0.0), 0.75)
+    if "education" in q or "study" in q or "college" in q or "degree" in q:
+        scores["education_query"] = max(scores.get("education_query", 0.0), 0.7)
+    if "certificate" in q or "certification" in q:
+        scores["certificate_query"] = max(scores.get("certificate_query", 0.0), 0.7)
+    if "contact" in q or "email" in q or "phone" in q or "linkedin" in q or "github" in q:
+        scores["contact_query"] = max(scores.get("contact_query", 0.0), 0.8)
+    if "about" in q or "who are you" in q or "summary" in q or "profile" in q:
+        scores["about_query"] = max(scores.get("about_query", 0.0), 0.8)
+    scores["personal_query"] = max(
+        scores.get("personal_query", 0.0),
+        _legacy_score_match(
+            q,
+            ["hobby", "hobbies", "fun", "weekend", "passion", "interest", "life", "free time"],
+            0.7,
+        ),
+    )
+    current_page = (context or {}).get("current_page")
+    if current_page:
+        if "projects" in current_page:
+            scores["project_query"] = max(scores.get("project_query", 0.0), 0.6)
+        if "experience" in current_page:
+            scores["experience_query"] = max(scores.get("experience_query", 0.0), 0.6)
+        if "education" in current_page:
+            scores["education_query"] = max(scores.get("education_query", 0.0), 0.6)
+        if "skills" in current_page:
+            scores["skills_query"] = max(scores.get("skills_query", 0.0), 0.6)
+    recent_intents = (context or {}).get("recent_intents", [])
+    if recent_intents:
+        recent = recent_intents[-1]
+        scores[recent] = max(scores.get(recent, 0.0), 0.5)
+    if not scores:
+        return [("unknown_intent", 0.1)]
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+
+SEED_QUESTIONS = [
+    "",
+    "   ",
+    None,
+    "Would you hire him for a backend role?",
+    "What skills does he have with FastAPI?",
+    "Tell me about his projects",
+    "Where did he study and what degree?",
+    "Any certifications?",
+    "How can I contact him by email or LinkedIn?",
+    "Who are you?",
+    "What does he do for fun on the weekend?",
+    "Is he a good cultural fit for our team?",
+    "Does he know Docker and Kubernetes?",
+    "What has he built with React?",
+    "Summarize his work experience at Hard n Soft",
+    "KNOWLEDGE of SQL? Experience with MariaDB?",
+    "Can she lead a project with a tight deadline?",
+    "Should we move forward with this candidate?",
+    "Random question about the weather",
+    "Life at a startup vs enterprise?",
+]
+
+CONTEXTS = [
+    {},
+    None,
+    {"current_page": "/projects"},
+    {"current_page": "/experience/skills"},
+    {"current_page": "education"},
+    {"recent_intents": ["project_query"]},
+    {"recent_intents": ["skills_query", "contact_query"]},
+    {"current_page": "/skills", "recent_intents": ["personal_query"]},
+    {"recent_intents": ["unknown_intent"]},
+]
+
+
+def _corpus(size: int = 2000, seed: int = 1234) -> List[str]:
+    rng = random.Random(seed)
+    phrases = [p for rule in INTENT_SPEC for p in rule.phrases]
+    filler = ["he", "his", "the", "a", "team", "backend", "python", "?", "and", "maybe"]
+    corpus = list(SEED_QUESTIONS)
+    corpus.extend(phrases)
+    corpus.extend(" ".join(pair) for pair in itertools.combinations(phrases[:20], 2))
+    for _ in range(size):
+        words = rng.sample(phrases, rng.randint(0, 3)) + rng.sample(filler, rng.randint(0, 4))
+        rng.shuffle(words)
+        text = " ".join(words)
+        corpus.append(text.upper() if rng.random() < 0.1 else text)
+    return corpus
+
+
+def test_compiled_ranking_matches_legacy_bit_for_bit():
+    for question in _corpus():
+        for context in CONTEXTS:
+            assert rank_intents(question, context) == _legacy_rank_intents(question, context), (
+                question,
+                context,
+            )
+
+
+def test_batch_matches_single_calls():
+    questions = _corpus(200)
+    contexts = [CONTEXTS[i % len(CONTEXTS)] for i in range(len(questions))]
+    assert rank_intents_batch(questions, contexts) == [
+        _legacy_rank_intents(q, c) for q, c in zip(questions, contexts)
+    ]
+    shared = {"current_page": "/projects"}
+    assert rank_intents_batch(questions, shared) == [
+        _legacy_rank_intents(q, shared) for q in questions
+    ]
@@ -2,6 +2,8 @@ import os
 import asyncio
 from google import genai
 
+from app.v3.llm.provider import run_blocking
+
 
 class GeminiClient:
     def __init__(self):
@@ -12,8 +14,85 @@ class GeminiClient:
             return
 
         self.client = genai.Client(api_key=api_key)
+        # Native async I/O when the SDK has it; otherwise the bounded LLM pool,
+        # never one default-executor thread per call
+        self._aio = getattr(self.client, "aio", None)
+        self.model = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
         self.enabled = True
 
+    async def _generate(self, **request):
+        if self._aio is not None:
+            return await self._aio.models.generate_content(**request)
+        return await run_blocking(self.client.models.generate_content, **request)
+
+    async def _generate_stream(self, **request):
+        """Async iterator of response chunks, over the pool when there is no aio client."""
+        if self._aio is not None:
+            chunks = await self._aio.models.generate_content_stream(**request)
+            async for chunk in chunks:
+                yield chunk
+            return
+        chunks = iter(await run_blocking(self.client.models.generate_content_stream, **request))
+        while True:
+            chunk = await run_blocking(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    @staticmethod
+    def _split(messages: list) -> tuple[str, str]:
+        system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+        contents = "\n\n".join(m["content"] for m in messages if m["role"] != "system")
+        return system, contents
+
+    def _config(self, system: str, max_tokens: int, temperature: float) -> dict:
+        return {
+            "system_instruction": system or None,
+            "max_output_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+    async def complete(self, messages: list, *, max_tokens: int, temperature: float = 0.7,
+                       timeout: float | None = None) -> str:
+        """
+        Chat-style completion for the polish step (same messages as Groq).
+        Raises on any failure.
+        """
+        system, contents = self._split(messages)
+        response = await asyncio.wait_for(
+            self._generate(model=self.model, contents=contents, config=self._config(system, max_tokens, temperature)),
+            timeout=timeout,
+        )
+        text = (response.text or "").strip()
+        if not text:
+            raise ValueError("empty Gemini response")
+        return text
+
+    async def stream(self, messages: list, *, max_tokens: int, temperature: float = 0.7,
+                     timeout: float | None = None):
+        """Streams text chunks; `timeout` bounds the wait for each chunk."""
+        system, contents = self._split(messages)
+        chunks = self._generate_stream(
+            model=self.model, contents=contents, config=self._config(system, max_tokens, temperature)
+        )
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+                except StopAsyncIteration:
+                    return
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            await chunks.aclose()
+
+    async def aclose(self) -> None:
+        if not self.enabled:
+            return
+        aclose = getattr(self._aio, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
     async def rewrite(self, text: str, *, intent: str | None = None, strategy: str | None = None):
         if not self.enabled:
             return {
@@ -24,11 +103,11 @@ class GeminiClient:
             }
 
         try:
-            def blocking_call():
-                intent_hint = intent or "unknown"
-                strategy_hint = strategy or "summary"
-                return self.client.models.generate_content(
-                    model="gemini-1.5-flash",
+            intent_hint = intent or "unknown"
+            strategy_hint = strategy or "summary"
+            response = await asyncio.wait_for(
+                self._generate(
+                    model=self.model,
                     contents=f"""
 Rewrite safely.
 Do not add new facts.
@@ -41,10 +120,7 @@ Strategy: {strategy_hint}
 TEXT:
 {text}
 """,
-                )
-
-            response = await asyncio.wait_for(
-                asyncio.to_thread(blocking_call),
+                ),
                 timeout=5,
             )
 
@@ -62,3 +138,14 @@ TEXT:
                 "error": True,
                 "error_reason": str(e),
             }
+
+
+_CLIENT: GeminiClient | None = None
+
+
+def get_gemini_client() -> GeminiClient:
+    """Shared client; `enabled` is False when GEMINI_API_KEY is not set."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = GeminiClient()
+    return _CLIENT
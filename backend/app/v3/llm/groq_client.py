@@ -0,0 +1,111 @@
+"""
+Groq Client Pool (v3).
+One long-lived AsyncGroq client per process, sharing a keep-alive HTTP pool.
+Created and closed by the FastAPI lifespan in main.py; configuration is read
+once, at startup.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import os
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+from groq import AsyncGroq
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+@dataclass(frozen=True)
+class GroqSettings:
+    api_key: str | None
+    base_url: str | None
+    model: str
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry_seconds: float
+    timeout_seconds: float
+
+
+def load_groq_settings() -> GroqSettings:
+    env_path = Path(__file__).resolve().parents[3] / ".env"
+    load_dotenv(dotenv_path=env_path)
+    load_dotenv()
+    return GroqSettings(
+        api_key=os.getenv("GROQ_API_KEY") or None,
+        base_url=os.getenv("GROQ_BASE_URL") or None,
+        model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
+        max_connections=_env_int("GROQ_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_int("GROQ_MAX_KEEPALIVE_CONNECTIONS", 10),
+        keepalive_expiry_seconds=_env_float("GROQ_KEEPALIVE_EXPIRY_SECONDS", 30.0),
+        timeout_seconds=_env_float("GROQ_TIMEOUT_SECONDS", 60.0),
+    )
+
+
+def build_groq_client(settings: GroqSettings) -> AsyncGroq | None:
+    if not settings.api_key:
+        return None
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry_seconds,
+        ),
+        timeout=settings.timeout_seconds,
+    )
+    return AsyncGroq(
+        api_key=settings.api_key,
+        base_url=settings.base_url,
+        http_client=http_client,
+    )
+
+
+_SETTINGS: GroqSettings | None = None
+_CLIENT: AsyncGroq | None = None
+
+
+def get_groq_settings() -> GroqSettings:
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = load_groq_settings()
+    return _SETTINGS
+
+
+def get_groq_client() -> AsyncGroq | None:
+    """
+    Shared client, or None when GROQ_API_KEY is not configured.
+    Created lazily when the app lifespan did not run (scripts, tests).
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = build_groq_client(get_groq_settings())
+    return _CLIENT
+
+
+async def init_groq_client(settings: GroqSettings | None = None) -> AsyncGroq | None:
+    global _SETTINGS, _CLIENT
+    await close_groq_client()
+    _SETTINGS = settings or load_groq_settings()
+    _CLIENT = build_groq_client(_SETTINGS)
+    return _CLIENT
+
+
+async def close_groq_client() -> None:
+    global _CLIENT
+    client, _CLIENT = _CLIENT, None
+    if client is not None:
+        await client.close()
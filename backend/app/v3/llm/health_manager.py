@@ -1,13 +1,23 @@
 """
 LLM Health Manager (v3).
-Tracks recent failures and cooldowns to auto-disable LLM usage safely.
+Circuit breakers around LLM polish calls, one per provider: each tracks
+consecutive failures per error class and short-circuits calls while its
+provider is unhealthy.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 import os
+from threading import Lock
 import time
+from typing import Dict
+
+import groq
+import httpx
+
+from app.v3.system.observability import SystemMonitor
 
 
 def _env_int(name: str, default: int) -> int:
@@ -17,48 +27,223 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Consecutive failures of one class that open the breaker. Timeouts and
+# connection errors mean every caller is about to wait for nothing; a 4xx
+# or a 5xx can be a one-off, so those get more room.
+DEFAULT_THRESHOLDS: Dict[str, int] = {
+    "timeout": 3,
+    "connection": 3,
+    "rate_limit": 3,
+    "server_error": 5,
+    "client_error": 5,
+    "other": 5,
+}
+
+
+def classify_llm_error(exc: BaseException) -> str:
+    """Error class used for per-class thresholds."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, httpx.TimeoutException, groq.APITimeoutError)):
+        return "timeout"
+    if isinstance(exc, (groq.APIConnectionError, httpx.TransportError, ConnectionError)):
+        return "connection"
+    status = getattr(exc, "status_code", None)
+    if status == 429:
+        return "rate_limit"
+    if isinstance(status, int) and status >= 500:
+        return "server_error"
+    if isinstance(status, int) and status >= 400:
+        return "client_error"
+    return "other"
+
+
+def _thresholds_from_env() -> Dict[str, int]:
+    """
+    LLM_FAILURE_THRESHOLD (the original single setting), when set, is the
+    threshold of every class; LLM_BREAKER_THRESHOLDS="timeout=2,server_error=10"
+    then overrides single classes.
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if os.getenv("LLM_FAILURE_THRESHOLD", "").strip():
+        default = max(1, _env_int("LLM_FAILURE_THRESHOLD", 3))
+        thresholds = dict.fromkeys(DEFAULT_THRESHOLDS, default)
+    for item in os.getenv("LLM_BREAKER_THRESHOLDS", "").split(","):
+        name, _, value = item.partition("=")
+        try:
+            thresholds[name.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return thresholds
+
+
+class LLMCircuitOpen(Exception):
+    """Raised instead of calling the LLM while the breaker rejects calls."""
+
+
 @dataclass
 class LLMHealthState:
+    state: str = CLOSED
     last_success_ts: float | None = None
     last_failure_ts: float | None = None
-    failure_count: int = 0
+    last_failure_class: str | None = None
+    failure_counts: Dict[str, int] = field(default_factory=dict)
     disabled_until_ts: float | None = None
+    probes_in_flight: int = 0
+    probe_successes: int = 0
 
 
 class LLMHealthManager:
-    def __init__(self) -> None:
+    """
+    closed: calls go through; N consecutive failures of one class open it.
+    open: calls are rejected without touching the network until the
+          cooldown ends, then the breaker turns half-open.
+    half_open: at most `half_open_probes` calls at a time are let through
+          as probes; `close_after` consecutive probe successes close it,
+          any probe failure re-opens it for another cooldown.
+
+    Callers check allow_request() before a call and then report exactly one
+    of record_success(), record_failure(error_class) or release() (call
+    abandoned without an outcome, e.g. shed or cancelled).
+    """
+
+    def __init__(
+        self,
+        name: str = "groq",
+        *,
+        thresholds: Dict[str, int] | None = None,
+        cooldown_seconds: float | None = None,
+        half_open_probes: int | None = None,
+        close_after: int | None = None,
+    ) -> None:
+        self.name = name
         self.state = LLMHealthState()
-        self.failure_threshold = _env_int("LLM_FAILURE_THRESHOLD", 3)
-        self.cooldown_seconds = _env_int("LLM_COOLDOWN_SECONDS", 300)
+        self.thresholds = thresholds or _thresholds_from_env()
+        self.cooldown_seconds = (
+            cooldown_seconds if cooldown_seconds is not None else _env_int("LLM_COOLDOWN_SECONDS", 30)
+        )
+        self.half_open_probes = max(1, half_open_probes or _env_int("LLM_BREAKER_HALF_OPEN_PROBES", 1))
+        self.close_after = max(1, close_after or _env_int("LLM_BREAKER_CLOSE_AFTER", 2))
+        self._lock = Lock()
 
     def _now(self) -> float:
-        return time.time()
+        return time.monotonic()
 
-    def status(self) -> str:
-        now = self._now()
-        if self.state.disabled_until_ts and now < self.state.disabled_until_ts:
-            return "disabled"
-        if self.state.failure_count > 0:
-            return "degraded"
-        return "healthy"
-
-    def should_use_llm(self) -> bool:
-        now = self._now()
-        if self.state.disabled_until_ts and now < self.state.disabled_until_ts:
-            return False
-        # Cooldown elapsed; reset failures and re-enable
-        if self.state.disabled_until_ts and now >= self.state.disabled_until_ts:
+    def _transition(self, new_state: str, reason: str) -> None:
+        old_state = self.state.state
+        if old_state == new_state:
+            return
+        self.state.state = new_state
+        if new_state == OPEN:
+            self.state.disabled_until_ts = self._now() + self.cooldown_seconds
+        else:
             self.state.disabled_until_ts = None
-            self.state.failure_count = 0
-        return True
+        self.state.probes_in_flight = 0
+        self.state.probe_successes = 0
+        if new_state == CLOSED:
+            self.state.failure_counts.clear()
+        SystemMonitor().record_llm_breaker_transition(old_state, new_state, reason, provider=self.name)
+
+    def status(self) -> str:
+        with self._lock:
+            if self.state.state == OPEN:
+                return "disabled"
+            if self.state.state == HALF_OPEN or self.state.failure_counts:
+                return "degraded"
+            return "healthy"
+
+    def rejecting(self) -> bool:
+        """
+        Cheap pre-check for the request path: True while a call would
+        certainly be rejected, so callers can skip preparing one.
+        """
+        state = self.state
+        if state.state == OPEN:
+            return self._now() < (state.disabled_until_ts or 0.0)
+        if state.state == HALF_OPEN:
+            return state.probes_in_flight >= self.half_open_probes
+        return False
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state.state == OPEN:
+                if self._now() < (state.disabled_until_ts or 0.0):
+                    return False
+                self._transition(HALF_OPEN, "cooldown_elapsed")
+            if state.state == HALF_OPEN:
+                if state.probes_in_flight >= self.half_open_probes:
+                    return False
+                state.probes_in_flight += 1
+            return True
 
     def record_success(self) -> None:
-        self.state.last_success_ts = self._now()
-        self.state.failure_count = 0
-        self.state.disabled_until_ts = None
-
-    def record_failure(self) -> None:
-        self.state.last_failure_ts = self._now()
-        self.state.failure_count += 1
-        if self.state.failure_count >= self.failure_threshold:
-            self.state.disabled_until_ts = self._now() + self.cooldown_seconds
+        with self._lock:
+            state = self.state
+            state.last_success_ts = time.time()
+            if state.state == HALF_OPEN:
+                state.probes_in_flight = max(0, state.probes_in_flight - 1)
+                state.probe_successes += 1
+                if state.probe_successes >= self.close_after:
+                    self._transition(CLOSED, "probes_succeeded")
+            else:
+                state.failure_counts.clear()
+
+    def record_failure(self, error_class: str = "other") -> None:
+        with self._lock:
+            state = self.state
+            state.last_failure_ts = time.time()
+            state.last_failure_class = error_class
+            if state.state == HALF_OPEN:
+                self._transition(OPEN, f"probe_failed:{error_class}")
+                return
+            if state.state == OPEN:
+                return
+            # Streaks are per class; any success resets them all
+            count = state.failure_counts.get(error_class, 0) + 1
+            state.failure_counts[error_class] = count
+            if count >= self.thresholds.get(error_class, self.thresholds.get("other", 5)):
+                self._transition(OPEN, error_class)
+
+    def release(self) -> None:
+        with self._lock:
+            if self.state.state == HALF_OPEN:
+                self.state.probes_in_flight = max(0, self.state.probes_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            state = self.state
+            retry_in = None
+            if state.state == OPEN and state.disabled_until_ts is not None:
+                retry_in = round(max(0.0, state.disabled_until_ts - self._now()), 2)
+            return {
+                "state": state.state,
+                "consecutive_failures": dict(state.failure_counts),
+                "last_failure_class": state.last_failure_class,
+                "retry_in_s": retry_in,
+                "probes_in_flight": state.probes_in_flight,
+                "thresholds": dict(self.thresholds),
+                "cooldown_seconds": self.cooldown_seconds,
+            }
+
+
+_BREAKERS: Dict[str, LLMHealthManager] = {}
+_BREAKERS_LOCK = Lock()
+
+
+def get_llm_breaker(provider: str) -> LLMHealthManager:
+    """The breaker of one provider (registry name), created on first use."""
+    breaker = _BREAKERS.get(provider)
+    if breaker is None:
+        with _BREAKERS_LOCK:
+            breaker = _BREAKERS.setdefault(provider, LLMHealthManager(provider))
+    return breaker
+
+
+def _breakers_status() -> Dict[str, object]:
+    return {name: breaker.snapshot() for name, breaker in list(_BREAKERS.items())}
+
+
+SystemMonitor().register_component("llm_breaker", _breakers_status)
@@ -0,0 +1,148 @@
+"""
+LLM Hedging (v3).
+Races a slow primary LLM call against a backup provider: the backup is only
+started once the primary has taken longer than its recent p95, the first
+answer wins and the other call is cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+from app.v3.system.histogram import WindowedHistogram
+from app.v3.system.observability import SystemMonitor
+
+T = TypeVar("T")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class Hedger:
+    """
+    race() starts the primary call and waits up to delay_ms(primary). If it
+    has not answered by then, or has already failed, the secondary is
+    started too; whichever succeeds first is returned and the other is
+    cancelled. A failure only loses the race: the result is an error only
+    when both calls fail.
+
+    The delay is the primary's `quantile` latency over the sliding window,
+    clamped to [min_delay_ms, max_delay_ms], and default_delay_ms until it
+    has min_samples calls. Only successful calls are timed: a fast error or
+    a cancelled loser says nothing about how long an answer takes.
+    """
+
+    def __init__(
+        self,
+        *,
+        quantile: float = 0.95,
+        default_delay_ms: float = 1000.0,
+        min_delay_ms: float = 100.0,
+        max_delay_ms: float = 3000.0,
+        min_samples: int = 20,
+        window_seconds: float = 300.0,
+    ) -> None:
+        self.quantile = quantile
+        self.default_delay_ms = default_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.min_samples = min_samples
+        self.window_seconds = window_seconds
+        self._latency: Dict[str, WindowedHistogram] = {}
+
+    def _histogram(self, provider: str) -> WindowedHistogram:
+        histogram = self._latency.get(provider)
+        if histogram is None:
+            histogram = self._latency[provider] = WindowedHistogram(window_seconds=self.window_seconds)
+        return histogram
+
+    def observe(self, provider: str, latency_ms: float) -> None:
+        self._histogram(provider).record(latency_ms)
+
+    def delay_ms(self, provider: str) -> float:
+        value, count = self._histogram(provider).quantile(self.quantile)
+        if count < self.min_samples:
+            return self.default_delay_ms
+        return max(self.min_delay_ms, min(value, self.max_delay_ms))
+
+    async def _timed(self, provider: str, call: Callable[[], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        result = await call()
+        self.observe(provider, (time.monotonic() - start) * 1000)
+        return result
+
+    async def race(
+        self,
+        primary: str,
+        call_primary: Callable[[], Awaitable[T]],
+        secondary: str,
+        call_secondary: Callable[[], Awaitable[T]],
+    ) -> Tuple[T, str]:
+        """Returns (result, name of the provider that produced it)."""
+        monitor = SystemMonitor()
+        first = asyncio.ensure_future(self._timed(primary, call_primary))
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self.delay_ms(primary) / 1000.0)
+        except asyncio.CancelledError:
+            first.cancel()
+            raise
+        if done and first.exception() is None:
+            monitor.record_llm_hedge(fired=False, winner=primary)
+            return first.result(), primary
+
+        # The primary is slow, or already failed: the backup goes now
+        hedge_start = time.monotonic()
+        second = asyncio.ensure_future(self._timed(secondary, call_secondary))
+        names = {first: primary, second: secondary}
+        pending = {second} if done else {first, second}
+        winner = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # On a tie the primary's answer is preferred
+                for task in sorted(done, key=lambda t: t is not first):
+                    if task.exception() is None:
+                        winner = task
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # What the hedge added: one more call, running from the hedge until the race ended
+        extra_ms = (time.monotonic() - hedge_start) * 1000
+        if winner is None:
+            monitor.record_llm_hedge(fired=True, winner=None, extra_ms=extra_ms)
+            raise first.exception()
+        monitor.record_llm_hedge(fired=True, winner=names[winner], extra_ms=extra_ms)
+        return winner.result(), names[winner]
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": LLM_HEDGE_ENABLED,
+            "delay_ms": {name: round(self.delay_ms(name), 2) for name in self._latency},
+            "latency_ms": {name: histogram.snapshot() for name, histogram in self._latency.items()},
+        }
+
+
+_HEDGER = Hedger(
+    quantile=_env_int("LLM_HEDGE_QUANTILE_PCT", 95) / 100.0,
+    default_delay_ms=_env_int("LLM_HEDGE_DEFAULT_DELAY_MS", 1000),
+    min_delay_ms=_env_int("LLM_HEDGE_MIN_DELAY_MS", 100),
+    max_delay_ms=_env_int("LLM_HEDGE_MAX_DELAY_MS", 3000),
+    min_samples=_env_int("LLM_HEDGE_MIN_SAMPLES", 20),
+)
+SystemMonitor().register_component("llm_hedger", _HEDGER.stats)
+
+
+def get_hedger() -> Hedger:
+    return _HEDGER
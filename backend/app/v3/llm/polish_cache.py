@@ -0,0 +1,240 @@
+"""
+LLM Polish Cache (v3).
+Two-tier cache in front of the polish LLM call: a bounded in-memory LRU with
+TTL, plus an optional SQLite tier that survives restarts and is shared by
+every worker on the host. The SQLite tier never runs on the event loop:
+request-path reads (aget) run on the cache's own small thread pool, over a
+read-only connection with a short busy timeout, and writes are batched by a
+write-behind thread on a separate connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+import sqlite3
+from threading import Lock
+import time
+from typing import Any, Dict, Sequence, Tuple
+
+from app.v4.state.session_backend import WriteBehindQueue
+
+logger = logging.getLogger("portfolio.v3.llm.cache")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+# Disk-tier lookups; separate from the LLM SDK pool, whose threads a slow provider can hold
+LLM_POLISH_CACHE_READ_WORKERS = max(1, _env_int("LLM_POLISH_CACHE_READ_WORKERS", 2))
+_READ_EXECUTOR = ThreadPoolExecutor(max_workers=LLM_POLISH_CACHE_READ_WORKERS, thread_name_prefix="polish-cache-read")
+
+
+def normalize_question(question: str) -> str:
+    return " ".join((question or "").lower().split()).rstrip("?!. ")
+
+
+def polish_fingerprint(
+    question: str,
+    *,
+    intent: str | None,
+    strategy: str | None,
+    recruiter_type: str | None,
+    raw_text: str,
+    data_version: str | int | None,
+) -> str:
+    raw_hash = hashlib.sha256((raw_text or "").encode("utf-8")).hexdigest()
+    parts = (
+        normalize_question(question),
+        intent or "",
+        strategy or "",
+        (recruiter_type or "").upper(),
+        raw_hash,
+        str(data_version or ""),
+    )
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedPolish:
+    answer: str
+    llm_ms: float
+    tier: str
+
+
+class PolishCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        ttl_seconds: int = 3600,
+        db_path: str | None = None,
+        read_timeout_seconds: float = 0.05,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._lock = Lock()
+        self._memory: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = Lock()
+        # Lookups never wait for the write-behind thread's commit
+        self._read_db: sqlite3.Connection | None = None
+        self._read_lock = Lock()
+        self.read_timeout_seconds = read_timeout_seconds
+        self._puts_since_prune = 0
+        self._writer: WriteBehindQueue | None = None
+        if db_path:
+            self._open_db(db_path)
+        if self._db is not None:
+            # PolishCache is the queue's backend: save_many() writes one batch
+            self._writer = WriteBehindQueue(self, interval_seconds=0.05)
+            atexit.register(self._writer.close)
+
+    def _open_db(self, db_path: str) -> None:
+        try:
+            conn = sqlite3.connect(db_path, timeout=1.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS polish_cache ("
+                "key TEXT PRIMARY KEY, answer TEXT NOT NULL, "
+                "llm_ms REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.commit()
+            read_conn = sqlite3.connect(db_path, timeout=self.read_timeout_seconds, check_same_thread=False)
+            read_conn.execute("PRAGMA query_only=ON")
+            self._db, self._read_db = conn, read_conn
+        except sqlite3.Error:
+            logger.exception("polish_cache.db_open_failed")
+            self._db = None
+
+    def _get_memory(self, key: str, now: float) -> CachedPolish | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, answer, llm_ms = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    return CachedPolish(answer=answer, llm_ms=llm_ms, tier="memory")
+                del self._memory[key]
+        return None
+
+    def get(self, key: str) -> CachedPolish | None:
+        """Blocking lookup (disk tier included); async callers use aget()."""
+        now = time.time()
+        hit = self._get_memory(key, now)
+        if hit is not None or self._db is None:
+            return hit
+        return self._get_disk(key, now)
+
+    async def aget(self, key: str) -> CachedPolish | None:
+        """Memory tier inline; the disk tier on the cache's read pool, off the event loop."""
+        now = time.time()
+        hit = self._get_memory(key, now)
+        if hit is not None or self._db is None:
+            return hit
+        return await asyncio.get_running_loop().run_in_executor(_READ_EXECUTOR, self._get_disk, key, now)
+
+    def _get_disk(self, key: str, now: float) -> CachedPolish | None:
+        try:
+            with self._read_lock:
+                row = self._read_db.execute(
+                    "SELECT answer, llm_ms, created_at FROM polish_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except sqlite3.Error:
+            logger.exception("polish_cache.db_read_failed")
+            return None
+        if row is None or now - row[2] > self.ttl_seconds:
+            return None
+        self._remember(key, row[0], row[1], row[2])
+        return CachedPolish(answer=row[0], llm_ms=row[1], tier="disk")
+
+    def put(self, key: str, answer: str, llm_ms: float) -> None:
+        """Memory tier now; the disk write is queued for the write-behind thread."""
+        now = time.time()
+        self._remember(key, answer, llm_ms, now)
+        if self._writer is not None:
+            self._writer.submit("polish", key, {"answer": answer, "llm_ms": llm_ms, "created_at": now})
+
+    def save_many(self, rows: Sequence[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Writes one batch of queued puts (write-behind thread), pruning every ~100 rows."""
+        params = [(key, data["answer"], data["llm_ms"], data["created_at"]) for _ns, key, data in rows]
+        try:
+            with self._db_lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO polish_cache (key, answer, llm_ms, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    params,
+                )
+                self._puts_since_prune += len(params)
+                if self._puts_since_prune >= 100:
+                    self._puts_since_prune = 0
+                    self._db.execute(
+                        "DELETE FROM polish_cache WHERE created_at < ?",
+                        (time.time() - self.ttl_seconds,),
+                    )
+                self._db.commit()
+        except sqlite3.Error:
+            logger.exception("polish_cache.db_write_failed")
+
+    def flush(self) -> None:
+        """Writes queued disk puts now, on the calling thread."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def _remember(self, key: str, answer: str, llm_ms: float, created_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (created_at, answer, llm_ms)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            self.flush()
+            with self._db_lock:
+                self._db.execute("DELETE FROM polish_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            size = len(self._memory)
+        return {
+            "memory_entries": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_enabled": self._db is not None,
+            "disk_write_behind": self._writer.stats() if self._writer is not None else None,
+        }
+
+
+_CACHE: PolishCache | None = None
+_CACHE_LOCK = Lock()
+
+
+def get_polish_cache() -> PolishCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = PolishCache(
+                    max_entries=_env_int("LLM_POLISH_CACHE_SIZE", 256),
+                    ttl_seconds=_env_int("LLM_POLISH_CACHE_TTL_SECONDS", 3600),
+                    db_path=os.getenv("LLM_POLISH_CACHE_DB") or None,
+                    read_timeout_seconds=_env_int("LLM_POLISH_CACHE_READ_TIMEOUT_MS", 50) / 1000.0,
+                )
+    return _CACHE
@@ -1,16 +1,216 @@
 """
-LLM Provider Factory (v3).
-Allows swapping providers without changing controller code.
+LLM Providers (v3).
+One async interface over every LLM backend, and a registry of shared
+per-process provider instances, so swapping or adding a provider needs no
+change in the polish layer.
 """
 
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import os
+from threading import Lock
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from app.v3.llm.groq_client import close_groq_client, get_groq_client, get_groq_settings
+from app.v3.system.observability import SystemMonitor
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+# Blocking SDK calls run here instead of the default executor, so a slow
+# provider can never hold more than this many threads. A call abandoned by
+# its caller (timeout, losing a hedge race) keeps its thread until the SDK
+# returns, so size this for the calls that can be abandoned at once, not
+# just the ones awaited.
+LLM_BLOCKING_WORKERS = max(1, _env_int("LLM_BLOCKING_WORKERS", 4))
+_BLOCKING_EXECUTOR = ThreadPoolExecutor(max_workers=LLM_BLOCKING_WORKERS, thread_name_prefix="llm-blocking")
+_BLOCKING_LOCK = Lock()
+_BLOCKING_RUNNING = 0
+
+
+def _run_counted(call: Callable[[], Any]) -> Any:
+    global _BLOCKING_RUNNING
+    with _BLOCKING_LOCK:
+        _BLOCKING_RUNNING += 1
+    try:
+        return call()
+    finally:
+        with _BLOCKING_LOCK:
+            _BLOCKING_RUNNING -= 1
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs a blocking SDK call on the dedicated, bounded LLM thread pool.
+    Cancelling the await does not stop a call that has started.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BLOCKING_EXECUTOR, _run_counted, functools.partial(fn, *args, **kwargs))
+
+
+class LLMProvider:
+    """
+    Chat-style completion backend. `messages` are OpenAI-style
+    [{"role", "content"}] dicts; `timeout` (seconds) bounds the whole call.
+    """
+
+    name = "base"
+    # llm_error_reason when the provider is not configured
+    unavailable_reason = "LLM_PROVIDER_UNAVAILABLE"
+
+    def available(self) -> bool:
+        raise NotImplementedError
+
+    async def complete(
+        self, messages: list, *, max_tokens: int, temperature: float = 0.7, timeout: Optional[float] = None
+    ) -> str:
+        raise NotImplementedError
+
+    def stream(
+        self, messages: list, *, max_tokens: int, temperature: float = 0.7, timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Async iterator of text chunks."""
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class GroqProvider(LLMProvider):
+    """AsyncGroq over the process-wide pooled client (llm/groq_client.py)."""
+
+    name = "groq"
+    unavailable_reason = "GROQ_API_KEY_MISSING"
+
+    def available(self) -> bool:
+        return get_groq_client() is not None
+
+    def _request(self, messages: list, max_tokens: int, temperature: float, timeout: Optional[float]) -> dict:
+        request = {
+            "model": get_groq_settings().model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if timeout is not None:
+            request["timeout"] = timeout
+        return request
+
+    async def complete(self, messages, *, max_tokens, temperature=0.7, timeout=None) -> str:
+        completion = await get_groq_client().chat.completions.create(
+            **self._request(messages, max_tokens, temperature, timeout)
+        )
+        return completion.choices[0].message.content.strip()
 
-from app.v3.llm.gemini_client import GeminiClient
+    async def stream(self, messages, *, max_tokens, temperature=0.7, timeout=None) -> AsyncIterator[str]:
+        chunks = await get_groq_client().chat.completions.create(
+            stream=True, **self._request(messages, max_tokens, temperature, timeout)
+        )
+        async for chunk in chunks:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
+
+    async def aclose(self) -> None:
+        await close_groq_client()
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini through the shared GeminiClient (llm/gemini_client.py)."""
+
+    name = "gemini"
+    unavailable_reason = "GEMINI_API_KEY_MISSING"
+
+    def _client(self):
+        # Imported lazily: google-genai is only needed once Gemini is used
+        from app.v3.llm.gemini_client import get_gemini_client
+
+        return get_gemini_client()
+
+    def available(self) -> bool:
+        return self._client().enabled
+
+    async def complete(self, messages, *, max_tokens, temperature=0.7, timeout=None) -> str:
+        return await self._client().complete(
+            messages, max_tokens=max_tokens, temperature=temperature, timeout=timeout
+        )
+
+    async def stream(self, messages, *, max_tokens, temperature=0.7, timeout=None) -> AsyncIterator[str]:
+        async for text in self._client().stream(
+            messages, max_tokens=max_tokens, temperature=temperature, timeout=timeout
+        ):
+            yield text
+
+    async def aclose(self) -> None:
+        await self._client().aclose()
+
+
+_FACTORIES: Dict[str, Callable[[], LLMProvider]] = {
+    "groq": GroqProvider,
+    "gemini": GeminiProvider,
+}
+_INSTANCES: Dict[str, LLMProvider] = {}
+_REGISTRY_LOCK = Lock()
+
+
+def register_provider(name: str, factory: Callable[[], LLMProvider]) -> None:
+    """Adds (or replaces) a provider; its shared instance is built on first use."""
+    with _REGISTRY_LOCK:
+        _FACTORIES[name] = factory
+        _INSTANCES.pop(name, None)
+
+
+def get_provider(name: str) -> LLMProvider:
+    """The shared instance for `name`; raises ValueError for unknown providers."""
+    provider = _INSTANCES.get(name)
+    if provider is not None:
+        return provider
+    with _REGISTRY_LOCK:
+        if name not in _INSTANCES:
+            factory = _FACTORIES.get(name)
+            if factory is None:
+                raise ValueError(f"unknown LLM provider: {name}")
+            _INSTANCES[name] = factory()
+        return _INSTANCES[name]
+
+
+async def close_providers() -> None:
+    """Closes every provider built so far (app shutdown)."""
+    with _REGISTRY_LOCK:
+        providers = list(_INSTANCES.values())
+        _INSTANCES.clear()
+    for provider in providers:
+        await provider.aclose()
+
+
+def _registry_status() -> Dict[str, object]:
+    return {
+        "registered": sorted(_FACTORIES),
+        "active": sorted(_INSTANCES),
+        "blocking_workers": LLM_BLOCKING_WORKERS,
+        # Includes calls whose caller already gave up on them
+        "blocking_running": _BLOCKING_RUNNING,
+    }
+
+
+SystemMonitor().register_component("llm_providers", _registry_status)
 
 
 def get_llm_client():
-    provider = os.getenv("LLM_PROVIDER", "gemini").lower().strip()
-    if provider == "gemini":
-        return GeminiClient()
-    # Future providers: openrouter, local, azure, anthropic, etc.
-    return GeminiClient()
+    """
+    Legacy entry point: the shared Gemini client (used for rewrite()).
+    New code should use get_provider().
+    """
+    from app.v3.llm.gemini_client import get_gemini_client
+
+    return get_gemini_client()
@@ -0,0 +1,179 @@
+"""
+LLM Scheduler (v3).
+Admission control for LLM polish calls: a concurrency limit, a bounded
+priority wait queue, and load shedding back to the unpolished answer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+import os
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.v3.system.observability import SystemMonitor
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+# Lower runs first. Role-fit answers are what recruiters wait for; plain
+# summaries read fine unpolished, so they queue last and shed first.
+LANE_PRIORITY: Dict[str, int] = {"role_fit": 0, "default": 1, "summary": 2}
+
+
+def polish_lane(intent: Optional[str], strategy: Optional[str]) -> str:
+    if intent == "role_fit_evaluation":
+        return "role_fit"
+    if strategy == "summary_strategy":
+        return "summary"
+    return "default"
+
+
+class LLMShed(Exception):
+    """Raised instead of waiting when a call is not admitted."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class LLMScheduler:
+    """
+    At most `max_concurrency` calls hold a slot. Others wait in a priority
+    queue (by lane, then arrival) of at most `max_queue` entries, and a
+    freed slot is handed straight to the best waiter.
+
+    A call is shed (LLMShed) when the queue is full, when its predicted wait
+    exceeds the wait budget, or when it actually waits that long. The
+    prediction is (waiters ahead / slots + 0.5) * the recent average slot
+    hold time.
+
+    Event-loop only: all state is touched from coroutines on one loop, so no
+    lock is needed.
+    """
+
+    SERVICE_EWMA_ALPHA = 0.2
+
+    def __init__(self, *, max_concurrency: int, max_queue: int, max_wait_ms: float) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_wait_ms = max_wait_ms
+        self._active = 0
+        self._queue: List[list] = []  # [priority, seq, future, lane]
+        self._queued = 0
+        self._seq = itertools.count()
+        self._service_ms: Optional[float] = None
+
+    def predicted_wait_ms(self, priority: int) -> float:
+        if self._service_ms is None:
+            return 0.0
+        ahead = sum(1 for entry in self._queue if entry[0] <= priority and not entry[2].done())
+        return (ahead // self.max_concurrency + 0.5) * self._service_ms
+
+    @asynccontextmanager
+    async def slot(self, lane: str = "default", budget_ms: Optional[float] = None) -> AsyncIterator[None]:
+        # A caller's budget (e.g. what its request deadline leaves) can only tighten the limit
+        await self._acquire(lane, self.max_wait_ms if budget_ms is None else min(budget_ms, self.max_wait_ms))
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._observe((time.monotonic() - start) * 1000)
+            self._release()
+
+    async def _acquire(self, lane: str, budget_ms: float) -> None:
+        monitor = SystemMonitor()
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            monitor.record_llm_admission(queued=False, wait_ms=0.0)
+            return
+
+        priority = LANE_PRIORITY.get(lane, LANE_PRIORITY["default"])
+        if self._queued >= self.max_queue:
+            monitor.record_llm_shed("queue_full")
+            raise LLMShed("queue_full")
+        if self.predicted_wait_ms(priority) > budget_ms:
+            monitor.record_llm_shed("wait_budget")
+            raise LLMShed("wait_budget")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, [priority, next(self._seq), future, lane])
+        self._queued += 1
+        monitor.record_llm_queue_depth(self._queued)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=max(0.0, budget_ms) / 1000.0)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Handed over in the same loop iteration the timeout fired
+                # (wait_for on 3.12+); _release already took us off the queue
+                self._release()
+            else:
+                self._leave_queue()
+            monitor.record_llm_shed("wait_timeout")
+            raise LLMShed("wait_timeout") from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled
+                self._release()
+            else:
+                self._leave_queue()
+            raise
+        monitor.record_llm_admission(queued=True, wait_ms=(time.monotonic() - start) * 1000)
+
+    def _leave_queue(self) -> None:
+        self._queued -= 1
+        SystemMonitor().record_llm_queue_depth(self._queued)
+
+    def _release(self) -> None:
+        # Hand the slot to the best live waiter; cancelled entries are dropped lazily
+        while self._queue:
+            _, _, future, _ = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self._queued -= 1
+            SystemMonitor().record_llm_queue_depth(self._queued)
+            future.set_result(None)
+            return
+        self._active -= 1
+
+    def _observe(self, held_ms: float) -> None:
+        if self._service_ms is None:
+            self._service_ms = held_ms
+        else:
+            self._service_ms += self.SERVICE_EWMA_ALPHA * (held_ms - self._service_ms)
+
+    def stats(self) -> Dict[str, object]:
+        by_lane: Dict[str, int] = {}
+        for _, _, future, lane in self._queue:
+            if not future.done():
+                by_lane[lane] = by_lane.get(lane, 0) + 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_ms": self.max_wait_ms,
+            "active": self._active,
+            "queued": self._queued,
+            "queued_by_lane": by_lane,
+            "avg_slot_ms": round(self._service_ms, 2) if self._service_ms is not None else None,
+        }
+
+
+_SCHEDULER = LLMScheduler(
+    max_concurrency=_env_int("LLM_MAX_CONCURRENCY", 8),
+    max_queue=_env_int("LLM_QUEUE_MAX", 32),
+    max_wait_ms=_env_int("LLM_QUEUE_MAX_WAIT_MS", 2000),
+)
+SystemMonitor().register_component("llm_scheduler", _SCHEDULER.stats)
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    return _SCHEDULER
@@ -0,0 +1,69 @@
+"""
+Single Flight (v3).
+Coalesces concurrent calls that share a key into one in-flight task.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[T]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    The first caller for a key (the leader) starts `fn()` as a separate task;
+    callers arriving while it runs (followers) await the same task. Everyone
+    gets its result, or its exception.
+
+    The task is shielded from individual waiters: a cancelled waiter simply
+    leaves, and the task is cancelled only once every waiter has left. Keys
+    are forgotten as soon as the task finishes, so nothing is cached here.
+
+    `on_join(shared)` is called for every caller, before it starts waiting.
+    """
+
+    def __init__(self, on_join: Optional[Callable[[bool], None]] = None) -> None:
+        self._flights: Dict[str, _Flight[T]] = {}
+        self._on_join = on_join
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Returns (result, shared); shared is True for followers.
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task, f=flight: self._forget(key, f))
+
+        if self._on_join is not None:
+            self._on_join(shared)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Last waiter gone: stop the call and let new callers start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def in_flight(self) -> int:
+        return len(self._flights)
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+
+from app.v3.layers import llm_polish
+from app.v3.llm import health_manager
+from app.v3.llm.health_manager import CLOSED, HALF_OPEN, OPEN, LLMHealthManager, classify_llm_error
+
+
+def _breaker(clock):
+    breaker = LLMHealthManager(
+        thresholds={"timeout": 2, "other": 5}, cooldown_seconds=30, half_open_probes=1, close_after=2
+    )
+    breaker._now = lambda: clock[0]
+    return breaker
+
+
+def test_timeout_streak_opens_and_cooldown_lets_one_probe_through():
+    clock = [100.0]
+    breaker = _breaker(clock)
+    assert classify_llm_error(httpx.ReadTimeout("t")) == "timeout"
+
+    breaker.record_failure("timeout")
+    breaker.record_success()  # a success resets the streak
+    breaker.record_failure("timeout")
+    assert breaker.state.state == CLOSED
+    breaker.record_failure("timeout")
+    assert breaker.state.state == OPEN
+    assert not breaker.allow_request() and breaker.rejecting()
+
+    clock[0] += 31
+    assert breaker.allow_request()
+    assert breaker.state.state == HALF_OPEN
+    assert not breaker.allow_request()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state.state == CLOSED
+
+
+def test_probe_failure_reopens_for_another_cooldown():
+    clock = [0.0]
+    breaker = _breaker(clock)
+    for _ in range(2):
+        breaker.record_failure("timeout")
+    clock[0] += 31
+    assert breaker.allow_request()
+    breaker.record_failure("server_error")
+    assert breaker.state.state == OPEN
+    assert breaker.snapshot()["retry_in_s"] == 30
+
+
+def test_open_breaker_skips_the_llm_call(fake_groq, monkeypatch):
+    fake_groq.error = httpx.ReadTimeout("upstream timed out")
+    monkeypatch.setitem(health_manager._BREAKERS, "groq", _breaker([0.0]))
+
+    async def run():
+        kwargs = {"intent": "skills_query", "allow_llm": True}
+        return [
+            await llm_polish.polish_response(f"Question {i}?", "Raw answer.", **kwargs)
+            for i in range(4)
+        ]
+
+    results = asyncio.run(run())
+    assert [r.llm_status for r in results[2:]] == ["circuit_open", "circuit_open"]
+    assert all(r.answer == "Raw answer." for r in results)
+    assert not results[3].llm_error
+    assert fake_groq.calls == 2
+
+
+def test_legacy_failure_threshold_is_the_default_for_every_class(monkeypatch):
+    monkeypatch.setenv("LLM_FAILURE_THRESHOLD", "7")
+    monkeypatch.setenv("LLM_BREAKER_THRESHOLDS", "timeout=2")
+    thresholds = health_manager._thresholds_from_env()
+    assert thresholds["timeout"] == 2
+    assert thresholds["server_error"] == thresholds["connection"] == 7
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import httpx
+
+from app.v3.layers import llm_polish
+from app.v3.llm import health_manager, hedging
+from app.v3.llm.hedging import Hedger
+from app.v3.system.observability import SystemMonitor
+
+
+def _call(result, delay_s, log, name, fail=False):
+    async def call():
+        log.append(f"{name}:start")
+        try:
+            await asyncio.sleep(delay_s)
+        except asyncio.CancelledError:
+            log.append(f"{name}:cancelled")
+            raise
+        if fail:
+            raise RuntimeError(f"{name} failed")
+        return result
+
+    return call
+
+
+def test_fast_primary_never_hedges():
+    hedger = Hedger(default_delay_ms=50, min_samples=1000)
+    log = []
+    result = asyncio.run(
+        hedger.race("groq", _call("A", 0.0, log, "groq"), "gemini", _call("B", 0.0, log, "gemini"))
+    )
+    assert result == ("A", "groq")
+    assert log == ["groq:start"]
+
+
+def test_slow_primary_is_hedged_and_loser_cancelled():
+    hedger = Hedger(default_delay_ms=20, min_samples=1000)
+    log = []
+    result = asyncio.run(
+        hedger.race("groq", _call("A", 1.0, log, "groq"), "gemini", _call("B", 0.01, log, "gemini"))
+    )
+    assert result == ("B", "gemini")
+    assert log == ["groq:start", "gemini:start", "groq:cancelled"]
+
+
+def test_failed_backup_waits_for_the_primary():
+    hedger = Hedger(default_delay_ms=10, min_samples=1000)
+    log = []
+    result = asyncio.run(
+        hedger.race("groq", _call("A", 0.05, log, "groq"), "gemini", _call("B", 0.0, log, "gemini", fail=True))
+    )
+    assert result == ("A", "groq")
+
+
+def test_fast_primary_failure_starts_the_backup_at_once():
+    hedger = Hedger(default_delay_ms=1000, min_samples=1000)
+    log = []
+    before = SystemMonitor()._hedge_status()["wins"].get("groq", 0)
+    start = time.monotonic()
+    result = asyncio.run(
+        hedger.race("groq", _call("A", 0.0, log, "groq", fail=True), "gemini", _call("B", 0.0, log, "gemini"))
+    )
+    assert result == ("B", "gemini")
+    assert time.monotonic() - start < 0.5  # did not sit out the hedge delay
+    assert SystemMonitor()._hedge_status()["wins"].get("groq", 0) == before
+    # Only the successful call is timed
+    assert hedger.stats()["latency_ms"]["gemini"]["count"] == 1
+    assert hedger.stats()["latency_ms"]["groq"]["count"] == 0
+
+
+def test_delay_tracks_the_primary_p95_within_bounds():
+    hedger = Hedger(default_delay_ms=1000, min_delay_ms=100, max_delay_ms=3000, min_samples=20)
+    for _ in range(19):
+        hedger.observe("groq", 400.0)
+    assert hedger.delay_ms("groq") == 1000  # not enough samples yet
+    hedger.observe("groq", 400.0)
+    assert 380 <= hedger.delay_ms("groq") <= 420
+    for _ in range(20):
+        hedger.observe("groq", 1.0)
+    assert hedger.delay_ms("groq") >= 100
+    for _ in range(200):
+        hedger.observe("groq", 60000.0)
+    assert hedger.delay_ms("groq") == 3000
+
+
+class _FastBackup:
+    name = "backup"
+
+    def __init__(self):
+        self.kwargs = None
+
+    async def complete(self, messages, **kwargs):
+        self.kwargs = kwargs
+        return "From Gemini."
+
+
+def test_polish_uses_the_backup_answer_when_groq_stalls(fake_groq, monkeypatch):
+    backup = _FastBackup()
+    fake_groq.latency_s = 1.0
+    monkeypatch.setattr(hedging, "_HEDGER", Hedger(default_delay_ms=20, min_samples=1000))
+    monkeypatch.setattr(llm_polish, "_hedge_backup", lambda: backup)
+
+    result = asyncio.run(
+        llm_polish.polish_response("Would you hire him?", "Raw fit summary.", intent="role_fit_evaluation")
+    )
+    assert result.llm_used and result.answer == "From Gemini."
+    assert backup.kwargs["max_tokens"] == llm_polish.POLISH_MAX_TOKENS
+
+
+def test_groq_outage_covered_by_the_backup_opens_only_the_groq_breaker(fake_groq, monkeypatch):
+    backup = _FastBackup()
+    fake_groq.error = httpx.ConnectError("groq is down")
+    monkeypatch.setattr(hedging, "_HEDGER", Hedger(default_delay_ms=1000, min_samples=1000))
+    monkeypatch.setattr(llm_polish, "_hedge_backup", lambda: backup)
+
+    async def run():
+        return [
+            await llm_polish.polish_response(f"Question {i}?", "Raw answer.", intent="skills_query")
+            for i in range(5)
+        ]
+
+    results = asyncio.run(run())
+    assert all(r.llm_used and r.answer == "From Gemini." for r in results)
+    assert health_manager.get_llm_breaker("groq").state.state == health_manager.OPEN
+    assert health_manager.get_llm_breaker("backup").state.state == health_manager.CLOSED
+    assert fake_groq.calls == 3  # then calls fail over to the backup directly
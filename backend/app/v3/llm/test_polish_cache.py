@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+from app.v3.layers import llm_polish
+from app.v3.llm import polish_cache
+from app.v3.llm.polish_cache import PolishCache, polish_fingerprint
+from app.v3.system.observability import SystemMonitor
+
+
+def test_fingerprint_normalizes_question_only():
+    base = dict(intent="skills_query", strategy="summary_strategy", recruiter_type="TECH_LEAD", data_version="v1")
+    a = polish_fingerprint("What  skills does he have?", raw_text="raw", **base)
+    b = polish_fingerprint("what skills does he have", raw_text="raw", **base)
+    c = polish_fingerprint("what skills does he have", raw_text="raw2", **base)
+    assert a == b
+    assert a != c
+
+
+def test_memory_tier_is_bounded_lru_with_ttl(monkeypatch):
+    cache = PolishCache(max_entries=2, ttl_seconds=10)
+    cache.put("a", "A", 100.0)
+    cache.put("b", "B", 100.0)
+    assert cache.get("a").answer == "A"
+    cache.put("c", "C", 100.0)
+    assert cache.get("b") is None  # least recently used
+    assert cache.get("a").tier == "memory"
+
+    now = polish_cache.time.time()
+    monkeypatch.setattr(polish_cache.time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    db = str(tmp_path / "polish.db")
+    first = PolishCache(db_path=db)
+    first.put("k", "polished", 850.0)
+    first.flush()  # normally the write-behind thread's job
+    restarted = PolishCache(db_path=db)
+    hit = asyncio.run(restarted.aget("k"))
+    assert (hit.answer, hit.llm_ms, hit.tier) == ("polished", 850.0, "disk")
+    assert restarted.get("k").tier == "memory"
+
+
+def test_disk_reads_do_not_wait_for_the_writer_or_the_llm_pool(tmp_path):
+    db = str(tmp_path / "polish.db")
+    first = PolishCache(db_path=db)
+    first.put("k", "polished", 850.0)
+    first.flush()
+    cache = PolishCache(db_path=db)
+    threads = []
+    real_get_disk = cache._get_disk
+
+    def get_disk(key, now):
+        threads.append(threading.current_thread().name)
+        return real_get_disk(key, now)
+
+    cache._get_disk = get_disk
+    # The write-behind thread holds this lock for a whole batch commit
+    with cache._db_lock:
+        hit = asyncio.run(cache.aget("k"))
+    assert hit.tier == "disk"
+    assert threads[0].startswith("polish-cache-read")
+
+
+def test_disk_puts_are_written_behind_in_batches(tmp_path):
+    cache = PolishCache(db_path=str(tmp_path / "polish.db"))
+    cache._writer.interval_seconds = 10
+    for i in range(5):
+        cache.put(f"k{i}", "polished", 1.0)
+    assert cache.stats()["disk_write_behind"]["pending"] == 5
+    cache.flush()
+    stats = cache.stats()["disk_write_behind"]
+    assert (stats["rows_written"], stats["batches"]) == (5, 1)
+
+
+def test_polish_response_serves_repeats_from_cache(fake_groq):
+    monitor = SystemMonitor()
+    saved_before = monitor.llm_cache_saved_ms
+
+    async def ask():
+        return await llm_polish.polish_response(
+            "Would you hire him?",
+            "raw answer",
+            intent="role_fit_evaluation",
+            strategy="comparison_strategy",
+            recruiter_type="TECH_LEAD",
+            allow_llm=True,
+        )
+
+    first = asyncio.run(ask())
+    second = asyncio.run(ask())
+    assert fake_groq.calls == 1
+    assert first.answer == second.answer == "Polished answer."
+    assert not first.llm_cached and second.llm_cached
+    assert monitor.llm_cache_saved_ms > saved_before
+
+
+def test_polish_response_honours_allow_llm(fake_groq):
+    result = asyncio.run(llm_polish.polish_response("hi", "raw", allow_llm=False))
+    assert fake_groq.calls == 0
+    assert result.llm_status == "skipped"
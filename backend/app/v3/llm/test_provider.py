@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.v3.layers import llm_polish
+from app.v3.llm import provider
+from app.v3.llm.provider import LLMProvider, get_provider, register_provider, run_blocking
+
+
+class _EchoProvider(LLMProvider):
+    name = "echo"
+    built = 0
+
+    def __init__(self):
+        _EchoProvider.built += 1
+
+    def available(self) -> bool:
+        return True
+
+    async def complete(self, messages, *, max_tokens, temperature=0.7, timeout=None) -> str:
+        return f"echo:{max_tokens}"
+
+    async def stream(self, messages, *, max_tokens, temperature=0.7, timeout=None):
+        for text in ("ec", "ho"):
+            yield text
+
+
+@pytest.fixture
+def echo(fake_groq, monkeypatch):
+    monkeypatch.setattr(provider, "_FACTORIES", dict(provider._FACTORIES))
+    monkeypatch.setattr(llm_polish, "LLM_PRIMARY_PROVIDER", "echo")
+    register_provider("echo", _EchoProvider)
+    _EchoProvider.built = 0
+
+
+def test_registry_shares_one_instance_per_provider(echo):
+    assert get_provider("echo") is get_provider("echo")
+    assert _EchoProvider.built == 1
+    with pytest.raises(ValueError):
+        get_provider("nope")
+
+
+def test_polish_dispatches_through_the_registered_provider(echo):
+    async def run():
+        polished = await llm_polish.polish_response("Hire him?", "Raw.", intent="role_fit_evaluation")
+        events = [
+            e async for e in llm_polish.stream_polish_response("Hire him now?", "Raw.", intent="role_fit_evaluation")
+        ]
+        return polished, events
+
+    polished, events = asyncio.run(run())
+    assert polished.llm_used and polished.answer == f"echo:{llm_polish.POLISH_MAX_TOKENS}"
+    assert [e["text"] for e in events if e["type"] == "token"] == ["ec", "ho"]
+    assert events[-1]["result"].answer == "echo"
+
+
+def test_blocking_calls_stay_on_the_bounded_pool():
+    async def run():
+        return await asyncio.gather(*(run_blocking(lambda: threading.current_thread().name) for _ in range(20)))
+
+    names = set(asyncio.run(run()))
+    assert all(name.startswith("llm-blocking") for name in names)
+    assert len(names) <= provider.LLM_BLOCKING_WORKERS
+
+
+def test_abandoned_blocking_call_still_counts_as_running():
+    release = threading.Event()
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(run_blocking(release.wait, 5), timeout=0.05)
+        return provider._registry_status()["blocking_running"]
+
+    try:
+        assert asyncio.run(run()) == 1  # the thread is still busy after the caller gave up
+    finally:
+        release.set()
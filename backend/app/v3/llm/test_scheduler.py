@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.v3.layers import llm_polish
+from app.v3.llm import scheduler
+from app.v3.llm.scheduler import LLMScheduler, LLMShed
+
+
+async def _hold(sched, lane, order, hold_s=0.02, budget_ms=None):
+    async with sched.slot(lane, budget_ms):
+        order.append(lane)
+        await asyncio.sleep(hold_s)
+
+
+def test_waiters_are_served_by_lane_priority():
+    async def run():
+        sched = LLMScheduler(max_concurrency=1, max_queue=10, max_wait_ms=5000)
+        order = []
+        first = asyncio.create_task(_hold(sched, "default", order))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(_hold(sched, lane, order)) for lane in ("summary", "default", "role_fit")]
+        await asyncio.gather(first, *queued)
+        return order, sched.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == ["default", "role_fit", "default", "summary"]
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_full_queue_and_wait_timeout_shed():
+    async def run():
+        sched = LLMScheduler(max_concurrency=1, max_queue=1, max_wait_ms=5000)
+        order = []
+        holder = asyncio.create_task(_hold(sched, "default", order, hold_s=0.2))
+        await asyncio.sleep(0)
+        timed_out = asyncio.create_task(_hold(sched, "default", order, budget_ms=20))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMShed) as full:
+            await _hold(sched, "role_fit", order)
+        with pytest.raises(LLMShed) as late:
+            await timed_out
+        await holder
+        return full.value.reason, late.value.reason, sched.stats()
+
+    full, late, stats = asyncio.run(run())
+    assert (full, late) == ("queue_full", "wait_timeout")
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_slot_handed_over_as_the_wait_times_out_is_released(monkeypatch):
+    async def run():
+        sched = LLMScheduler(max_concurrency=1, max_queue=1, max_wait_ms=5000)
+        await sched._acquire("default", 5000)  # the holder
+
+        async def handover_then_timeout(future, timeout):
+            # The holder releases to us in the same iteration the timeout fires
+            sched._release()
+            assert future.done()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(scheduler.asyncio, "wait_for", handover_then_timeout)
+        with pytest.raises(LLMShed) as late:
+            await sched._acquire("default", 20)
+        return late.value.reason, sched.stats()
+
+    reason, stats = asyncio.run(run())
+    assert reason == "wait_timeout"
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_shed_polish_returns_the_rules_answer(fake_groq, monkeypatch):
+    fake_groq.latency_s = 0.02
+    fake_groq.reply = "Polished once."
+    monkeypatch.setattr(scheduler, "_SCHEDULER", LLMScheduler(max_concurrency=1, max_queue=0, max_wait_ms=0))
+
+    async def run():
+        kwargs = {"intent": "role_fit_evaluation", "allow_llm": True}
+        return await asyncio.gather(
+            llm_polish.polish_response("Would you hire him?", "Raw fit summary.", **kwargs),
+            llm_polish.polish_response("Is he a fit for us?", "Raw fit summary.", **kwargs),
+        )
+
+    polished, shed = asyncio.run(run())
+    assert polished.llm_used and polished.answer == "Polished once."
+    assert shed.llm_status == "shed" and shed.answer == "Raw fit summary."
+    assert not shed.llm_error and shed.llm_error_reason == "shed:queue_full"
+    assert fake_groq.calls == 1
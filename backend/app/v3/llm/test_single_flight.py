@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.v3.layers import llm_polish
+from app.v3.llm.single_flight import SingleFlight
+from app.v3.system.observability import SystemMonitor
+
+
+@pytest.fixture
+def slow_llm(fake_groq):
+    fake_groq.latency_s = 0.05
+    fake_groq.reply = "Polished once."
+    return fake_groq
+
+
+def _burst(n: int):
+    async def run():
+        return await asyncio.gather(
+            *(
+                llm_polish.polish_response(
+                    "Would you hire him?",
+                    "raw answer",
+                    intent="role_fit_evaluation",
+                    strategy="comparison_strategy",
+                    recruiter_type="TECH_LEAD",
+                )
+                for _ in range(n)
+            )
+        )
+
+    return asyncio.run(run())
+
+
+def test_concurrent_identical_polishes_share_one_call(slow_llm):
+    monitor = SystemMonitor()
+    coalesced_before = monitor.llm_coalesced_total
+
+    results = _burst(20)
+
+    assert slow_llm.calls == 1
+    assert {r.answer for r in results} == {"Polished once."}
+    assert sum(r.llm_coalesced for r in results) == 19
+    assert monitor.llm_coalesced_total - coalesced_before == 19
+    assert llm_polish._POLISH_FLIGHTS.in_flight() == 0
+
+
+def test_followers_share_the_leaders_error(slow_llm):
+    slow_llm.error = RuntimeError("upstream 503")
+    failures_before = SystemMonitor().llm_failures_total
+
+    results = _burst(5)
+
+    assert slow_llm.calls == 1
+    assert all(r.llm_error and r.llm_error_reason == "upstream 503" for r in results)
+    assert all(r.answer == "raw answer" for r in results)
+    assert SystemMonitor().llm_failures_total - failures_before == 1
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flights = SingleFlight()
+    calls = 0
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flights.do("k", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("k", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == ("done", True)
+    assert calls == 1
+
+
+def test_call_is_cancelled_when_every_waiter_leaves():
+    flights = SingleFlight()
+    started = []
+    cancelled = []
+
+    async def slow():
+        started.append(1)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def run():
+        waiters = [asyncio.ensure_future(flights.do("k", slow)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for w in waiters:
+            w.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert flights.in_flight() == 0
+        # A new caller starts a fresh call instead of joining the cancelled one
+        fresh = asyncio.ensure_future(flights.do("k", slow))
+        await asyncio.sleep(0.01)
+        fresh.cancel()
+        await asyncio.gather(fresh, return_exceptions=True)
+
+    asyncio.run(run())
+    assert len(started) == 2
+    assert len(cancelled) == 2
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List, Dict, Any
 
 
-@dataclass
+@dataclass(frozen=True)
 class ExperienceModel:
     role: str
     company: str
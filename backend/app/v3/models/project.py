@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List, Dict, Any
 
 
-@dataclass
+@dataclass(frozen=True)
 class ProjectModel:
     id: str
     title: str
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List, Dict, Any
 
 
-@dataclass
+@dataclass(frozen=True)
 class SkillModel:
     programming_languages: Dict[str, List[str]]
     databases: Dict[str, List[str]]
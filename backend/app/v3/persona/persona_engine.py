@@ -12,6 +12,7 @@ from app.v3.persona.persona_modes import (
     FOUNDER_MODE,
     DEFAULT_MODE,
 )
+from app.v3.system.tracing import traced
 
 PERSONA_CONFIG = {
     "name": "Narayan",
@@ -42,6 +43,7 @@ def _variant_for_recruiter(recruiter_type: str) -> str:
     return "default"
 
 
+@traced("persona.apply_dynamic_persona")
 def apply_dynamic_persona(
     answer: str,
     intent: str,
@@ -1,11 +1,18 @@
 """
 Recruiter Classifier (v3.5).
 Classifies recruiter type based on keyword density.
+
+All keyword lists are compiled into one automaton, so a question is scanned
+once for the tech, HR and product hit counts.
 """
 
 from __future__ import annotations
 
 import logging
+from typing import Iterable, List, Tuple
+
+from app.v3.text.automaton import MultiPatternMatcher
+from app.v3.system.tracing import traced
 
 
 TECH_KEYWORDS = [
@@ -76,38 +83,68 @@ if not logger.handlers:
     logging.basicConfig(level=logging.INFO)
 
 
-def _count_keywords(q: str, keywords: list[str]) -> int:
-    return sum(1 for k in keywords if k in q)
+_KEYWORD_MATCHER = MultiPatternMatcher(
+    [(k, ("tech", k)) for k in TECH_KEYWORDS]
+    + [(k, ("hr", k)) for k in HR_KEYWORDS]
+    + [(k, ("product", k)) for k in PRODUCT_KEYWORDS]
+)
+
+
+def keyword_hits(question: str) -> Tuple[int, int, int]:
+    """
+    Distinct (tech, hr, product) keywords found in the question, in one pass.
+    """
+    counts = {"tech": 0, "hr": 0, "product": 0}
+    for category, _keyword in _KEYWORD_MATCHER.find_set((question or "").lower()):
+        counts[category] += 1
+    return counts["tech"], counts["hr"], counts["product"]
+
+
+def _recruiter_type(tech_hits: int, hr_hits: int, product_hits: int) -> str:
+    if tech_hits >= 1:
+        return "TECH_LEAD"
+    if hr_hits >= 1:
+        return "HR_MANAGER"
+    if product_hits >= 1:
+        return "PRODUCT_MANAGER"
+    return "GENERALIST"
 
 
 class RecruiterClassifier:
     @classmethod
+    @traced("persona.classify_recruiter")
     def classify(cls, question: str) -> str:
-        q = (question or "").lower()
-        tech_hits = _count_keywords(q, TECH_KEYWORDS)
-        hr_hits = _count_keywords(q, HR_KEYWORDS)
-        product_hits = _count_keywords(q, PRODUCT_KEYWORDS)
-
-        if tech_hits >= 1:
-            detected = "TECH_LEAD"
-        elif hr_hits >= 1:
-            detected = "HR_MANAGER"
-        elif product_hits >= 1:
-            detected = "PRODUCT_MANAGER"
-        else:
-            detected = "GENERALIST"
-
-        logger.info(
-            "recruiter_type_detected",
-            extra={
-                "type": detected,
-                "tech_hits": tech_hits,
-                "hr_hits": hr_hits,
-                "product_hits": product_hits,
-            },
-        )
+        tech_hits, hr_hits, product_hits = keyword_hits(question)
+        detected = _recruiter_type(tech_hits, hr_hits, product_hits)
+
+        # Per-request detail is debug-only; keep the hot path free of log records
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "recruiter_type_detected",
+                extra={
+                    "type": detected,
+                    "tech_hits": tech_hits,
+                    "hr_hits": hr_hits,
+                    "product_hits": product_hits,
+                },
+            )
         return detected
 
+    @classmethod
+    def classify_many(cls, questions: Iterable[str]) -> List[str]:
+        """
+        Batch/replay variant of classify; repeated questions are scanned once.
+        """
+        seen: dict[str, str] = {}
+        out: List[str] = []
+        for question in questions:
+            q = (question or "").lower()
+            detected = seen.get(q)
+            if detected is None:
+                detected = seen[q] = _recruiter_type(*keyword_hits(q))
+            out.append(detected)
+        return out
+
 
 def detect_recruiter_type(question: str, metadata: dict | None = None) -> str:
     """
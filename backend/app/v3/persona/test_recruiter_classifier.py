@@ -0,0 +1,43 @@
+from app.v3.persona.recruiter_classifier import (
+    HR_KEYWORDS,
+    PRODUCT_KEYWORDS,
+    TECH_KEYWORDS,
+    RecruiterClassifier,
+    keyword_hits,
+)
+
+
+def _legacy_hits(question: str):
+    q = (question or "").lower()
+    return tuple(
+        sum(1 for k in keywords if k in q)
+        for keywords in (TECH_KEYWORDS, HR_KEYWORDS, PRODUCT_KEYWORDS)
+    )
+
+
+QUESTIONS = [
+    "",
+    None,
+    "How does he handle NoSQL vs SQL sharding at scale?",
+    "Is he a good cultural fit for the team?",
+    "What is his notice period and salary expectation?",
+    "Which KPI moved after the feature launch?",
+    "Users and customers: any product impact?",
+    "Tell me about yourself",
+    "Outside work, any hobbies or passion projects with Docker?",
+]
+
+
+def test_single_pass_hits_match_per_list_scans():
+    for question in QUESTIONS + TECH_KEYWORDS + HR_KEYWORDS + PRODUCT_KEYWORDS:
+        assert keyword_hits(question) == _legacy_hits(question), question
+
+
+def test_classify_many_matches_classify():
+    assert RecruiterClassifier.classify_many(QUESTIONS) == [
+        RecruiterClassifier.classify(q) for q in QUESTIONS
+    ]
+    assert RecruiterClassifier.classify("Kubernetes and team culture") == "TECH_LEAD"
+    assert RecruiterClassifier.classify("Remote friendly?") == "HR_MANAGER"
+    assert RecruiterClassifier.classify("What is the roadmap?") == "PRODUCT_MANAGER"
+    assert RecruiterClassifier.classify("Hello there") == "GENERALIST"
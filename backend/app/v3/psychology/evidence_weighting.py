@@ -7,6 +7,8 @@ from __future__ import annotations
 
 from typing import List, Dict, Any
 
+from app.v3.system.tracing import traced
+
 
 def _rank_order_for_recruiter(recruiter_type: str) -> List[str]:
     if recruiter_type == "hr_recruiter":
@@ -20,6 +22,7 @@ def _rank_order_for_recruiter(recruiter_type: str) -> List[str]:
     return ["experience", "projects", "skills", "certificates", "education", "contact"]
 
 
+@traced("psychology.rank_evidence")
 def rank_evidence(evidence_list: List[Dict[str, Any]], recruiter_type: str) -> List[Dict[str, Any]]:
     order = _rank_order_for_recruiter(recruiter_type)
     order_index = {name: idx for idx, name in enumerate(order)}
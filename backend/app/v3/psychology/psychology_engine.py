@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Tuple
 
 from app.v3.psychology.evidence_weighting import rank_evidence
 from app.v3.psychology.recruiter_psychology_profiles import PROFILES
+from app.v3.system.tracing import traced
 
 
 def _summarize_evidence(evidence: List[Dict[str, Any]]) -> str:
@@ -48,6 +49,7 @@ def _summarize_evidence(evidence: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
+@traced("psychology.apply_psychology_layer")
 def apply_psychology_layer(
     answer: str,
     evidence: List[Dict[str, Any]],
@@ -0,0 +1,131 @@
+"""
+Request Deadline (v3).
+Per-request time budget, carried in a ContextVar through every pipeline stage.
+
+The budget comes from CHAT_DEADLINE_MS or the client's X-Request-Deadline-Ms
+header. Stages ask how much is left and skip optional work once it is gone;
+the LLM call derives its timeout and max_tokens from the remainder.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+import os
+import time
+from typing import Any, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+CHAT_DEADLINE_MS = _env_int("CHAT_DEADLINE_MS", 8000)
+CHAT_DEADLINE_MAX_MS = _env_int("CHAT_DEADLINE_MAX_MS", 30000)
+# Kept back from every budget for the context update and the response
+DEADLINE_RESERVE_MS = _env_int("DEADLINE_RESERVE_MS", 50)
+# Below this an LLM call cannot usefully finish, so it is not started
+LLM_MIN_BUDGET_MS = _env_int("LLM_MIN_BUDGET_MS", 500)
+# Rough provider speed, used to cap max_tokens to what fits in the budget
+LLM_FIRST_TOKEN_MS = _env_float("LLM_FIRST_TOKEN_MS", 300.0)
+LLM_TOKENS_PER_SECOND = _env_float("LLM_TOKENS_PER_SECOND", 250.0)
+LLM_MIN_TOKENS = 64
+
+
+class DeadlineExceeded(Exception):
+    """Raised when there is no budget left for the work about to start."""
+
+
+def parse_deadline_ms(value: Any) -> Optional[int]:
+    """A client-supplied budget in ms, capped at CHAT_DEADLINE_MAX_MS; None if unusable."""
+    try:
+        budget = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    if budget <= 0:
+        return None
+    return min(budget, CHAT_DEADLINE_MAX_MS)
+
+
+@dataclass(frozen=True)
+class LLMBudget:
+    timeout_s: float
+    max_tokens: int
+
+
+class Deadline:
+    __slots__ = ("budget_ms", "expires_at", "exceeded_at")
+
+    def __init__(self, budget_ms: float) -> None:
+        self.budget_ms = budget_ms
+        self.expires_at = time.monotonic() + budget_ms / 1000.0
+        self.exceeded_at: Optional[str] = None
+
+    def remaining_ms(self) -> float:
+        """Budget left for work, after DEADLINE_RESERVE_MS."""
+        return (self.expires_at - time.monotonic()) * 1000.0 - DEADLINE_RESERVE_MS
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= 0
+
+    def exceed(self, stage: str) -> None:
+        """Records the first stage that was cut short."""
+        if self.exceeded_at is None:
+            self.exceeded_at = stage
+
+    def llm_wait_budget_ms(self) -> float:
+        """How long an LLM call may queue and still leave LLM_MIN_BUDGET_MS for the call."""
+        return max(0.0, self.remaining_ms() - LLM_MIN_BUDGET_MS)
+
+    def llm_budget(self, max_tokens: int) -> Optional[LLMBudget]:
+        """Timeout and token cap for an LLM call started now; None if it cannot fit."""
+        remaining = self.remaining_ms()
+        if remaining < LLM_MIN_BUDGET_MS:
+            return None
+        fits = int((remaining - LLM_FIRST_TOKEN_MS) / 1000.0 * LLM_TOKENS_PER_SECOND)
+        return LLMBudget(timeout_s=remaining / 1000.0, max_tokens=max(LLM_MIN_TOKENS, min(max_tokens, fits)))
+
+    def snapshot(self) -> dict:
+        return {
+            "budget_ms": self.budget_ms,
+            "remaining_ms": round(self.remaining_ms(), 2),
+            "exceeded_at": self.exceeded_at,
+        }
+
+
+_DEADLINE: ContextVar[Optional[Deadline]] = ContextVar("portfolio_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _DEADLINE.get()
+
+
+class start_deadline:
+    """
+    Sets the deadline for the enclosed work (CHAT_DEADLINE_MS when budget_ms
+    is None). Yields the Deadline.
+    """
+
+    __slots__ = ("deadline", "_token")
+
+    def __init__(self, budget_ms: Optional[float] = None) -> None:
+        self.deadline = Deadline(CHAT_DEADLINE_MS if budget_ms is None else budget_ms)
+        self._token = None
+
+    def __enter__(self) -> Deadline:
+        self._token = _DEADLINE.set(self.deadline)
+        return self.deadline
+
+    def __exit__(self, *exc) -> None:
+        _DEADLINE.reset(self._token)
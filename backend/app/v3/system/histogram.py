@@ -0,0 +1,154 @@
+"""
+Latency Histograms (v3).
+Log-bucketed (HDR-style) histograms and a sliding-window wrapper for
+per-stage latency percentiles.
+"""
+
+from __future__ import annotations
+
+from array import array
+import math
+from threading import Lock
+import time
+from typing import Dict, Iterable, List
+
+
+class LogHistogram:
+    """
+    Fixed-size histogram over [lowest, lowest * 2**exponents). Each power of
+    two is split into `sub_buckets` linear buckets, so any recorded value is
+    reported within 1/sub_buckets relative error. Values outside the range
+    are clamped into the first/last bucket; the exact max is kept aside.
+    Not thread-safe on its own.
+    """
+
+    __slots__ = ("lowest", "exponents", "sub_buckets", "counts", "count", "total", "max")
+
+    def __init__(self, lowest: float = 0.01, exponents: int = 26, sub_buckets: int = 16) -> None:
+        self.lowest = lowest
+        self.exponents = exponents
+        self.sub_buckets = sub_buckets
+        self.counts = array("Q", bytes(8 * exponents * sub_buckets))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        # value / lowest = m * 2**e with m in [0.5, 1)
+        m, e = math.frexp(value / self.lowest)
+        index = (e - 1) * self.sub_buckets + int((m - 0.5) * 2 * self.sub_buckets)
+        return min(index, len(self.counts) - 1)
+
+    def _upper_bound(self, index: int) -> float:
+        e, sub = divmod(index, self.sub_buckets)
+        return self.lowest * (2 ** e) * (1 + (sub + 1) / self.sub_buckets)
+
+    def record(self, value: float) -> None:
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LogHistogram") -> None:
+        counts = self.counts
+        for i, n in enumerate(other.counts):
+            if n:
+                counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def reset(self) -> None:
+        self.counts = array("Q", bytes(8 * len(self.counts)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def percentiles(self, quantiles: Iterable[float]) -> List[float]:
+        """Upper bucket bound at each quantile (capped at the true max)."""
+        wanted = sorted((q, i) for i, q in enumerate(quantiles))
+        out = [0.0] * len(wanted)
+        if not self.count:
+            return out
+        seen = 0
+        w = 0
+        for index, n in enumerate(self.counts):
+            if not n:
+                continue
+            seen += n
+            while w < len(wanted) and seen >= math.ceil(wanted[w][0] * self.count):
+                out[wanted[w][1]] = min(self._upper_bound(index), self.max)
+                w += 1
+            if w == len(wanted):
+                break
+        return out
+
+
+class WindowedHistogram:
+    """
+    Thread-safe sliding window of `slices` LogHistograms covering the last
+    `window_seconds`; the oldest slice is recycled as time moves on. Lifetime
+    count and sum are kept alongside for counters/summaries.
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, window_seconds: float = 300.0, slices: int = 10) -> None:
+        self.window_seconds = window_seconds
+        self.slices = max(1, slices)
+        self._slice_seconds = window_seconds / self.slices
+        self._lock = Lock()
+        self._ring = [LogHistogram() for _ in range(self.slices)]
+        self._slice_ids = [-1] * self.slices
+        self.lifetime_count = 0
+        self.lifetime_total = 0.0
+
+    def _slice_locked(self, now: float) -> LogHistogram:
+        slice_id = int(now // self._slice_seconds)
+        pos = slice_id % self.slices
+        if self._slice_ids[pos] != slice_id:
+            self._ring[pos].reset()
+            self._slice_ids[pos] = slice_id
+        return self._ring[pos]
+
+    def record(self, value: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._slice_locked(now).record(value)
+            self.lifetime_count += 1
+            self.lifetime_total += value
+
+    def _merged_locked(self, now: float) -> LogHistogram:
+        merged = LogHistogram()
+        current = int(now // self._slice_seconds)
+        for pos, slice_id in enumerate(self._slice_ids):
+            if current - self.slices < slice_id <= current:
+                merged.merge(self._ring[pos])
+        return merged
+
+    def quantile(self, q: float) -> tuple[float, int]:
+        """(value at quantile q, sample count) over the window."""
+        now = time.monotonic()
+        with self._lock:
+            merged = self._merged_locked(now)
+        return merged.percentiles((q,))[0], merged.count
+
+    def snapshot(self) -> Dict[str, float]:
+        now = time.monotonic()
+        with self._lock:
+            merged = self._merged_locked(now)
+            lifetime_count, lifetime_total = self.lifetime_count, self.lifetime_total
+        p50, p90, p99 = merged.percentiles(self.QUANTILES)
+        return {
+            "count": merged.count,
+            "p50": round(p50, 2),
+            "p90": round(p90, 2),
+            "p99": round(p99, 2),
+            "max": round(merged.max, 2),
+            "window_seconds": self.window_seconds,
+            "lifetime_count": lifetime_count,
+            "lifetime_sum": round(lifetime_total, 2),
+        }
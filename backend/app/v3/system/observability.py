@@ -1,6 +1,34 @@
+import os
 import time
 import threading
 
+from app.v3.system.histogram import WindowedHistogram
+
+# Stages handle_chat times (timing["<stage>_ms"]), in pipeline order
+LATENCY_STAGES = (
+    "context_load",
+    "intent",
+    "strategy",
+    "rules",
+    "fallback_rerank",
+    "recruiter",
+    "analytics",
+    "psychology",
+    "persona",
+    "entities",
+    "polish",
+    "context_update",
+    "total",
+)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
 class SystemMonitor:
     _instance = None
     _lock = threading.Lock()
@@ -8,15 +36,16 @@ class SystemMonitor:
     def __new__(cls):
         with cls._lock:
             if cls._instance is None:
-                cls._instance = super(SystemMonitor, cls).__new__(cls)
-                cls._instance._initialized = False
+                instance = super(SystemMonitor, cls).__new__(cls)
+                # Fully set up before any other thread can see it
+                instance._setup()
+                cls._instance = instance
             return cls._instance
 
-    def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
-        
+    def _setup(self):
+        # Guards every counter below; histograms carry their own locks
+        self._metrics_lock = threading.Lock()
+
         # Metrics
         self.llm_requests_total = 0
         self.llm_failures_total = 0
@@ -25,9 +54,59 @@ class SystemMonitor:
         self.last_failure_reason = None
         self.last_failure_timestamp = None
 
+        # LLM polish cache
+        self.llm_cache_hits = {"memory": 0, "disk": 0}
+        self.llm_cache_misses = 0
+        self.llm_cache_saved_ms = 0.0
+
+        # Single-flight coalescing of identical polish calls
+        self.llm_flights_total = 0
+        self.llm_coalesced_total = 0
+
+        # LLM admission control (scheduler)
+        self.llm_admitted_total = 0
+        self.llm_queued_total = 0
+        self.llm_shed_total = {}
+        self.llm_queue_depth = 0
+
+        # LLM circuit breakers, one per provider
+        self.llm_breaker_states = {}
+        self.llm_breaker_transitions = {}
+        self.llm_breaker_last_transition = None
+        self.llm_short_circuited_total = 0
+
+        # Hedged LLM calls (primary raced against a backup provider)
+        self.llm_hedge_races_total = 0
+        self.llm_hedge_fired_total = 0
+        self.llm_hedge_wins = {}
+        self.llm_hedge_failed_total = 0
+        self.llm_hedge_extra_ms = 0.0
+
+        # Requests cut short by their deadline, by the stage that was skipped
+        self.deadline_exceeded_total = {}
+
+        # Per-stage latency, sliding window
+        window = _env_float("LATENCY_WINDOW_SECONDS", 300.0)
+        self._stage_latency = {stage: WindowedHistogram(window_seconds=window) for stage in LATENCY_STAGES}
+        self._llm_queue_wait = WindowedHistogram(window_seconds=window)
+
+        # Named status providers (caches, stores, ...) merged into get_status()
+        self._components = {}
+
+    def register_component(self, name: str, provider):
+        """
+        Registers a callable whose dict result is reported under `name`.
+
+        Args:
+            name (str): Key used in the health snapshot.
+            provider (callable): Zero-argument callable returning a dict.
+        """
+        self._components[name] = provider
+
     def record_request(self):
         """Records a new incoming request to the pipeline."""
-        self.pipeline_requests_total += 1
+        with self._metrics_lock:
+            self.pipeline_requests_total += 1
 
     def record_llm_success(self, latency_ms: float):
         """
@@ -36,8 +115,9 @@ class SystemMonitor:
         Args:
             latency_ms (float): The time taken in milliseconds.
         """
-        self.llm_requests_total += 1
-        self.total_latency_ms += latency_ms
+        with self._metrics_lock:
+            self.llm_requests_total += 1
+            self.total_latency_ms += latency_ms
 
     def record_llm_failure(self, reason: str):
         """
@@ -46,30 +126,342 @@ class SystemMonitor:
         Args:
             reason (str): The error message or exception string.
         """
-        self.llm_failures_total += 1
-        self.last_failure_reason = reason
-        self.last_failure_timestamp = time.ctime()
+        with self._metrics_lock:
+            self.llm_failures_total += 1
+            self.last_failure_reason = reason
+            self.last_failure_timestamp = time.ctime()
+
+    def record_llm_cache_hit(self, tier: str, saved_ms: float):
+        """
+        Records a polish served from cache instead of the LLM.
+
+        Args:
+            tier (str): "memory" or "disk".
+            saved_ms (float): LLM latency the original call took.
+        """
+        with self._metrics_lock:
+            self.llm_cache_hits[tier] = self.llm_cache_hits.get(tier, 0) + 1
+            self.llm_cache_saved_ms += saved_ms
+
+    def record_llm_cache_miss(self):
+        """Records a polish lookup that had to go to the LLM."""
+        with self._metrics_lock:
+            self.llm_cache_misses += 1
+
+    def record_llm_flight(self, shared: bool):
+        """
+        Records a polish that went through the single-flight group.
+
+        Args:
+            shared (bool): True when it joined another request's in-flight call.
+        """
+        with self._metrics_lock:
+            if shared:
+                self.llm_coalesced_total += 1
+            else:
+                self.llm_flights_total += 1
+
+    def record_llm_admission(self, queued: bool, wait_ms: float):
+        """
+        Records an LLM call admitted by the scheduler.
+
+        Args:
+            queued (bool): True when it waited in the queue for a slot.
+            wait_ms (float): Time spent queued (0 when admitted directly).
+        """
+        with self._metrics_lock:
+            self.llm_admitted_total += 1
+            if queued:
+                self.llm_queued_total += 1
+        if queued:
+            self._llm_queue_wait.record(wait_ms)
+
+    def record_llm_shed(self, reason: str):
+        """
+        Records an LLM call the scheduler turned away (answered unpolished).
+
+        Args:
+            reason (str): "queue_full", "wait_budget" or "wait_timeout".
+        """
+        with self._metrics_lock:
+            self.llm_shed_total[reason] = self.llm_shed_total.get(reason, 0) + 1
+
+    def record_llm_queue_depth(self, depth: int):
+        """
+        Records the current number of calls waiting for an LLM slot.
+
+        Args:
+            depth (int): Waiting calls.
+        """
+        with self._metrics_lock:
+            self.llm_queue_depth = depth
+
+    def record_llm_breaker_transition(self, old_state: str, new_state: str, reason: str, provider: str = "groq"):
+        """
+        Records an LLM circuit breaker state change.
+
+        Args:
+            old_state (str): "closed", "open" or "half_open".
+            new_state (str): The state entered.
+            reason (str): Error class that opened it, or what closed it.
+            provider (str): The provider whose breaker changed.
+        """
+        with self._metrics_lock:
+            self.llm_breaker_states[provider] = new_state
+            key = (provider, new_state)
+            self.llm_breaker_transitions[key] = self.llm_breaker_transitions.get(key, 0) + 1
+            self.llm_breaker_last_transition = {
+                "provider": provider,
+                "from": old_state,
+                "to": new_state,
+                "reason": reason,
+                "timestamp": time.ctime(),
+            }
+
+    def record_llm_short_circuit(self):
+        """Records a polish answered unpolished because the breaker rejected it."""
+        with self._metrics_lock:
+            self.llm_short_circuited_total += 1
+
+    def record_llm_hedge(self, fired: bool, winner: str | None, extra_ms: float = 0.0):
+        """
+        Records one hedged LLM call.
+
+        Args:
+            fired (bool): True when the backup provider was called too.
+            winner (str | None): Provider whose answer was used; None if both failed.
+            extra_ms (float): How long the extra call ran before the race ended.
+        """
+        with self._metrics_lock:
+            self.llm_hedge_races_total += 1
+            if fired:
+                self.llm_hedge_fired_total += 1
+                self.llm_hedge_extra_ms += extra_ms
+            if winner is None:
+                self.llm_hedge_failed_total += 1
+            else:
+                self.llm_hedge_wins[winner] = self.llm_hedge_wins.get(winner, 0) + 1
+
+    def record_deadline_exceeded(self, stage: str):
+        """
+        Records a request whose deadline cut a stage short.
+
+        Args:
+            stage (str): The stage skipped or abandoned, e.g. "entities" or "polish".
+        """
+        with self._metrics_lock:
+            self.deadline_exceeded_total[stage] = self.deadline_exceeded_total.get(stage, 0) + 1
+
+    def record_stage_latency(self, stage: str, latency_ms: float):
+        """
+        Records one pipeline stage duration.
+
+        Args:
+            stage (str): One of LATENCY_STAGES.
+            latency_ms (float): The time taken in milliseconds.
+        """
+        histogram = self._stage_latency.get(stage)
+        if histogram is not None:
+            histogram.record(latency_ms)
+
+    def record_stage_timings(self, timing: dict):
+        """
+        Records every stage present in a handle_chat timing dict.
+
+        Args:
+            timing (dict): {"intent_ms": 0.4, "rules_ms": 1.2, ...}.
+        """
+        for stage in LATENCY_STAGES:
+            value = timing.get(f"{stage}_ms")
+            if isinstance(value, (int, float)):
+                self._stage_latency[stage].record(value)
+
+    def latency_status(self):
+        return {stage: histogram.snapshot() for stage, histogram in self._stage_latency.items()}
+
+    def _coalescing_status(self):
+        joined = self.llm_flights_total + self.llm_coalesced_total
+        return {
+            "llm_calls": self.llm_flights_total,
+            "coalesced": self.llm_coalesced_total,
+            "coalescing_ratio": round(self.llm_coalesced_total / joined, 4) if joined else 0.0,
+        }
+
+    def _admission_status(self):
+        return {
+            "admitted": self.llm_admitted_total,
+            "queued": self.llm_queued_total,
+            "shed": dict(self.llm_shed_total),
+            "queue_depth": self.llm_queue_depth,
+        }
+
+    def _breaker_status(self):
+        return {
+            "states": dict(self.llm_breaker_states),
+            "transitions": {
+                f"{provider}:{state}": n for (provider, state), n in sorted(self.llm_breaker_transitions.items())
+            },
+            "last_transition": self.llm_breaker_last_transition,
+            "short_circuited": self.llm_short_circuited_total,
+        }
+
+    def _hedge_status(self):
+        races = self.llm_hedge_races_total
+        return {
+            "races": races,
+            "fired": self.llm_hedge_fired_total,
+            "fire_rate": round(self.llm_hedge_fired_total / races, 4) if races else 0.0,
+            "wins": dict(self.llm_hedge_wins),
+            "win_rate": {name: round(n / races, 4) for name, n in self.llm_hedge_wins.items()},
+            "both_failed": self.llm_hedge_failed_total,
+            "extra_calls": self.llm_hedge_fired_total,
+            "extra_call_ms": round(self.llm_hedge_extra_ms, 2),
+        }
+
+    def _cache_status(self):
+        hits = sum(self.llm_cache_hits.values())
+        lookups = hits + self.llm_cache_misses
+        return {
+            "hits": dict(self.llm_cache_hits),
+            "misses": self.llm_cache_misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_llm_ms": round(self.llm_cache_saved_ms, 2),
+        }
 
     def get_status(self):
         """Returns the current system health snapshot."""
-        # Calculate Average Latency
-        avg_latency = 0.0
-        if self.llm_requests_total > 0:
-            avg_latency = self.total_latency_ms / self.llm_requests_total
-
-        # Determine Health Status
-        status = "healthy"
-        if self.llm_failures_total > 5:
-            status = "degraded"
-        
-        return {
-            "status": status,
-            "llm_requests_total": self.llm_requests_total,
-            "llm_failures_total": self.llm_failures_total,
-            "avg_latency_ms": round(avg_latency, 2),
-            "pipeline_requests_total": self.pipeline_requests_total,
-            "last_failure": {
-                "reason": self.last_failure_reason,
-                "timestamp": self.last_failure_timestamp
+        with self._metrics_lock:
+            # Calculate Average Latency
+            avg_latency = 0.0
+            if self.llm_requests_total > 0:
+                avg_latency = self.total_latency_ms / self.llm_requests_total
+
+            # Determine Health Status
+            status = "healthy"
+            if self.llm_failures_total > 5 or any(state != "closed" for state in self.llm_breaker_states.values()):
+                status = "degraded"
+
+            snapshot = {
+                "status": status,
+                "llm_requests_total": self.llm_requests_total,
+                "llm_failures_total": self.llm_failures_total,
+                "avg_latency_ms": round(avg_latency, 2),
+                "pipeline_requests_total": self.pipeline_requests_total,
+                "last_failure": {
+                    "reason": self.last_failure_reason,
+                    "timestamp": self.last_failure_timestamp
+                },
+                "llm_cache": self._cache_status(),
+                "llm_coalescing": self._coalescing_status(),
+                "llm_admission": self._admission_status(),
+                "llm_circuit": self._breaker_status(),
+                "llm_hedging": self._hedge_status(),
+                "deadline_exceeded": dict(self.deadline_exceeded_total),
             }
-        }
\ No newline at end of file
+        snapshot["llm_admission"]["queue_wait_ms"] = self._llm_queue_wait.snapshot()
+        snapshot["latency_ms"] = self.latency_status()
+        for name, provider in list(self._components.items()):
+            try:
+                snapshot[name] = provider()
+            except Exception as exc:
+                snapshot[name] = {"error": str(exc)}
+        return snapshot
+
+    def prometheus_text(self):
+        """Renders counters and stage latency in the Prometheus text format."""
+        with self._metrics_lock:
+            counters = [
+                ("portfolio_pipeline_requests_total", "Requests that reached the polish layer.", self.pipeline_requests_total),
+                ("portfolio_llm_requests_total", "Successful LLM polish calls.", self.llm_requests_total),
+                ("portfolio_llm_failures_total", "Failed LLM polish calls.", self.llm_failures_total),
+                ("portfolio_llm_cache_misses_total", "Polish cache lookups that went to the LLM.", self.llm_cache_misses),
+                ("portfolio_llm_coalesced_total", "Polishes that joined an in-flight identical call.", self.llm_coalesced_total),
+                ("portfolio_llm_admitted_total", "LLM calls admitted by the scheduler.", self.llm_admitted_total),
+                ("portfolio_llm_queued_total", "Admitted LLM calls that waited for a slot.", self.llm_queued_total),
+                ("portfolio_llm_short_circuited_total", "Polishes skipped by the open circuit breaker.", self.llm_short_circuited_total),
+                ("portfolio_llm_hedge_races_total", "LLM calls made in hedging mode.", self.llm_hedge_races_total),
+                ("portfolio_llm_hedge_fired_total", "Hedged calls that also called the backup provider.", self.llm_hedge_fired_total),
+                ("portfolio_llm_hedge_extra_ms_total", "Time extra hedge calls ran before their race ended.", round(self.llm_hedge_extra_ms, 2)),
+            ]
+            cache_hits = dict(self.llm_cache_hits)
+            shed = dict(self.llm_shed_total)
+            queue_depth = self.llm_queue_depth
+            breaker_states = dict(self.llm_breaker_states)
+            breaker_transitions = dict(self.llm_breaker_transitions)
+            deadline_exceeded = dict(self.deadline_exceeded_total)
+            hedge_wins = dict(self.llm_hedge_wins)
+
+        lines = []
+        for name, help_text, value in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"]
+        lines += [
+            "# HELP portfolio_llm_cache_hits_total Polishes served from cache.",
+            "# TYPE portfolio_llm_cache_hits_total counter",
+        ]
+        lines += [f'portfolio_llm_cache_hits_total{{tier="{tier}"}} {n}' for tier, n in sorted(cache_hits.items())]
+        lines += [
+            "# HELP portfolio_llm_shed_total LLM calls shed to the unpolished answer.",
+            "# TYPE portfolio_llm_shed_total counter",
+        ]
+        lines += [f'portfolio_llm_shed_total{{reason="{reason}"}} {n}' for reason, n in sorted(shed.items())]
+        lines += [
+            "# HELP portfolio_llm_queue_depth LLM calls waiting for a slot.",
+            "# TYPE portfolio_llm_queue_depth gauge",
+            f"portfolio_llm_queue_depth {queue_depth}",
+        ]
+        lines += [
+            "# HELP portfolio_llm_breaker_state Current LLM circuit breaker state per provider (1 for the active one).",
+            "# TYPE portfolio_llm_breaker_state gauge",
+        ]
+        lines += [
+            f'portfolio_llm_breaker_state{{provider="{provider}",state="{state}"}} {int(state == current)}'
+            for provider, current in sorted(breaker_states.items())
+            for state in ("closed", "half_open", "open")
+        ]
+        lines += [
+            "# HELP portfolio_llm_breaker_transitions_total LLM circuit breaker transitions by state entered.",
+            "# TYPE portfolio_llm_breaker_transitions_total counter",
+        ]
+        lines += [
+            f'portfolio_llm_breaker_transitions_total{{provider="{provider}",to="{state}"}} {n}'
+            for (provider, state), n in sorted(breaker_transitions.items())
+        ]
+        lines += [
+            "# HELP portfolio_llm_hedge_wins_total Hedged calls answered by each provider.",
+            "# TYPE portfolio_llm_hedge_wins_total counter",
+        ]
+        lines += [f'portfolio_llm_hedge_wins_total{{provider="{name}"}} {n}' for name, n in sorted(hedge_wins.items())]
+        lines += [
+            "# HELP portfolio_deadline_exceeded_total Requests whose deadline cut a stage short.",
+            "# TYPE portfolio_deadline_exceeded_total counter",
+        ]
+        lines += [
+            f'portfolio_deadline_exceeded_total{{stage="{stage}"}} {n}'
+            for stage, n in sorted(deadline_exceeded.items())
+        ]
+        wait = self._llm_queue_wait.snapshot()
+        lines += [
+            "# HELP portfolio_llm_queue_wait_ms Time queued LLM calls waited for a slot.",
+            "# TYPE portfolio_llm_queue_wait_ms summary",
+        ]
+        for quantile, key in (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99")):
+            lines.append(f'portfolio_llm_queue_wait_ms{{quantile="{quantile}"}} {wait[key]}')
+        lines.append(f"portfolio_llm_queue_wait_ms_sum {wait['lifetime_sum']}")
+        lines.append(f"portfolio_llm_queue_wait_ms_count {wait['lifetime_count']}")
+
+        latency = self.latency_status()
+        lines += [
+            "# HELP portfolio_stage_latency_ms Pipeline stage latency; quantiles over the sliding window.",
+            "# TYPE portfolio_stage_latency_ms summary",
+        ]
+        for stage, snap in latency.items():
+            for quantile, key in (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99")):
+                lines.append(f'portfolio_stage_latency_ms{{stage="{stage}",quantile="{quantile}"}} {snap[key]}')
+            lines.append(f'portfolio_stage_latency_ms_sum{{stage="{stage}"}} {snap["lifetime_sum"]}')
+            lines.append(f'portfolio_stage_latency_ms_count{{stage="{stage}"}} {snap["lifetime_count"]}')
+        lines += [
+            "# HELP portfolio_stage_latency_max_ms Slowest stage run in the sliding window.",
+            "# TYPE portfolio_stage_latency_max_ms gauge",
+        ]
+        lines += [f'portfolio_stage_latency_max_ms{{stage="{stage}"}} {snap["max"]}' for stage, snap in latency.items()]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,57 @@
+import random
+import threading
+
+from app.v3.system import histogram
+from app.v3.system.histogram import LogHistogram, WindowedHistogram
+from app.v3.system.observability import SystemMonitor
+
+
+def test_percentiles_within_bucket_precision():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    h = LogHistogram()
+    for v in values:
+        h.record(v)
+    values.sort()
+    for q, got in zip((0.5, 0.9, 0.99), h.percentiles((0.5, 0.9, 0.99))):
+        exact = values[int(q * len(values)) - 1]
+        assert abs(got - exact) / exact <= 1 / 16 + 0.01
+    assert h.percentiles((1.0,)) == [max(values)]
+
+
+def test_window_forgets_old_slices(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(histogram.time, "monotonic", lambda: now[0])
+    w = WindowedHistogram(window_seconds=60, slices=6)
+    w.record(900.0)
+    now[0] += 30
+    w.record(10.0)
+    assert w.snapshot()["max"] == 900.0
+    now[0] += 45  # the 900ms sample is now older than the window
+    snap = w.snapshot()
+    assert (snap["count"], snap["max"], snap["lifetime_count"]) == (1, 10.0, 2)
+
+
+def test_concurrent_records_are_not_lost():
+    w = WindowedHistogram()
+
+    def worker():
+        for _ in range(5000):
+            w.record(1.5)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert w.snapshot()["count"] == 40000
+
+
+def test_stage_timings_reach_health_and_metrics():
+    monitor = SystemMonitor()
+    before = monitor.latency_status()["rules"]["lifetime_count"]
+    monitor.record_stage_timings({"intent_ms": 0.3, "rules_ms": 1.2, "total_ms": 4.0, "error": "x"})
+    assert monitor.get_status()["latency_ms"]["rules"]["lifetime_count"] == before + 1
+    text = monitor.prometheus_text()
+    assert 'portfolio_stage_latency_ms{stage="rules",quantile="0.99"}' in text
+    assert "# TYPE portfolio_llm_requests_total counter" in text
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from app.v3.controller import ChatRequest, handle_chat
+from app.v3.system import tracing
+from app.v3.system.tracing import (
+    NOOP_SPAN,
+    InMemoryTraceExporter,
+    JsonlTraceExporter,
+    span,
+    stage,
+    start_trace,
+    traced,
+)
+
+
+@traced("test.work")
+def _work():
+    with span("inner", step=1):
+        return 42
+
+
+def _enable(monkeypatch, exporter, rate=1.0):
+    monkeypatch.setattr(tracing, "_EXPORTER", exporter)
+    monkeypatch.setattr(tracing, "_SAMPLE_RATE", rate)
+
+
+def test_disabled_tracing_is_a_noop_but_stages_still_time(monkeypatch):
+    _enable(monkeypatch, None, 0.0)
+    timing = {}
+    with start_trace("chat") as root, stage("rules", timing) as s:
+        assert root is NOOP_SPAN and s is NOOP_SPAN
+        assert span("x") is NOOP_SPAN
+        assert _work() == 42
+    assert "rules_ms" in timing
+
+
+def test_nested_spans_are_exported(monkeypatch):
+    exporter = InMemoryTraceExporter()
+    _enable(monkeypatch, exporter)
+    timing = {}
+    with start_trace("chat", session_id="s1"):
+        with stage("rules", timing):
+            _work()
+    (trace,) = exporter.traces
+    spans = {s["name"]: s for s in trace["spans"]}
+    assert trace["attrs"] == {"session_id": "s1"}
+    assert spans["rules"]["parent_id"] == spans["chat"]["span_id"]
+    assert spans["test.work"]["parent_id"] == spans["rules"]["span_id"]
+    assert spans["inner"]["parent_id"] == spans["test.work"]["span_id"]
+    assert spans["inner"]["attrs"] == {"step": 1}
+
+
+def test_sampling_rate_zero_exports_nothing(monkeypatch):
+    exporter = InMemoryTraceExporter()
+    _enable(monkeypatch, exporter, 0.0)
+    with start_trace("chat"):
+        _work()
+    assert exporter.traces == []
+
+
+def test_handle_chat_writes_jsonl_trace(monkeypatch, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    _enable(monkeypatch, JsonlTraceExporter(str(path)))
+    asyncio.run(handle_chat(ChatRequest(question="What projects has he built?", session_id="trace-test")))
+    (line,) = path.read_text().splitlines()
+    names = {s["name"] for s in json.loads(line)["spans"]}
+    assert {"chat", "context_load", "intent", "rules", "recruiter", "psychology", "polish", "context_update"} <= names
+    assert "domain_rules.run_rules" in names
@@ -0,0 +1,297 @@
+"""
+Tracing (v3).
+Nested spans and stage timers for the chat pipeline.
+
+    with start_trace("chat", session_id=...):     # sampled per TRACE_SAMPLE_RATE
+        with stage("rules", timing):              # always fills timing["rules_ms"]
+            ...
+        with span("psychology.rank"):             # free when the trace isn't sampled
+            ...
+
+    @traced("domain_rules.run_rules")
+    def run_rules(...): ...
+
+Finished sampled traces go to the configured exporter (JSONL by default).
+Outside a sampled trace, span() and @traced cost one ContextVar lookup.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+from threading import Lock
+import time
+from typing import Any, Callable, Dict, List, Optional
+import uuid
+
+logger = logging.getLogger("portfolio.v3.tracing")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+# --- Exporters ---
+
+class TraceExporter:
+    def export(self, trace: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class JsonlTraceExporter(TraceExporter):
+    """Appends one JSON object per finished trace to a local file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = Lock()
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        line = json.dumps(trace, separators=(",", ":"), default=str)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+        except OSError:
+            logger.exception("tracing.export_failed", extra={"path": self.path})
+
+
+class InMemoryTraceExporter(TraceExporter):
+    """Keeps the last `limit` traces; for tests and ad-hoc inspection."""
+
+    def __init__(self, limit: int = 100) -> None:
+        self.limit = limit
+        self.traces: List[Dict[str, Any]] = []
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        self.traces.append(trace)
+        del self.traces[:-self.limit]
+
+
+_SAMPLE_RATE = _env_float("TRACE_SAMPLE_RATE", 0.0)
+_EXPORTER: Optional[TraceExporter] = (
+    JsonlTraceExporter(os.getenv("TRACE_JSONL_PATH", "traces.jsonl")) if _SAMPLE_RATE > 0 else None
+)
+
+
+def configure_tracing(*, sample_rate: Optional[float] = None, exporter: Optional[TraceExporter] = None) -> None:
+    """Overrides the env configuration (TRACE_SAMPLE_RATE, TRACE_JSONL_PATH)."""
+    global _SAMPLE_RATE, _EXPORTER
+    if sample_rate is not None:
+        _SAMPLE_RATE = max(0.0, min(1.0, sample_rate))
+    if exporter is not None:
+        _EXPORTER = exporter
+
+
+# --- Spans ---
+
+class _Trace:
+    __slots__ = ("trace_id", "name", "start", "start_ts", "attrs", "spans", "_next_id")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]) -> None:
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.start = time.perf_counter()
+        self.start_ts = time.time()
+        self.attrs = attrs
+        self.spans: List["Span"] = []
+        self._next_id = 0
+
+    def next_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def to_dict(self, duration_ms: float) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start_ts": self.start_ts,
+            "duration_ms": round(duration_ms, 3),
+            "attrs": self.attrs,
+            "spans": [s.to_dict(self.start) for s in self.spans],
+        }
+
+
+_TRACE: ContextVar[Optional[_Trace]] = ContextVar("portfolio_trace", default=None)
+_SPAN: ContextVar[Optional["Span"]] = ContextVar("portfolio_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start", "duration_ms", "attrs", "error", "_trace", "_token")
+
+    def __init__(self, trace: _Trace, name: str, attrs: Dict[str, Any]) -> None:
+        self._trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.span_id = trace.next_id()
+        parent = _SPAN.get()
+        self.parent_id = parent.span_id if parent is not None else 0
+        self.start = 0.0
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self._token = _SPAN.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        try:
+            _SPAN.reset(self._token)
+        except ValueError:
+            # Exited from another context (e.g. an async generator step)
+            _SPAN.set(None)
+        self._trace.spans.append(self)
+
+    def to_dict(self, trace_start: float) -> Dict[str, Any]:
+        out = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "offset_ms": round((self.start - trace_start) * 1000, 3),
+            "duration_ms": round(self.duration_ms or 0.0, 3),
+        }
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        return None
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attrs: Any):
+    """A child span of the current one, or a shared no-op outside a sampled trace."""
+    trace = _TRACE.get()
+    if trace is None:
+        return NOOP_SPAN
+    return Span(trace, name, attrs)
+
+
+class start_trace:
+    """
+    Root of a trace. Sampled with probability TRACE_SAMPLE_RATE when an
+    exporter is configured; unsampled traces set nothing and export nothing.
+    """
+
+    __slots__ = ("name", "attrs", "_trace", "_token", "_root")
+
+    def __init__(self, name: str, **attrs: Any) -> None:
+        self.name = name
+        self.attrs = attrs
+        self._trace: Optional[_Trace] = None
+        self._token = None
+        self._root = None
+
+    def __enter__(self):
+        if _EXPORTER is None or _SAMPLE_RATE <= 0 or _TRACE.get() is not None:
+            return NOOP_SPAN
+        if _SAMPLE_RATE < 1.0 and random.random() >= _SAMPLE_RATE:
+            return NOOP_SPAN
+        self._trace = _Trace(self.name, self.attrs)
+        self._token = _TRACE.set(self._trace)
+        self._root = Span(self._trace, self.name, {})
+        return self._root.__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        trace = self._trace
+        if trace is None:
+            return None
+        self._root.__exit__(exc_type, exc, tb)
+        try:
+            _TRACE.reset(self._token)
+        except ValueError:
+            _TRACE.set(None)
+        exporter = _EXPORTER
+        if exporter is not None:
+            try:
+                exporter.export(trace.to_dict(self._root.duration_ms or 0.0))
+            except Exception:
+                logger.exception("tracing.export_failed")
+        return None
+
+
+class stage:
+    """
+    Times one pipeline stage into `timing["<name>_ms"]` (rounded to 0.01 ms,
+    as the debug payload always showed) and, when traced, records a span.
+    """
+
+    __slots__ = ("name", "timing", "_span", "_start")
+
+    def __init__(self, name: str, timing: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.timing = timing
+        self._span: Optional[Span] = None
+        self._start = 0.0
+
+    def __enter__(self):
+        trace = _TRACE.get()
+        if trace is not None:
+            self._span = Span(trace, self.name, {}).__enter__()
+        self._start = time.perf_counter()
+        return self._span or NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.timing is not None:
+            self.timing[self.name + "_ms"] = round((time.perf_counter() - self._start) * 1000, 2)
+        if self._span is not None:
+            self._span.__exit__(exc_type, exc, tb)
+        return None
+
+
+def traced(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator: runs the function inside a span when a sampled trace is active."""
+
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                trace = _TRACE.get()
+                if trace is None:
+                    return await fn(*args, **kwargs)
+                with Span(trace, span_name, {}):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _TRACE.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with Span(trace, span_name, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
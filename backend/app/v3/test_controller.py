@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from app.v3 import controller
+from app.v3.controller import ChatRequest, handle_chat_batch, handle_chat_stream
+from app.v3.layers import llm_polish
+
+
+def _collect(question, metadata=None):
+    async def run():
+        return [
+            event
+            async for event in handle_chat_stream(ChatRequest(question=question, metadata=metadata))
+        ]
+
+    return asyncio.run(run())
+
+
+def test_stream_sends_rules_answer_then_tokens_then_final(fake_groq):
+    fake_groq.tokens = ["Strong ", "backend ", "fit."]
+
+    events = _collect("Would you hire him for a backend role?", {"debug": True})
+    kinds = [e["event"] for e in events]
+    assert kinds == ["answer", "token", "token", "token", "final"]
+
+    first, final = events[0]["data"], events[-1]["data"]
+    assert first["llm_pending"] is True
+    assert first["intent"] == final["intent"] == "role_fit_evaluation"
+    assert first["answer"].startswith("Fit summary")
+    assert final["answer"] == "Strong backend fit."
+    assert "polish_ms" in final["debug"]["timing_ms"]
+    assert fake_groq.last_request["stream"] is True
+
+
+def test_stream_without_llm_sends_answer_and_final_only():
+    events = _collect("What's the weather like?")
+    assert [e["event"] for e in events] == ["answer", "final"]
+    assert events[0]["data"]["llm_pending"] is False
+    assert events[-1]["data"]["intent"] == "unknown_intent"
+
+
+def test_batch_keeps_order_and_bounds_llm_fan_out(fake_groq, monkeypatch):
+    fake_groq.latency_s = 0.01
+    fake_groq.reply = lambda kwargs: f"Polished: {kwargs['messages'][-1]['content'][:20]}"
+    monkeypatch.setattr(controller, "CHAT_BATCH_LLM_CONCURRENCY", 2)
+    loads = []
+    real_load = controller.ContextManager.aload
+
+    async def counting_load(sid):
+        loads.append(sid)
+        return await real_load(sid)
+
+    monkeypatch.setattr(controller.ContextManager, "aload", counting_load)
+
+    questions = [f"Would you hire him for a backend role #{i}?" for i in range(5)] + ["What's the weather like?"]
+    requests = [ChatRequest(question=q, session_id="batch-test") for q in questions]
+    responses = asyncio.run(handle_chat_batch(requests))
+
+    assert [r.intent for r in responses] == ["role_fit_evaluation"] * 5 + ["unknown_intent"]
+    assert all(r.answer.startswith("Polished") for r in responses[:5])
+    assert fake_groq.calls == 5 and fake_groq.peak == 2
+    assert loads == ["batch-test"]
+    assert "llm_wait_ms" in responses[4].timing and "llm_wait_ms" not in responses[5].timing
+
+
+def test_deadline_bounds_the_llm_call_and_keeps_the_rules_answer(fake_groq):
+    fake_groq.latency_s = 5
+
+    request = ChatRequest(question="Would you hire him for a backend role?", metadata={"debug": True}, deadline_ms=700)
+    t0 = time.monotonic()
+    response = asyncio.run(controller.handle_chat(request))
+    elapsed = time.monotonic() - t0
+
+    assert elapsed < 1.5
+    assert response.answer.startswith("Fit summary")
+    assert response.debug["llm_status"] == "deadline_exceeded"
+    assert response.debug["llm_error_reason"] == "deadline_exceeded"
+    assert response.debug["deadline_exceeded"] and response.debug["deadline"]["exceeded_at"] == "polish"
+    assert fake_groq.last_request["timeout"] < 0.7 and fake_groq.last_request["max_tokens"] < 500
+
+
+def test_spent_deadline_skips_entities_and_llm(fake_groq):
+    request = ChatRequest(question="Would you hire him for a backend role?", metadata={"debug": True}, deadline_ms=1)
+    response = asyncio.run(controller.handle_chat(request))
+
+    assert response.debug["latency_guard_triggered"] is True
+    assert response.debug["deadline"]["exceeded_at"] == "entities"
+    assert response.debug["llm_used"] is False and fake_groq.calls == 0
@@ -0,0 +1 @@
+"""Text matching utilities (v3)."""
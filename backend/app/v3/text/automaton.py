@@ -0,0 +1,173 @@
+"""
+Multi-pattern matcher (v3).
+Aho-Corasick automaton that finds every known phrase in a single pass over the text.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class MultiPatternMatcher:
+    """
+    Compiles (pattern, payload) pairs once; `find` then scans a text in O(len(text) + matches).
+
+    Patterns are matched verbatim, so callers normalize (e.g. lowercase) both sides.
+    With `word_boundary=True` a hit must not start or end inside a word, so "ai"
+    does not match "maintain". Edges that are not word characters ("c++", "ci/cd")
+    need no boundary, mirroring regex `\\b` semantics.
+    """
+
+    __slots__ = (
+        "_goto",
+        "_fail",
+        "_delta",
+        "_out",
+        "_state_payloads",
+        "_patterns",
+        "_payloads",
+        "_word_boundary",
+    )
+
+    # Above this many transitions the fail-link form is kept instead of a dense DFA.
+    DENSE_TRANSITION_LIMIT = 100_000
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]], *, word_boundary: bool = False) -> None:
+        self._word_boundary = word_boundary
+        self._patterns: List[str] = []
+        self._payloads: List[List[Any]] = []
+        index: Dict[str, int] = {}
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            pid = index.get(pattern)
+            if pid is None:
+                pid = index[pattern] = len(self._patterns)
+                self._patterns.append(pattern)
+                self._payloads.append([])
+            self._payloads[pid].append(payload)
+        self._build()
+
+    def _build(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for pid, pattern in enumerate(self._patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(pid)
+
+        fail = [0] * len(goto)
+        bfs_order: List[int] = []
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            bfs_order.append(state)
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+        self._state_payloads = [
+            frozenset(p for pid in o for p in self._payloads[pid]) for o in out
+        ]
+        self._delta = self._densify(goto, fail, bfs_order)
+
+    def _densify(
+        self, goto: List[Dict[str, int]], fail: List[int], bfs_order: List[int]
+    ) -> List[Dict[str, int]] | None:
+        """
+        Fold fail links into each state's transition table so a scan is one
+        dict lookup per character. Skipped for very large catalogues.
+        """
+        delta: List[Dict[str, int]] = [{} for _ in goto]
+        delta[0] = dict(goto[0])
+        size = len(delta[0])
+        for state in bfs_order:
+            table = dict(delta[fail[state]])
+            table.update(goto[state])
+            delta[state] = table
+            size += len(table)
+            if size > self.DENSE_TRANSITION_LIMIT:
+                return None
+        return delta
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _boundary_ok(self, text: str, start: int, end: int, pattern: str) -> bool:
+        if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(pattern[-1]) and end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def find_ids(self, text: str) -> List[int]:
+        """Distinct pattern ids present in `text`, in order of first occurrence."""
+        goto, fail, out = self._goto, self._fail, self._out
+        patterns = self._patterns
+        check = self._word_boundary
+        delta = self._delta
+        found: Dict[int, None] = {}
+        state = 0
+        for i, ch in enumerate(text):
+            if delta is not None:
+                state = delta[state].get(ch, 0)
+            else:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+            hits = out[state]
+            if not hits:
+                continue
+            for pid in hits:
+                if pid in found:
+                    continue
+                if check:
+                    pattern = patterns[pid]
+                    if not self._boundary_ok(text, i + 1 - len(pattern), i + 1, pattern):
+                        continue
+                found[pid] = None
+        return list(found)
+
+    def find(self, text: str) -> List[Any]:
+        """Payloads of every pattern present in `text`."""
+        payloads = self._payloads
+        return [payload for pid in self.find_ids(text) for payload in payloads[pid]]
+
+    def find_set(self, text: str) -> Set[Any]:
+        """Distinct payloads present in `text` (fast path when order is not needed)."""
+        if self._word_boundary or self._delta is None:
+            return set(self.find(text))
+        delta, state_payloads = self._delta, self._state_payloads
+        hit_states = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if state_payloads[state]:
+                hit_states.add(state)
+        found: Set[Any] = set()
+        for state in hit_states:
+            found.update(state_payloads[state])
+        return found
+
+    def matched_patterns(self, text: str) -> List[str]:
+        return [self._patterns[pid] for pid in self.find_ids(text)]
+
@@ -0,0 +1,141 @@
+"""
+Bounded Store (v4).
+Thread-safe keyed store with LRU and idle-TTL eviction for per-session state.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import os
+import sys
+from threading import Lock
+import time
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+# Entries sampled when estimating memory use
+_SIZE_SAMPLE = 32
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def approx_sizeof(value: object) -> int:
+    """
+    Shallow size of an object plus its slot/attribute values and the items of
+    any top-level containers. Good enough for trend lines, not accounting.
+    """
+    size = sys.getsizeof(value)
+    slots = getattr(type(value), "__slots__", ())
+    attrs = [getattr(value, name, None) for name in slots]
+    if hasattr(value, "__dict__"):
+        attrs.extend(vars(value).values())
+    for attr in attrs:
+        size += sys.getsizeof(attr)
+        if isinstance(attr, dict):
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in attr.items())
+        elif isinstance(attr, (list, tuple, set, frozenset)) or hasattr(attr, "maxlen"):
+            size += sum(sys.getsizeof(item) for item in attr)
+    return size
+
+
+class BoundedStore(Generic[V]):
+    """
+    At most `max_entries` values, kept in least-recently-used order. Values
+    idle for longer than `idle_ttl_seconds` are dropped lazily: on access,
+    and by a sweep from the LRU end on every insert.
+    """
+
+    def __init__(self, *, max_entries: int, idle_ttl_seconds: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._lock = Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._evictions = {"lru": 0, "idle": 0}
+
+    def _expired(self, touched_at: float, now: float) -> bool:
+        return self.idle_ttl_seconds > 0 and now - touched_at > self.idle_ttl_seconds
+
+    def _get_locked(self, key: Hashable, now: float) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[0], now):
+            del self._entries[key]
+            self._evictions["idle"] += 1
+            return None
+        self._entries[key] = (now, entry[1])
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put_locked(self, key: Hashable, value: V, now: float) -> None:
+        self._entries[key] = (now, value)
+        self._entries.move_to_end(key)
+        # Oldest entries sit at the front, so the idle sweep stops early
+        while self._entries:
+            oldest_key, (touched_at, _value) = next(iter(self._entries.items()))
+            if oldest_key == key or not self._expired(touched_at, now):
+                break
+            self._entries.popitem(last=False)
+            self._evictions["idle"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions["lru"] += 1
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            return self._get_locked(key, time.monotonic())
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], V]) -> V:
+        now = time.monotonic()
+        with self._lock:
+            value = self._get_locked(key, now)
+            if value is None:
+                value = factory()
+                self._put_locked(key, value, now)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._put_locked(key, value, time.monotonic())
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry[0], time.monotonic())
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            size = len(self._entries)
+            evictions = dict(self._evictions)
+            sample = [v for _, (_, v) in zip(range(_SIZE_SAMPLE), self._entries.items())]
+            table_bytes = sys.getsizeof(self._entries)
+        per_entry = (
+            sum(approx_sizeof(v) for v in sample) / len(sample) + sys.getsizeof((0.0, None))
+            if sample
+            else 0
+        )
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "evictions": evictions,
+            "approx_bytes": int(table_bytes + per_entry * size),
+        }
@@ -0,0 +1,417 @@
+"""
+Session Backend (v4).
+Where per-session state lives beyond one worker process. Reads go through a
+per-worker BoundedStore cache, and async callers read the backend on a small
+dedicated thread pool; writes are queued and flushed in batches by a
+background thread, off the request path.
+
+SESSION_BACKEND=memory (default) keeps state in-process only, as before;
+SESSION_BACKEND=sqlite shares it between workers through SESSION_DB_PATH.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+import sqlite3
+from threading import Condition, Lock, Thread
+import time
+from typing import Any, Callable, Dict, Generic, Optional, Sequence, Tuple, TypeVar
+
+from app.v4.state.bounded_store import BoundedStore
+
+logger = logging.getLogger("portfolio.v4.state.sessions")
+
+V = TypeVar("V")
+Row = Tuple[str, str, Dict[str, Any]]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+# Backend reads for async callers; small, so a stalled database can only tie up this many threads
+SESSION_DB_READ_WORKERS = max(1, _env_int("SESSION_DB_READ_WORKERS", 2))
+_READ_EXECUTOR = ThreadPoolExecutor(max_workers=SESSION_DB_READ_WORKERS, thread_name_prefix="session-read")
+
+
+# --- Backends ---
+
+class SessionBackend:
+    """
+    Storage for session records, addressed by (namespace, key). `shared` is
+    True when other worker processes see what this one writes.
+    """
+
+    name = "base"
+    shared = False
+
+    def load(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def save_many(self, rows: Sequence[Row]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class InProcessSessionBackend(SessionBackend):
+    """
+    Nothing leaves the process: the worker's BoundedStore is the only copy,
+    so there is nothing to read through to and nothing to flush.
+    """
+
+    name = "memory"
+
+    def load(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    def save_many(self, rows: Sequence[Row]) -> None:
+        return None
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    One SQLite file (WAL mode) shared by every worker on the host.
+
+    Reads are on the request path (async callers run them on the session-read
+    pool), so they use their own connection with a short busy timeout and never wait for the write-behind thread's lock;
+    in WAL mode they also don't wait for other workers' commits. A read that
+    still times out raises, and the caller keeps its cached value.
+    """
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, db_path: str, *, timeout_seconds: float = 5.0, read_timeout_seconds: float = 0.05) -> None:
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, timeout=timeout_seconds, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, data TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+        self._read_lock = Lock()
+        self._read_conn = sqlite3.connect(db_path, timeout=read_timeout_seconds, check_same_thread=False)
+        self._read_conn.execute("PRAGMA query_only=ON")
+
+    def load(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT data FROM sessions WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_many(self, rows: Sequence[Row]) -> None:
+        now = time.time()
+        params = [(ns, key, json.dumps(data, separators=(",", ":")), now) for ns, key, data in rows]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sessions (namespace, key, data, updated_at) VALUES (?, ?, ?, ?)",
+                params,
+            )
+            self._conn.commit()
+
+    def prune(self, older_than_seconds: float) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?",
+                (time.time() - older_than_seconds,),
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def close(self) -> None:
+        with self._read_lock:
+            self._read_conn.close()
+        with self._lock:
+            self._conn.close()
+
+
+# --- Write-behind queue ---
+
+class WriteBehindQueue:
+    """
+    Collects writes and flushes them to the backend from a daemon thread,
+    every `interval_seconds` or as soon as `max_batch` rows are waiting.
+    Repeated writes to one key before a flush collapse into the latest.
+    Batches are written one at a time, in the order they were taken, whether
+    by the thread or by `flush()`.
+    """
+
+    def __init__(self, backend: SessionBackend, *, interval_seconds: float = 0.05, max_batch: int = 256) -> None:
+        self.backend = backend
+        self.interval_seconds = interval_seconds
+        self.max_batch = max(1, max_batch)
+        self._cond = Condition()
+        # Held from taking a batch until it is saved
+        self._write_lock = Lock()
+        self._pending: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        # Keys of the batch being written right now; still newer than the backend
+        self._writing: set = set()
+        self._closed = False
+        self._thread: Thread | None = None
+        self._stats = {"submitted": 0, "coalesced": 0, "rows_written": 0, "batches": 0, "errors": 0}
+        self._last_flush_ms = 0.0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="session-write-behind", daemon=True)
+            self._thread.start()
+
+    def submit(self, namespace: str, key: str, data: Dict[str, Any]) -> None:
+        with self._cond:
+            self._ensure_thread()
+            slot = (namespace, key)
+            if slot in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[slot] = data
+            self._stats["submitted"] += 1
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def is_pending(self, namespace: str, key: str) -> bool:
+        with self._cond:
+            return (namespace, key) in self._pending or (namespace, key) in self._writing
+
+    def _take_batch(self) -> list:
+        batch = [(ns, key, data) for (ns, key), data in self._pending.items()]
+        self._writing = set(self._pending)
+        self._pending.clear()
+        return batch
+
+    def _write(self, batch: list) -> None:
+        if not batch:
+            return
+        t0 = time.perf_counter()
+        try:
+            self.backend.save_many(batch)
+        except Exception:
+            logger.exception("session_write_behind.flush_failed", extra={"rows": len(batch)})
+            with self._cond:
+                self._stats["errors"] += 1
+                self._writing = set()
+            return
+        with self._cond:
+            self._writing = set()
+            self._stats["rows_written"] += len(batch)
+            self._stats["batches"] += 1
+            self._last_flush_ms = (time.perf_counter() - t0) * 1000
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.interval_seconds)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self) -> None:
+        """Writes everything queued so far, on the calling thread."""
+        with self._write_lock:
+            with self._cond:
+                batch = self._take_batch()
+            self._write(batch)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "pending": len(self._pending),
+                "last_flush_ms": round(self._last_flush_ms, 3),
+            }
+
+
+# --- Read-through store ---
+
+class ReadThroughStore(Generic[V]):
+    """
+    Per-worker cache in front of a SessionBackend for one namespace.
+
+    A cached value is trusted for `fresh_seconds` after it was read or
+    written here, or while this worker still has an unflushed write for it;
+    after that the next access re-reads the backend, which picks up changes
+    other workers made. With a non-shared backend the cache is authoritative.
+
+    Code on the event loop uses `aget_or_create`, which reads the backend on
+    the session-read pool; `get_or_create` reads it on the calling thread.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        cache: BoundedStore[Tuple[float, V]],
+        backend: SessionBackend,
+        writer: WriteBehindQueue | None,
+        encode: Callable[[V], Dict[str, Any]],
+        decode: Callable[[Dict[str, Any]], V],
+        fresh_seconds: float = 1.0,
+    ) -> None:
+        self.namespace = namespace
+        self.cache = cache
+        self.backend = backend
+        self.writer = writer if backend.shared else None
+        self.encode = encode
+        self.decode = decode
+        self.fresh_seconds = fresh_seconds
+        self._reads = {"cache": 0, "backend": 0, "created": 0}
+
+    def _trusted(self, key: str, entry: Optional[Tuple[float, V]], now: float) -> bool:
+        if entry is None:
+            return False
+        return (
+            not self.backend.shared
+            or now - entry[0] <= self.fresh_seconds
+            or (self.writer is not None and self.writer.is_pending(self.namespace, key))
+        )
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.backend.load(self.namespace, key)
+        except Exception:
+            logger.exception("session_backend.load_failed", extra={"namespace": self.namespace})
+            return None
+
+    def get_or_create(self, key: str, factory: Callable[[], V]) -> V:
+        now = time.monotonic()
+        entry = self.cache.get(key)
+        if self._trusted(key, entry, now):
+            self._reads["cache"] += 1
+            return entry[1]
+        data = self._load(key) if self.backend.shared else None
+        return self._settle(key, entry, data, factory, now)
+
+    async def aget_or_create(self, key: str, factory: Callable[[], V]) -> V:
+        now = time.monotonic()
+        entry = self.cache.get(key)
+        if self._trusted(key, entry, now):
+            self._reads["cache"] += 1
+            return entry[1]
+        data = None
+        if self.backend.shared:
+            data = await asyncio.get_running_loop().run_in_executor(_READ_EXECUTOR, self._load, key)
+            # A write made here while the read was in flight is newer than the row
+            fresher = self.cache.get(key)
+            if fresher is not None and fresher is not entry and self._trusted(key, fresher, time.monotonic()):
+                self._reads["cache"] += 1
+                return fresher[1]
+        return self._settle(key, entry, data, factory, now)
+
+    def _settle(
+        self,
+        key: str,
+        entry: Optional[Tuple[float, V]],
+        data: Optional[Dict[str, Any]],
+        factory: Callable[[], V],
+        now: float,
+    ) -> V:
+        if data is not None:
+            value = self.decode(data)
+            self._reads["backend"] += 1
+        elif entry is not None:
+            value = entry[1]
+            self._reads["cache"] += 1
+        else:
+            value = factory()
+            self._reads["created"] += 1
+        self.cache.put(key, (now, value))
+        return value
+
+    def save(self, key: str, value: V) -> None:
+        """Marks the value written: refreshes the cache, queues the backend write."""
+        self.cache.put(key, (time.monotonic(), value))
+        if self.writer is not None:
+            self.writer.submit(self.namespace, key, self.encode(value))
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.cache.stats(),
+            "backend": self.backend.name,
+            "reads": dict(self._reads),
+        }
+
+
+# --- Process-wide backend ---
+
+_BACKEND: SessionBackend | None = None
+_WRITER: WriteBehindQueue | None = None
+_INIT_LOCK = Lock()
+
+
+def _build_backend() -> SessionBackend:
+    kind = os.getenv("SESSION_BACKEND", "memory").strip().lower()
+    if kind == "sqlite":
+        path = os.getenv("SESSION_DB_PATH", "sessions.db")
+        try:
+            return SQLiteSessionBackend(
+                path, read_timeout_seconds=_env_int("SESSION_DB_READ_TIMEOUT_MS", 50) / 1000.0
+            )
+        except sqlite3.Error:
+            logger.exception("session_backend.open_failed", extra={"path": path})
+    return InProcessSessionBackend()
+
+
+def get_session_backend() -> Tuple[SessionBackend, WriteBehindQueue]:
+    global _BACKEND, _WRITER
+    if _BACKEND is None:
+        with _INIT_LOCK:
+            if _BACKEND is None:
+                backend = _build_backend()
+                _WRITER = WriteBehindQueue(
+                    backend,
+                    interval_seconds=_env_int("SESSION_FLUSH_INTERVAL_MS", 50) / 1000.0,
+                    max_batch=_env_int("SESSION_FLUSH_MAX_BATCH", 256),
+                )
+                atexit.register(_WRITER.close)
+                _BACKEND = backend
+    return _BACKEND, _WRITER
+
+
+def session_fresh_seconds() -> float:
+    return _env_float("SESSION_CACHE_FRESH_SECONDS", 1.0)
+
+
+def flush_session_writes() -> None:
+    if _WRITER is not None:
+        _WRITER.flush()
+
+
+def session_backend_stats() -> Dict[str, Any]:
+    backend, writer = get_session_backend()
+    return {"backend": backend.name, "shared": backend.shared, "write_behind": writer.stats()}
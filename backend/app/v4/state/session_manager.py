@@ -1,42 +1,89 @@
 """
 Session Manager (v4).
-In-memory session state for recruiter type persistence.
+Session state for recruiter type persistence.
+Cached per worker (bounded, LRU + idle eviction) in front of the configured
+session backend. The lock only guards the in-memory update; backend reads
+happen before it is taken (off the event loop for the async methods).
 """
 
 from __future__ import annotations
 
+from dataclasses import dataclass
+import os
 from threading import Lock
-from typing import Dict, Optional
+from typing import Optional
+
+from app.v3.system.observability import SystemMonitor
+from app.v4.state.bounded_store import BoundedStore
+from app.v4.state.session_backend import (
+    ReadThroughStore,
+    get_session_backend,
+    session_backend_stats,
+    session_fresh_seconds,
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+@dataclass(slots=True)
+class SessionRecord:
+    type: Optional[str] = None
+
+
+_BACKEND, _WRITER = get_session_backend()
 
 
 class SessionManager:
     _lock = Lock()
-    _sessions: Dict[str, Dict[str, Optional[str]]] = {
-        "default_user": {"type": None}
-    }
+    _sessions: ReadThroughStore[SessionRecord] = ReadThroughStore(
+        "recruiter_type",
+        cache=BoundedStore(
+            max_entries=_env_int("SESSION_STORE_MAX_ENTRIES", 10000),
+            idle_ttl_seconds=_env_int("SESSION_STORE_IDLE_TTL_SECONDS", 3600),
+        ),
+        backend=_BACKEND,
+        writer=_WRITER,
+        encode=lambda record: {"type": record.type},
+        decode=lambda data: SessionRecord(type=data.get("type")),
+        fresh_seconds=session_fresh_seconds(),
+    )
 
     _specific_types = {"TECH_LEAD", "HR_MANAGER", "PRODUCT_MANAGER"}
 
     @classmethod
-    def _ensure_session(cls, user_id: str) -> Dict[str, Optional[str]]:
-        if user_id not in cls._sessions:
-            cls._sessions[user_id] = {"type": None}
-        return cls._sessions[user_id]
-
-    @classmethod
-    def update_session(cls, user_id: str, new_type: str | None) -> None:
+    def _apply(cls, user_id: str, session: SessionRecord, new_type: str | None) -> None:
         with cls._lock:
-            session = cls._ensure_session(user_id)
-            current = session.get("type")
+            current = session.type
             if new_type in cls._specific_types:
-                session["type"] = new_type
+                session.type = new_type
             elif current in cls._specific_types and new_type == "GENERALIST":
                 return
             else:
-                session["type"] = new_type
+                session.type = new_type
+            if session.type != current:
+                cls._sessions.save(user_id, session)
+
+    @classmethod
+    def update_session(cls, user_id: str, new_type: str | None) -> None:
+        cls._apply(user_id, cls._sessions.get_or_create(user_id, SessionRecord), new_type)
+
+    @classmethod
+    async def aupdate_session(cls, user_id: str, new_type: str | None) -> None:
+        cls._apply(user_id, await cls._sessions.aget_or_create(user_id, SessionRecord), new_type)
 
     @classmethod
     def get_session(cls, user_id: str) -> Optional[str]:
-        with cls._lock:
-            session = cls._ensure_session(user_id)
-            return session.get("type")
+        return cls._sessions.get_or_create(user_id, SessionRecord).type
+
+    @classmethod
+    async def aget_session(cls, user_id: str) -> Optional[str]:
+        return (await cls._sessions.aget_or_create(user_id, SessionRecord)).type
+
+
+SystemMonitor().register_component("session_store", SessionManager._sessions.stats)
+SystemMonitor().register_component("session_backend", session_backend_stats)
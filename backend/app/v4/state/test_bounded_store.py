@@ -0,0 +1,44 @@
+from app.v3.layers import context_manager
+from app.v3.layers.context_manager import ContextManager
+from app.v4.state import bounded_store
+from app.v4.state.bounded_store import BoundedStore
+
+
+def test_lru_eviction_keeps_recently_used():
+    store = BoundedStore(max_entries=2, idle_ttl_seconds=0)
+    store.put("a", 1)
+    store.put("b", 2)
+    assert store.get("a") == 1
+    store.put("c", 3)
+    assert "b" not in store
+    assert store.get("a") == 1 and store.get("c") == 3
+    assert store.stats()["evictions"] == {"lru": 1, "idle": 0}
+
+
+def test_idle_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bounded_store.time, "monotonic", lambda: now[0])
+    store = BoundedStore(max_entries=10, idle_ttl_seconds=60)
+    store.put("old", 1)
+    store.put("busy", 2)
+    now[0] += 50
+    assert store.get("busy") == 2
+    now[0] += 20
+    store.put("new", 3)  # sweep drops "old", which has been idle for 70s
+    assert len(store) == 2
+    assert store.get("busy") == 2
+    assert store.stats()["evictions"]["idle"] == 1
+
+
+def test_context_store_is_bounded_with_intent_ring(monkeypatch):
+    store = BoundedStore(max_entries=3, idle_ttl_seconds=0)
+    monkeypatch.setattr(context_manager._STORE, "cache", store)
+    for i in range(10):
+        ContextManager.update(f"s{i}", intent="skills_query")
+    assert len(store) == 3
+
+    for i in range(8):
+        ctx = ContextManager.update("s9", intent=f"intent_{i}")
+    assert ctx["recent_intents"] == [f"intent_{i}" for i in range(3, 8)]
+    assert ContextManager.load("s9")["recent_intents"][-1] == "intent_7"
+    assert store.stats()["approx_bytes"] > 0
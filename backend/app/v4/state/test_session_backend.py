@@ -0,0 +1,148 @@
+import asyncio
+from threading import Event, Thread
+import time
+
+from app.v3.layers.context_manager import ContextState
+from app.v4.state.bounded_store import BoundedStore
+from app.v4.state.session_backend import (
+    InProcessSessionBackend,
+    SessionBackend,
+    ReadThroughStore,
+    SQLiteSessionBackend,
+    WriteBehindQueue,
+)
+
+
+def _context_store(backend, writer, fresh_seconds=0.0):
+    return ReadThroughStore(
+        "context",
+        cache=BoundedStore(max_entries=100, idle_ttl_seconds=0),
+        backend=backend,
+        writer=writer,
+        encode=ContextState.to_dict,
+        decode=ContextState.from_dict,
+        fresh_seconds=fresh_seconds,
+    )
+
+
+def test_workers_share_state_through_sqlite(tmp_path):
+    db = str(tmp_path / "sessions.db")
+    # Two "workers": separate connections, caches and write-behind queues
+    backend_a, backend_b = SQLiteSessionBackend(db), SQLiteSessionBackend(db)
+    writer_a = WriteBehindQueue(backend_a, interval_seconds=10)
+    worker_a = _context_store(backend_a, writer_a)
+    worker_b = _context_store(backend_b, WriteBehindQueue(backend_b, interval_seconds=10))
+
+    state = worker_a.get_or_create("s1", lambda: ContextState(session_id="s1"))
+    state.recent_intents.append("project_query")
+    state.last_entities = {"projects": ["ClickMart"]}
+    worker_a.save("s1", state)
+
+    # Not flushed yet: the write is off the request path
+    assert list(worker_b.get_or_create("s1", ContextState).recent_intents) == []
+    # Unflushed local writes are never overwritten by a backend read
+    assert worker_a.get_or_create("s1", ContextState) is state
+
+    writer_a.flush()
+    seen = worker_b.get_or_create("s1", ContextState)
+    assert list(seen.recent_intents) == ["project_query"]
+    assert seen.recent_intents.maxlen == 5
+    assert seen.last_entities == {"projects": ["ClickMart"]}
+    assert worker_b.stats()["reads"]["backend"] == 1
+
+
+def test_write_behind_batches_and_coalesces(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    writer = WriteBehindQueue(backend, interval_seconds=10, max_batch=1000)
+    for i in range(50):
+        writer.submit("context", f"s{i % 10}", {"n": i})
+    writer.close()
+
+    stats = writer.stats()
+    assert stats["rows_written"] == 10
+    assert stats["coalesced"] == 40
+    assert backend.load("context", "s3") == {"n": 43}
+
+
+def test_in_process_backend_keeps_cache_authoritative():
+    store = _context_store(InProcessSessionBackend(), WriteBehindQueue(InProcessSessionBackend()))
+    assert store.writer is None
+    state = store.get_or_create("s1", ContextState)
+    assert store.get_or_create("s1", ContextState) is state
+
+
+def test_reads_do_not_wait_for_the_writer(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    backend.save_many([("context", "s1", {"n": 1})])
+    # The write-behind thread holds this lock for a whole batch commit
+    with backend._lock:
+        start = time.monotonic()
+        assert backend.load("context", "s1") == {"n": 1}
+        assert time.monotonic() - start < 0.5
+
+
+def test_async_reads_leave_the_event_loop_free(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    backend.save_many([("context", "s1", ContextState(session_id="s1").to_dict())])
+    real_load = backend.load
+
+    def slow_load(namespace, key):
+        time.sleep(0.2)  # a read stuck behind another worker's lock
+        return real_load(namespace, key)
+
+    backend.load = slow_load
+    store = _context_store(backend, WriteBehindQueue(backend, interval_seconds=10))
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        state = await store.aget_or_create("s1", ContextState)
+        task.cancel()
+        return state, ticks
+
+    state, ticks = asyncio.run(run())
+    assert state.session_id == "s1"
+    assert ticks >= 5
+
+
+def test_flush_waits_for_the_batch_being_written():
+    class SlowBackend(SessionBackend):
+        shared = True
+
+        def __init__(self):
+            self.rows = {}
+            self.writing = Event()
+            self.release = Event()
+
+        def save_many(self, rows):
+            if not self.writing.is_set():
+                # Only the first batch stalls
+                self.writing.set()
+                self.release.wait(5)
+            self.rows.update({(ns, key): data for ns, key, data in rows})
+
+    backend = SlowBackend()
+    writer = WriteBehindQueue(backend, interval_seconds=0.01)
+    writer.submit("context", "s1", {"n": 1})
+    assert backend.writing.wait(5)  # the thread is saving n=1
+
+    writer.submit("context", "s1", {"n": 2})
+    writer.submit("context", "s2", {"n": 1})
+    flusher = Thread(target=writer.flush)
+    flusher.start()
+    time.sleep(0.05)
+    # The stalled batch has not landed, so its key must still read as pending
+    assert writer.is_pending("context", "s1")
+
+    backend.release.set()
+    flusher.join(5)
+    writer.close()
+    assert backend.rows == {("context", "s1"): {"n": 2}, ("context", "s2"): {"n": 1}}
+    assert not writer.is_pending("context", "s1")
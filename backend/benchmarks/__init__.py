@@ -0,0 +1,4 @@
+"""
+Benchmarks for the portfolio backend.
+Run from backend/, e.g. `python -m benchmarks.bench_entity_matcher`.
+"""
@@ -0,0 +1,85 @@
+"""
+/chat/batch versus N sequential /chat calls.
+Sends the benchmark corpus for one session both ways through the ASGI app
+in-process, with the LLM served by the local fake Groq server.
+
+    python -m benchmarks.bench_chat_batch [--latency 50] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.bench_pipeline import DEFAULT_CORPUS
+from benchmarks.fake_llm_server import FakeLLMServer
+
+
+async def _sequential(client: httpx.AsyncClient, session_id: str, items: List[Dict[str, Any]]) -> None:
+    for item in items:
+        body = {"question": item["question"], "session_id": session_id, "metadata": item.get("metadata")}
+        response = await client.post("/chat", json=body)
+        response.raise_for_status()
+
+
+async def _batch(client: httpx.AsyncClient, session_id: str, items: List[Dict[str, Any]]) -> None:
+    questions = [{"question": i["question"], "metadata": i.get("metadata")} for i in items]
+    response = await client.post("/chat/batch", json={"session_id": session_id, "questions": questions})
+    response.raise_for_status()
+    assert len(response.json()["results"]) == len(items)
+
+
+async def main_async(latency: str, repeat: int) -> None:
+    server = FakeLLMServer(latency=latency).start()
+    # Read lazily by the app on first use, so set before the first request
+    os.environ.update(GROQ_API_KEY="bench", GROQ_BASE_URL=server.base_url, LLM_POLISH_CACHE_TTL_SECONDS="0")
+    from app.main import app
+    from app.v3.controller import CHAT_BATCH_LLM_CONCURRENCY
+
+    logging.getLogger("portfolio.v3").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    items = json.loads(DEFAULT_CORPUS.read_text(encoding="utf-8"))["questions"]
+    transport = httpx.ASGITransport(app=app)
+    rows = {"sequential /chat": [], "one /chat/batch": []}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            await _sequential(client, "warmup", items[:3])
+            for r in range(repeat):
+                server.reset_stats()
+                t0 = time.perf_counter()
+                await _sequential(client, f"seq-{r}", items)
+                rows["sequential /chat"].append(((time.perf_counter() - t0) * 1000, server.stats["requests"]))
+                server.reset_stats()
+                t0 = time.perf_counter()
+                await _batch(client, f"batch-{r}", items)
+                rows["one /chat/batch"].append(((time.perf_counter() - t0) * 1000, server.stats["requests"]))
+    finally:
+        server.stop()
+
+    print(f"{len(items)} questions, LLM latency {latency} ms, batch LLM concurrency {CHAT_BATCH_LLM_CONCURRENCY}")
+    print(f"{'path':<18} {'best ms':>9} {'questions/s':>12} {'llm calls':>10}")
+    best = {}
+    for name, runs in rows.items():
+        ms, calls = min(runs)
+        best[name] = ms
+        print(f"{name:<18} {ms:>9.1f} {len(items) / ms * 1000:>12.1f} {calls:>10}")
+    print(f"speedup: {best['sequential /chat'] / best['one /chat/batch']:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", default="50", help="fake LLM latency spec in ms (see fake_llm_server)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.latency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Entity matcher microbenchmark.
+Compares the per-term substring loop that extract_entities used to run with the
+compiled automaton, on synthetic catalogues of 10 to 10,000 entries.
+
+    python -m benchmarks.bench_entity_matcher [--questions 200] [--sizes 10,100,1000,10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from app.v3.layers.entity_extraction import build_entity_matcher, match_entities
+from app.v3.models.experience import ExperienceModel
+from app.v3.models.project import ProjectModel
+from app.v3.models.skill import SkillModel
+
+WORDS = (
+    "flask fastapi django react vue svelte kafka redis postgres mysql sqlite mongo "
+    "docker kubernetes terraform ansible pillow webp numpy pandas torch spark airflow "
+    "textile retail fintech health logistics catalog inquiry portal dashboard commerce"
+).split()
+
+QUESTION_TEMPLATES = [
+    "Has he shipped anything with {a} or {b} in production?",
+    "Tell me about the {a} project and how {b} was used.",
+    "What is his experience maintaining {a} services at scale?",
+    "Would you hire him for a backend role that needs {a}, {b} and good judgment?",
+]
+
+
+def _term(rng: random.Random, i: int) -> str:
+    return f"{rng.choice(WORDS)}{i}"
+
+
+def synthetic_catalogue(size: int, seed: int = 7) -> Dict[str, Any]:
+    """Roughly `size` searchable terms spread across projects, skills and roles."""
+    rng = random.Random(seed)
+    n_projects = max(1, size // 5)
+    projects = []
+    for i in range(n_projects):
+        projects.append(
+            ProjectModel(
+                id=f"proj-{i}",
+                title=f"Project {_term(rng, i)}",
+                domain=f"domain {_term(rng, i)}",
+                description="",
+                key_features=[],
+                tech_stack=[_term(rng, i * 2), _term(rng, i * 2 + 1)],
+                status="completed",
+            )
+        )
+    n_skills = max(1, size - n_projects * 4)
+    skills = SkillModel(
+        programming_languages={},
+        databases={},
+        backend=[_term(rng, 10_000 + i) for i in range(n_skills)],
+        frontend=[],
+        concepts=[],
+        tools_platforms=[],
+        languages_spoken=[],
+    )
+    experience = [
+        ExperienceModel(role=f"{_term(rng, i)} engineer", company="", location="", duration="", responsibilities=[])
+        for i in range(max(1, size // 20))
+    ]
+    return {"projects": projects, "skills": skills, "experience": experience}
+
+
+def legacy_extract(question: str, data: Dict[str, Any]) -> Dict[str, List[str]]:
+    """The pre-automaton implementation: one substring scan per catalogue term."""
+    norm = lambda s: s.lower().strip()  # noqa: E731
+    q = norm(question or "")
+    projects, tech_stack, roles, domains = [], [], [], []
+    for p in data.get("projects", []):
+        if norm(p.title) in q or norm(p.id) in q:
+            projects.append(p.title)
+        if p.domain and norm(p.domain) in q:
+            domains.append(p.domain)
+        for tech in p.tech_stack:
+            if norm(tech) in q:
+                tech_stack.append(tech)
+    skills = data.get("skills")
+    if skills:
+        for tech in skills.backend + skills.frontend + skills.tools_platforms:
+            if norm(tech) in q:
+                tech_stack.append(tech)
+    for e in data.get("experience", []):
+        if e.role and norm(e.role) in q:
+            roles.append(e.role)
+    for rk in ["backend", "frontend", "full stack", "fullstack", "devops", "data", "ai"]:
+        if rk in q:
+            roles.append(rk)
+    return {"projects": projects, "tech_stack": tech_stack, "roles": roles, "domains": domains}
+
+
+def _questions(data: Dict[str, Any], count: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    pool = [t for p in data["projects"] for t in p.tech_stack] + list(data["skills"].backend)
+    out = []
+    for _ in range(count):
+        template = rng.choice(QUESTION_TEMPLATES)
+        out.append(template.format(a=rng.choice(pool), b=rng.choice(WORDS)))
+    return out
+
+
+def _per_call_us(fn, questions: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for q in questions:
+            fn(q)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(questions) * 1e6
+
+
+def run(sizes: List[int], n_questions: int, repeat: int) -> List[Dict[str, float]]:
+    rows = []
+    for size in sizes:
+        data = synthetic_catalogue(size)
+        questions = _questions(data, n_questions)
+        t0 = time.perf_counter()
+        matcher = build_entity_matcher(data)
+        build_ms = (time.perf_counter() - t0) * 1000
+        legacy_us = _per_call_us(lambda q: legacy_extract(q, data), questions, repeat)
+        automaton_us = _per_call_us(lambda q: match_entities(matcher, q), questions, repeat)
+        rows.append(
+            {
+                "catalogue_terms": len(matcher),
+                "build_ms": round(build_ms, 2),
+                "legacy_us": round(legacy_us, 2),
+                "automaton_us": round(automaton_us, 2),
+                "speedup": round(legacy_us / automaton_us, 2) if automaton_us else 0.0,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    print(f"{'terms':>8} {'build ms':>10} {'legacy us':>10} {'automaton us':>13} {'speedup':>8}")
+    for row in run(sizes, args.questions, args.repeat):
+        print(
+            f"{row['catalogue_terms']:>8} {row['build_ms']:>10} {row['legacy_us']:>10} "
+            f"{row['automaton_us']:>13} {row['speedup']:>7}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Groq client reuse benchmark against a local stand-in server.
+The old polish path re-read .env and built a fresh AsyncGroq (and HTTP pool)
+per request; the new path shares one pooled client.
+
+    python -m benchmarks.bench_groq_client [--calls 200] [--concurrency 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import replace
+import time
+
+from groq import AsyncGroq
+
+from app.v3.llm.groq_client import build_groq_client, load_groq_settings
+from benchmarks.fake_llm_server import FakeLLMServer
+
+MESSAGES = [
+    {"role": "system", "content": "You are a portfolio assistant."},
+    {"role": "user", "content": "USER QUESTION: Would you hire him?\n\nRAW DATA:\nFit summary ..."},
+]
+
+
+async def _complete(client: AsyncGroq) -> None:
+    await client.chat.completions.create(model="fake", messages=MESSAGES, max_tokens=50)
+
+
+async def _fresh_client_per_call(base_url: str) -> None:
+    settings = load_groq_settings()  # stands in for get_api_key()'s double load_dotenv
+    client = AsyncGroq(api_key=settings.api_key or "bench", base_url=base_url)
+    await _complete(client)
+
+
+async def _run(calls: int, concurrency: int, make_call) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await make_call()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return (time.perf_counter() - t0) * 1000
+
+
+async def main_async(calls: int, concurrency: int, latency_ms: float) -> None:
+    server = FakeLLMServer(latency_ms=latency_ms).start()
+    try:
+        server.reset_stats()
+        legacy_ms = await _run(calls, concurrency, lambda: _fresh_client_per_call(server.base_url))
+        legacy = server.stats
+
+        settings = replace(load_groq_settings(), api_key="bench", base_url=server.base_url)
+        shared = build_groq_client(settings)
+        server.reset_stats()
+        pooled_ms = await _run(calls, concurrency, lambda: _complete(shared))
+        pooled = server.stats
+        await shared.close()
+    finally:
+        server.stop()
+
+    print(f"{'path':<22} {'requests':>9} {'connections':>12} {'ms/call':>9}")
+    print(f"{'fresh client per call':<22} {legacy['requests']:>9} {legacy['connections']:>12} {legacy_ms / calls:>9.2f}")
+    print(f"{'shared pooled client':<22} {pooled['requests']:>9} {pooled['connections']:>12} {pooled_ms / calls:>9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.calls, args.concurrency, args.latency_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Chat pipeline benchmark.
+Drives handle_chat over a versioned corpus of recruiter questions with a
+deterministic in-process LLM stub, and reports per-stage latency (from trace
+spans, so pipeline stages and the @traced layer calls inside them), requests
+per CPU-second with tracing off, and memory allocated per request.
+
+    python -m benchmarks.bench_pipeline [--passes 20] [--rounds 5] [--save baseline.json]
+    python -m benchmarks.bench_pipeline --compare baseline.json [--threshold 0.25]
+
+--compare exits non-zero when a stage's p50/p90, throughput or allocations
+regress past the threshold relative to the saved baseline. Each statistic
+is the best of --rounds independent rounds, which keeps run-to-run noise
+well under the default threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+from pathlib import Path
+import platform
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from app.v3.controller import ChatRequest, handle_chat
+from app.v3.llm import groq_client
+from app.v3.llm.polish_cache import get_polish_cache
+from app.v3.system import tracing
+from app.v3.system.tracing import TraceExporter, configure_tracing
+
+BASELINE_SCHEMA = 1
+DEFAULT_CORPUS = Path(__file__).parent / "corpus" / "recruiter_questions_v1.json"
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class StubLLMClient:
+    """
+    Stands in for AsyncGroq: `chat.completions.create` answers with a
+    deterministic rewrite of the prompt, optionally after a fixed delay.
+    """
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.latency_s = latency_ms / 1000.0
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, *, messages: List[Dict[str, str]], **_: Any) -> Any:
+        self.calls += 1
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        prompt = messages[-1]["content"]
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        text = f"[{digest}] " + prompt.split("RAW DATA:\n", 1)[-1][:400]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    async def close(self) -> None:
+        return None
+
+
+class SpanCollector(TraceExporter):
+    """Collects span durations (µs, unrounded by the stage timers) by span name."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = {}
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        for s in trace["spans"]:
+            self.samples.setdefault(s["name"], []).append(s["duration_ms"] * 1000)
+
+
+def load_corpus(path: Path) -> Dict[str, Any]:
+    corpus = json.loads(path.read_text(encoding="utf-8"))
+    if not corpus.get("questions"):
+        raise ValueError(f"{path}: corpus has no questions")
+    return corpus
+
+
+def _requests(corpus: Dict[str, Any]) -> List[ChatRequest]:
+    return [
+        ChatRequest(
+            question=item["question"],
+            session_id=item.get("session_id"),
+            metadata=dict(item.get("metadata") or {}),
+        )
+        for item in corpus["questions"]
+    ]
+
+
+async def _one(request: ChatRequest) -> None:
+    # Every request pays for a full polish rather than a cache hit
+    get_polish_cache().clear()
+    await handle_chat(request)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = max(0, min(len(sorted_values) - 1, int(q * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def _stage_summary(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    out = {}
+    for name, values in sorted(samples.items()):
+        values.sort()
+        row = {f"p{int(q * 100)}": round(_percentile(values, q), 1) for q in QUANTILES}
+        row["mean"] = round(sum(values) / len(values), 2)
+        row["count"] = len(values)
+        out[name] = row
+    return out
+
+
+def _best_of(rounds: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Per span, the lowest value of each statistic across rounds (counts summed)."""
+    out: Dict[str, Dict[str, float]] = {}
+    for summary in rounds:
+        for name, row in summary.items():
+            best = out.setdefault(name, dict(row, count=0))
+            for key, value in row.items():
+                if key == "count":
+                    best["count"] += value
+                else:
+                    best[key] = min(best[key], value)
+    return dict(sorted(out.items()))
+
+
+async def _timed_passes(requests: List[ChatRequest], passes: int) -> Tuple[float, float]:
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    for _ in range(passes):
+        for request in requests:
+            await _one(request)
+    return time.perf_counter() - wall0, time.process_time() - cpu0
+
+
+async def _traced_passes(requests: List[ChatRequest], passes: int) -> Dict[str, List[float]]:
+    collector = SpanCollector()
+    previous = (tracing._SAMPLE_RATE, tracing._EXPORTER)
+    configure_tracing(sample_rate=1.0, exporter=collector)
+    try:
+        for _ in range(passes):
+            for request in requests:
+                await _one(request)
+    finally:
+        tracing._SAMPLE_RATE, tracing._EXPORTER = previous
+    return collector.samples
+
+
+async def _allocation_pass(requests: List[ChatRequest]) -> Dict[str, float]:
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for request in requests:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await _one(request)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib_per_request": round(sum(peaks) / len(peaks) / 1024, 2),
+        "max_peak_kib": round(max(peaks) / 1024, 2),
+        "retained_bytes_per_request": round(sum(retained) / len(retained), 1),
+    }
+
+
+async def run_async(corpus: Dict[str, Any], passes: int, rounds: int, llm_latency_ms: float) -> Dict[str, Any]:
+    stub = StubLLMClient(latency_ms=llm_latency_ms)
+    previous = groq_client._CLIENT
+    groq_client._CLIENT = stub
+    try:
+        requests = _requests(corpus)
+        # Warm-up: snapshot derivations, automata, session records
+        await _timed_passes(requests, 1)
+        timed = [await _timed_passes(requests, passes) for _ in range(rounds)]
+        stages = _best_of([_stage_summary(await _traced_passes(requests, passes)) for _ in range(rounds)])
+        allocations = await _allocation_pass(requests)
+    finally:
+        groq_client._CLIENT = previous
+
+    total = passes * len(requests)
+    wall_s = min(t[0] for t in timed)
+    cpu_s = min(t[1] for t in timed)
+    return {
+        "schema": BASELINE_SCHEMA,
+        "corpus": {"name": corpus.get("name"), "version": corpus.get("version"), "questions": len(requests)},
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "passes": passes,
+        "rounds": rounds,
+        "llm_latency_ms": llm_latency_ms,
+        "llm_calls": stub.calls,
+        "stages_us": stages,
+        "throughput": {
+            "requests": total,
+            "requests_per_second": round(total / wall_s, 1) if wall_s else 0.0,
+            "requests_per_cpu_second": round(total / cpu_s, 1) if cpu_s else 0.0,
+        },
+        "allocations": allocations,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, min_delta_us: float) -> List[str]:
+    """Regressions of `current` against `baseline`, one message each."""
+    if baseline.get("corpus", {}).get("version") != current["corpus"]["version"]:
+        return [
+            f"corpus version changed ({baseline.get('corpus', {}).get('version')} -> "
+            f"{current['corpus']['version']}); re-record the baseline"
+        ]
+    problems = []
+    for name, base in baseline.get("stages_us", {}).items():
+        now = current["stages_us"].get(name)
+        if now is None:
+            continue
+        for key in ("p50", "p90"):
+            was, got = base[key], now[key]
+            # Small absolute moves on microsecond stages are scheduler noise
+            if got > was * (1 + threshold) and got - was > min_delta_us:
+                problems.append(f"stage {name} {key}: {was:.1f} us -> {got:.1f} us")
+    was = baseline["throughput"]["requests_per_cpu_second"]
+    got = current["throughput"]["requests_per_cpu_second"]
+    if got < was * (1 - threshold):
+        problems.append(f"throughput: {was:.1f} -> {got:.1f} requests/cpu-second")
+    was = baseline["allocations"]["peak_kib_per_request"]
+    got = current["allocations"]["peak_kib_per_request"]
+    if got > was * (1 + threshold):
+        problems.append(f"allocations: {was:.2f} -> {got:.2f} KiB peak/request")
+    return problems
+
+
+def _print_report(result: Dict[str, Any]) -> None:
+    corpus = result["corpus"]
+    print(f"corpus {corpus['name']} v{corpus['version']} ({corpus['questions']} questions) x {result['passes']} passes x {result['rounds']} rounds")
+    print(f"{'span':<36} {'p50 us':>8} {'p90 us':>8} {'p99 us':>8} {'mean us':>9} {'count':>6}")
+    for name, row in result["stages_us"].items():
+        print(f"{name:<36} {row['p50']:>8.1f} {row['p90']:>8.1f} {row['p99']:>8.1f} {row['mean']:>9.2f} {row['count']:>6}")
+    tp, alloc = result["throughput"], result["allocations"]
+    print(f"requests/sec {tp['requests_per_second']}  requests/cpu-second {tp['requests_per_cpu_second']}")
+    print(
+        f"allocations: {alloc['peak_kib_per_request']} KiB peak/request "
+        f"(max {alloc['max_peak_kib']}), {alloc['retained_bytes_per_request']} B retained/request"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--passes", type=int, default=20, help="corpus passes per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--save", type=Path, help="write the results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="fail on regressions against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--min-delta-us", type=float, default=5.0, help="ignore smaller stage slowdowns")
+    args = parser.parse_args()
+
+    # The controller logs every request at INFO
+    logging.getLogger("portfolio.v3").setLevel(logging.WARNING)
+    result = asyncio.run(run_async(load_corpus(args.corpus), args.passes, args.rounds, args.llm_latency_ms))
+    _print_report(result)
+
+    if args.save:
+        args.save.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        problems = compare(baseline, result, args.threshold, args.min_delta_us)
+        for line in problems:
+            print(f"REGRESSION {line}")
+        if problems:
+            sys.exit(1)
+        print(f"no regressions against {args.compare} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
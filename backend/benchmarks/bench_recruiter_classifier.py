@@ -0,0 +1,94 @@
+"""
+RecruiterClassifier throughput benchmark (classifications/sec).
+Compares the old three-scan path with its per-call INFO log against the
+single-pass matcher, both per call and through classify_many().
+
+    python -m benchmarks.bench_recruiter_classifier [--n 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import logging
+import random
+import time
+from typing import Callable, List
+
+from app.v3.persona.recruiter_classifier import (
+    HR_KEYWORDS,
+    PRODUCT_KEYWORDS,
+    TECH_KEYWORDS,
+    RecruiterClassifier,
+)
+
+QUESTIONS = [
+    "How does he approach latency and throughput in FastAPI services?",
+    "Is he a good cultural fit for a remote team?",
+    "What impact did his features have on customer metrics?",
+    "Tell me about his background.",
+    "Has he deployed with Docker on AWS?",
+    "What are his strengths and weaknesses?",
+    "Can he own a roadmap with tight deadlines?",
+    "Summarize his profile in two lines.",
+]
+
+_legacy_logger = logging.getLogger("bench.recruiter.legacy")
+
+
+def legacy_classify(question: str) -> str:
+    """Pre-automaton path: three list scans plus an INFO record per call."""
+    q = (question or "").lower()
+    tech_hits = sum(1 for k in TECH_KEYWORDS if k in q)
+    hr_hits = sum(1 for k in HR_KEYWORDS if k in q)
+    product_hits = sum(1 for k in PRODUCT_KEYWORDS if k in q)
+    if tech_hits >= 1:
+        detected = "TECH_LEAD"
+    elif hr_hits >= 1:
+        detected = "HR_MANAGER"
+    elif product_hits >= 1:
+        detected = "PRODUCT_MANAGER"
+    else:
+        detected = "GENERALIST"
+    _legacy_logger.info(
+        "recruiter_type_detected",
+        extra={"type": detected, "tech_hits": tech_hits, "hr_hits": hr_hits, "product_hits": product_hits},
+    )
+    return detected
+
+
+def _rate(fn: Callable[[List[str]], object], questions: List[str]) -> float:
+    t0 = time.perf_counter()
+    fn(questions)
+    return len(questions) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    questions = [rng.choice(QUESTIONS) + f" #{i}" for i in range(args.n)]
+
+    # The old path logged at INFO through the root basicConfig handler.
+    sink = logging.StreamHandler(io.StringIO())
+    _legacy_logger.addHandler(sink)
+    _legacy_logger.setLevel(logging.INFO)
+    _legacy_logger.propagate = False
+
+    rows = [
+        ("legacy (3 scans + INFO log)", _rate(lambda qs: [legacy_classify(q) for q in qs], questions)),
+        ("classify", _rate(lambda qs: [RecruiterClassifier.classify(q) for q in qs], questions)),
+        ("classify_many", _rate(RecruiterClassifier.classify_many, questions)),
+        (
+            "classify_many (replay, repeats)",
+            _rate(RecruiterClassifier.classify_many, [rng.choice(QUESTIONS) for _ in range(args.n)]),
+        ),
+    ]
+    for name, rate in rows:
+        print(f"{name:<34} {rate:>12,.0f} classifications/sec")
+
+
+if __name__ == "__main__":
+    main()
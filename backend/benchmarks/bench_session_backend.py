@@ -0,0 +1,106 @@
+"""
+Per-request session state overhead with 1, 4 and 16 worker processes.
+Each worker runs the controller's session calls (ContextManager.aload/aupdate,
+SessionManager.aupdate_session/aget_session) for a stream of requests spread
+over shared session ids, once with the in-process backend and once with the
+shared SQLite backend plus write-behind.
+
+    python -m benchmarks.bench_session_backend [--requests 2000] [--sessions 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import random
+import tempfile
+import time
+from typing import List, Tuple
+
+WORKER_COUNTS = (1, 4, 16)
+INTENTS = ("skills_query", "project_query", "experience_query", "role_fit_evaluation")
+
+
+def _worker(args: Tuple[str, str, int, int, int]) -> Tuple[float, float, int]:
+    backend, db_path, requests, sessions, seed = args
+    os.environ["SESSION_BACKEND"] = backend
+    os.environ["SESSION_DB_PATH"] = db_path
+    # Imported after the env is set: the stores are configured at import time
+    from app.v3.layers.context_manager import ContextManager
+    from app.v4.state.session_backend import get_session_backend
+    from app.v4.state.session_manager import SessionManager
+
+    rng = random.Random(seed)
+    ids = [f"session-{rng.randrange(sessions)}" for _ in range(requests)]
+
+    async def run() -> Tuple[float, int]:
+        follow_ups_seen = 0
+        wall = 0.0
+        for i, session_id in enumerate(ids):
+            t0 = time.perf_counter()
+            ctx = await ContextManager.aload(session_id)
+            if ctx["recent_intents"]:
+                follow_ups_seen += 1
+            await SessionManager.aupdate_session(session_id, "TECH_LEAD" if i % 3 else "GENERALIST")
+            await SessionManager.aget_session(session_id)
+            await ContextManager.aupdate(session_id, intent=INTENTS[i % len(INTENTS)], question="q")
+            wall += time.perf_counter() - t0
+        return wall, follow_ups_seen
+
+    # CPU time of this process (writer and read threads included) does not
+    # grow when workers share fewer cores than their count; wall time per
+    # request is what a request actually waits, SQLite busy waits included
+    cpu0 = time.process_time()
+    wall, follow_ups_seen = asyncio.run(run())
+    get_session_backend()[1].close()
+    cpu = time.process_time() - cpu0
+    return cpu / requests * 1e6, wall / requests * 1e6, follow_ups_seen
+
+
+def _run(backend: str, workers: int, requests: int, sessions: int) -> Tuple[float, float, int]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sessions.db")
+        if backend == "sqlite":
+            # Create the schema once, before the workers race for it
+            from app.v4.state.session_backend import SQLiteSessionBackend
+
+            SQLiteSessionBackend(db_path).close()
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(workers) as pool:
+            results: List[Tuple[float, float, int]] = pool.map(
+                _worker, [(backend, db_path, requests, sessions, seed) for seed in range(workers)]
+            )
+    cpu_us = sum(r[0] for r in results) / len(results)
+    wall_us = sum(r[1] for r in results) / len(results)
+    return cpu_us, wall_us, sum(r[2] for r in results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per worker")
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} requests/worker={args.requests} sessions={args.sessions}")
+    print(
+        f"{'workers':>7} {'backend':>8} {'cpu us/req':>11} {'overhead':>9} "
+        f"{'wall us/req':>12} {'overhead':>9} {'follow-ups w/ context':>22}"
+    )
+    for workers in WORKER_COUNTS:
+        base_cpu, base_wall, base_seen = _run("memory", workers, args.requests, args.sessions)
+        cpu, wall, seen = _run("sqlite", workers, args.requests, args.sessions)
+        total = workers * args.requests
+        print(
+            f"{workers:>7} {'memory':>8} {base_cpu:>11.1f} {'':>9} {base_wall:>12.1f} {'':>9} "
+            f"{base_seen / total:>22.1%}"
+        )
+        print(
+            f"{workers:>7} {'sqlite':>8} {cpu:>11.1f} {cpu - base_cpu:>+9.1f} {wall:>12.1f} "
+            f"{wall - base_wall:>+9.1f} {seen / total:>22.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
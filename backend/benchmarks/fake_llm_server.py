@@ -0,0 +1,285 @@
+"""
+Local stand-in for the Groq (OpenAI-compatible) chat completions API.
+Serves POST /openai/v1/chat/completions with keep-alive and counts the TCP
+connections it accepts, so benchmarks can observe connection reuse.
+
+    server = FakeLLMServer(latency_ms=20).start()
+    ... point GROQ_BASE_URL at server.base_url ...
+    server.stop()
+
+Latency can follow a distribution (see parse_latency), a fraction of calls
+can fail with an HTTP error, and `"stream": true` requests are answered as
+SSE chunks. GET /stats returns the counters. Also runs standalone:
+
+    python -m benchmarks.fake_llm_server --latency lognormal:400:0.5 --error-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import random
+import socket
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Latency model in milliseconds from a spec string:
+      "20" or "fixed:20"        always 20 ms
+      "uniform:10:50"           uniform between 10 and 50 ms
+      "normal:40:10"            mean 40, stddev 10 (clamped at 0)
+      "lognormal:300:0.5"       median 300, sigma 0.5 (long right tail)
+      "exp:40"                  exponential with mean 40
+    """
+    kind, _, rest = spec.partition(":")
+    if not rest:
+        kind, rest = "fixed", spec
+    try:
+        args = [float(a) for a in rest.split(":")]
+        if kind == "fixed" and len(args) == 1:
+            return lambda rng: args[0]
+        if kind == "uniform" and len(args) == 2:
+            return lambda rng: rng.uniform(args[0], args[1])
+        if kind == "normal" and len(args) == 2:
+            return lambda rng: max(0.0, rng.gauss(args[0], args[1]))
+        if kind == "lognormal" and len(args) == 2:
+            mu = math.log(args[0])
+            return lambda rng: rng.lognormvariate(mu, args[1])
+        if kind == "exp" and len(args) == 1:
+            return lambda rng: rng.expovariate(1.0 / args[0]) if args[0] > 0 else 0.0
+    except ValueError:
+        pass
+    raise ValueError(f"bad latency spec: {spec!r}")
+
+
+_STAT_KEYS = ("connections", "requests", "streams", "errors")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def setup(self) -> None:
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle plus
+        # the client's delayed ACK adds ~40 ms to every keep-alive response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.bump("connections")
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.snapshot())
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        server.bump("requests")
+        delay_ms, fail = server.draw()
+        if delay_ms:
+            time.sleep(delay_ms / 1000.0)
+        if fail:
+            server.bump("errors")
+            self._send_json(
+                server.error_status,
+                {"error": {"message": "fake upstream error", "type": "server_error"}},
+            )
+            return
+
+        messages = body.get("messages") or []
+        text = server.reply or f"Polished: {str(messages[-1].get('content', ''))[:60]}"
+        model = body.get("model", "fake")
+        if body.get("stream"):
+            server.bump("streams")
+            self._stream(model, text)
+        else:
+            self._send_json(200, _completion(model, text))
+
+    def _stream(self, model: str, text: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = text.split(" ")
+        step = max(1, len(words) // self.server.stream_chunks)
+        for i in range(0, len(words), step):
+            piece = " ".join(words[i:i + step]) + (" " if i + step < len(words) else "")
+            self._write_chunk(f"data: {json.dumps(_chunk(model, piece))}\n\n")
+            if self.server.token_delay_s:
+                time.sleep(self.server.token_delay_s)
+        self._write_chunk(f"data: {json.dumps(_chunk(model, None, 'stop'))}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: str) -> None:
+        raw = data.encode("utf-8")
+        self.wfile.write(f"{len(raw):x}\r\n".encode("ascii") + raw + b"\r\n")
+        self.wfile.flush()
+
+
+def _completion(model: str, text: str) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def _chunk(model: str, text: str | None, finish_reason: str | None = None) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "delta": {"content": text} if text is not None else {},
+                "finish_reason": finish_reason,
+            }
+        ],
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    reply: str | None = None
+    error_rate: float = 0.0
+    error_status: int = 500
+    stream_chunks: int = 8
+    token_delay_s: float = 0.0
+    latency: Callable[[random.Random], float]
+    rng: random.Random
+    stats: Dict[str, int]
+    stats_lock: threading.Lock
+
+    def bump(self, key: str) -> None:
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def draw(self) -> tuple[float, bool]:
+        with self.stats_lock:
+            return self.latency(self.rng), self.rng.random() < self.error_rate
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients that hang up early (timeouts, deadlines) are expected here
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class FakeLLMServer:
+    def __init__(
+        self,
+        *,
+        latency_ms: float = 0.0,
+        latency: str | None = None,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        stream_chunks: int = 8,
+        token_delay_ms: float = 0.0,
+        reply: str | None = None,
+        port: int = 0,
+        seed: int = 7,
+    ) -> None:
+        self._server = _Server(("127.0.0.1", port), _Handler)
+        self._server.latency = parse_latency(latency) if latency else parse_latency(str(latency_ms))
+        self._server.error_rate = error_rate
+        self._server.error_status = error_status
+        self._server.stream_chunks = max(1, stream_chunks)
+        self._server.token_delay_s = token_delay_ms / 1000.0
+        self._server.reply = reply
+        self._server.rng = random.Random(seed)
+        self._server.stats = dict.fromkeys(_STAT_KEYS, 0)
+        self._server.stats_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._server.snapshot()
+
+    def reset_stats(self) -> None:
+        with self._server.stats_lock:
+            self._server.stats = dict.fromkeys(_STAT_KEYS, 0)
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", default="0", help="latency spec, see parse_latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    server = FakeLLMServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        stream_chunks=args.stream_chunks,
+        token_delay_ms=args.token_delay_ms,
+        port=args.port,
+        seed=args.seed,
+    )
+    # First line of output is the URL; the load-test harness reads it
+    print(server.base_url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+End-to-end load test for /chat against a local fake Groq server.
+Starts the fake LLM server and one uvicorn worker running app.main as
+subprocesses, then drives open-loop traffic at each target rate and reports
+throughput, latency percentiles and how each request was polished.
+
+    python -m benchmarks.loadtest --rps 5,10,20,40 --duration 10 --latency lognormal:400:0.5
+    python -m benchmarks.loadtest --stream --error-rate 0.05 --json results.json
+
+Open loop: request i is sent at start + i / rps whether or not earlier ones
+have finished, and latency is measured from that scheduled time, so a
+saturated server shows up as growing latency rather than a slower sender.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# The app only runs in its subprocess; importing it here would also pull in
+# its INFO logging setup
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_CORPUS = BACKEND_DIR / "benchmarks" / "corpus" / "recruiter_questions_v1.json"
+OUTCOMES = ("llm_used", "llm_cached", "llm_skipped", "llm_shed", "llm_circuit_open", "llm_deadline", "llm_error", "http_error")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_fake_llm(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_llm_server",
+            "--latency", args.latency,
+            "--error-rate", str(args.error_rate),
+            "--error-status", str(args.error_status),
+            "--token-delay-ms", str(args.token_delay_ms),
+        ],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    base_url = proc.stdout.readline().strip()
+    if not base_url:
+        proc.kill()
+        raise RuntimeError("fake LLM server did not start")
+    return proc, base_url
+
+
+def _start_app(args: argparse.Namespace, llm_url: str) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        GROQ_API_KEY="loadtest",
+        GROQ_BASE_URL=llm_url,
+        # Repeated corpus questions would otherwise be answered from cache
+        LLM_POLISH_CACHE_TTL_SECONDS="3600" if args.polish_cache else "0",
+        LLM_POLISH_CACHE_DB="",
+        ANALYTICS_FLUSH_PATH="",
+        TRACE_SAMPLE_RATE="0",
+    )
+    log = open(args.app_log, "w") if args.app_log else subprocess.DEVNULL
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=log,
+        stderr=log,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("app exited during startup")
+        try:
+            if httpx.get(f"{base_url}/system/health", timeout=1.0).status_code == 200:
+                return proc, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("app did not become healthy within 30s")
+
+
+def _outcome(status: int, body: Optional[Dict[str, Any]]) -> str:
+    if status != 200 or body is None:
+        return "http_error"
+    debug = body.get("debug") or {}
+    if debug.get("llm_error"):
+        return "llm_error"
+    if debug.get("llm_status") == "cached":
+        return "llm_cached"
+    if debug.get("llm_status") == "shed":
+        return "llm_shed"
+    if debug.get("llm_status") == "circuit_open":
+        return "llm_circuit_open"
+    if debug.get("llm_status") == "deadline_exceeded":
+        return "llm_deadline"
+    if debug.get("llm_used"):
+        return "llm_used"
+    return "llm_skipped"
+
+
+async def _post_chat(client: httpx.AsyncClient, payload: Dict[str, Any]) -> tuple[str, None]:
+    response = await client.post("/chat", json=payload)
+    body = response.json() if response.status_code == 200 else None
+    return _outcome(response.status_code, body), None
+
+
+async def _post_stream(client: httpx.AsyncClient, payload: Dict[str, Any]) -> tuple[str, Optional[float]]:
+    """Returns the outcome and the time to the first (rules answer) event."""
+    first_event: Optional[float] = None
+    final: Optional[Dict[str, Any]] = None
+    event = None
+    async with client.stream("POST", "/chat/stream", json=payload) as response:
+        if response.status_code != 200:
+            return "http_error", None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+                if first_event is None:
+                    first_event = time.perf_counter()
+            elif line.startswith("data: ") and event == "final":
+                final = json.loads(line[6:])
+    return _outcome(200, final), first_event
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(q * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    questions: List[Dict[str, Any]],
+    rps: float,
+    duration: float,
+    stream: bool,
+    sessions: int,
+    rng: random.Random,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    first_events: List[float] = []
+    outcomes = dict.fromkeys(OUTCOMES, 0)
+    send = _post_stream if stream else _post_chat
+
+    async def one(scheduled: float, payload: Dict[str, Any]) -> None:
+        try:
+            outcome, first_event = await send(client, payload)
+        except (httpx.HTTPError, ValueError):
+            outcome, first_event = "http_error", None
+        done = time.perf_counter()
+        outcomes[outcome] += 1
+        latencies.append((done - scheduled) * 1000)
+        if first_event is not None:
+            first_events.append((first_event - scheduled) * 1000)
+
+    total = max(1, int(rps * duration))
+    tasks = []
+    start = time.perf_counter()
+    for i in range(total):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        item = questions[i % len(questions)]
+        payload = {
+            "question": item["question"],
+            "session_id": f"load-{rng.randrange(sessions)}",
+            "metadata": {**(item.get("metadata") or {}), "debug": True},
+        }
+        tasks.append(asyncio.create_task(one(scheduled, payload)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    first_events.sort()
+    row: Dict[str, Any] = {
+        "target_rps": rps,
+        "sent": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.5), 1),
+        "p90_ms": round(_percentile(latencies, 0.9), 1),
+        "p99_ms": round(_percentile(latencies, 0.99), 1),
+        "max_ms": round(latencies[-1], 1),
+        "outcomes": outcomes,
+    }
+    if stream:
+        row["first_event_p50_ms"] = round(_percentile(first_events, 0.5), 1)
+        row["first_event_p99_ms"] = round(_percentile(first_events, 0.99), 1)
+    return row
+
+
+async def run_async(args: argparse.Namespace, app_url: str, llm_url: str) -> List[Dict[str, Any]]:
+    questions = json.loads(args.corpus.read_text(encoding="utf-8"))["questions"]
+    rng = random.Random(args.seed)
+    rows = []
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    headers = {"X-Request-Deadline-Ms": str(args.deadline_ms)} if args.deadline_ms else None
+    async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=args.timeout, headers=headers) as client:
+        # Warm-up: first-request snapshot derivations and connection setup
+        await run_step(client, questions, min(10.0, args.rps[0]), 1.0, args.stream, args.sessions, rng)
+        for rps in args.rps:
+            before = httpx.get(f"{llm_url}/stats").json()
+            row = await run_step(client, questions, rps, args.duration, args.stream, args.sessions, rng)
+            after = httpx.get(f"{llm_url}/stats").json()
+            row["upstream"] = {k: after[k] - before.get(k, 0) for k in ("requests", "errors", "streams")}
+            rows.append(row)
+            _print_row(row, args)
+    return rows
+
+
+def _print_header(args: argparse.Namespace) -> None:
+    extra = f" {'1st p50':>8} {'1st p99':>8}" if args.stream else ""
+    print(
+        f"{'rps':>6} {'achieved':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}{extra}  "
+        f"{'used':>5} {'cached':>6} {'skipped':>7} {'shed':>5} {'open':>5} {'late':>5} {'llm err':>7} {'http err':>8} {'upstream':>8}"
+    )
+
+
+def _print_row(row: Dict[str, Any], args: argparse.Namespace) -> None:
+    o = row["outcomes"]
+    extra = f" {row['first_event_p50_ms']:>8} {row['first_event_p99_ms']:>8}" if args.stream else ""
+    flag = "  <- over SLO" if args.slo_p99_ms and row["p99_ms"] > args.slo_p99_ms else ""
+    print(
+        f"{row['target_rps']:>6g} {row['throughput_rps']:>9} {row['p50_ms']:>8} {row['p90_ms']:>8} "
+        f"{row['p99_ms']:>8} {row['max_ms']:>8}{extra}  {o['llm_used']:>5} {o['llm_cached']:>6} "
+        f"{o['llm_skipped']:>7} {o['llm_shed']:>5} {o['llm_circuit_open']:>5} {o['llm_deadline']:>5} {o['llm_error']:>7} {o['http_error']:>8} {row['upstream']['requests']:>8}{flag}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rps", default="5,10,20,40", help="comma-separated target rates, run in order")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per rate")
+    parser.add_argument("--stream", action="store_true", help="drive /chat/stream instead of /chat")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--latency", default="lognormal:400:0.5", help="fake LLM latency spec (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--token-delay-ms", type=float, default=20.0, help="gap between streamed chunks")
+    parser.add_argument("--polish-cache", action="store_true", help="keep the polish cache enabled")
+    parser.add_argument("--deadline-ms", type=int, default=0, help="send X-Request-Deadline-Ms with every request")
+    parser.add_argument("--slo-p99-ms", type=float, default=0.0, help="flag rates whose p99 exceeds this")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    parser.add_argument("--app-log", type=Path, help="write the app's stdout/stderr here")
+    args = parser.parse_args()
+    args.rps = [float(r) for r in args.rps.split(",") if r]
+
+    llm_proc, llm_url = _start_fake_llm(args)
+    app_proc = None
+    try:
+        app_proc, app_url = _start_app(args, llm_url)
+        _print_header(args)
+        rows = asyncio.run(run_async(args, app_url, llm_url))
+    finally:
+        for proc in (app_proc, llm_proc):
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    if args.slo_p99_ms:
+        within = [r["target_rps"] for r in rows if r["p99_ms"] <= args.slo_p99_ms]
+        print(f"highest rate within p99 <= {args.slo_p99_ms:g} ms: {max(within):g} rps" if within else "no rate met the SLO")
+    if args.json:
+        args.json.write_text(json.dumps({"config": {k: str(v) for k, v in vars(args).items()}, "steps": rows}, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,47 +44,21 @@ export default function Profile() {
 
     const loadData = async () => {
       try {
-        const [
-          aboutRes,
-          contactRes,
-          expRes,
-          educationRes,
-          skillsRes,
-          certificatesRes,
-          projectsRes,
-        ] = await Promise.all([
-          fetch(apiUrl("/about")),
-          fetch(apiUrl("/contact")),
-          fetch(apiUrl("/experience")),
-          fetch(apiUrl("/education")),
-          fetch(apiUrl("/skills")),
-          fetch(apiUrl("/certificates")),
-          fetch(apiUrl("/projects")),
-        ]);
-
-        const responses = [
-          aboutRes,
-          contactRes,
-          expRes,
-          educationRes,
-          skillsRes,
-          certificatesRes,
-          projectsRes,
-        ];
-
-        if (responses.some((res) => !res.ok)) {
+        // One bundled request instead of one per section
+        const res = await fetch(apiUrl("/portfolio"));
+        if (!res.ok) {
           throw new Error("Failed to load dossier data");
         }
 
-        const [
-          aboutData,
-          contactData,
-          experienceData,
-          educationData,
-          skillsData,
-          certificatesData,
-          projectsData,
-        ] = await Promise.all(responses.map((res) => res.json()));
+        const {
+          about: aboutData,
+          contact: contactData,
+          experience: experienceData,
+          education: educationData,
+          skills: skillsData,
+          certificates: certificatesData,
+          projects: projectsData,
+        } = await res.json();
 
         if (!cancelled) {
           setProfileData({